@@ -2,6 +2,8 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from database import db, jwt, migrate
+from services.token_store import is_token_revoked
+from services import instrumentation, metrics, request_context, jira_issue_index, secrets_vault
 import click
 import logging
 
@@ -14,11 +16,19 @@ def create_app():
         level=logging.INFO,
         format='%(asctime)s [%(levelname)s] %(name)s: %(message)s'
     )
+    # httpx (JIRA_HTTP_CLIENT=async) logs every request at INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
 
     CORS(app)
     db.init_app(app)
     jwt.init_app(app)
+    jwt.token_in_blocklist_loader(is_token_revoked)
     migrate.init_app(app, db)
+    instrumentation.init_app(app, db)
+    metrics.init_app(app, db)
+    request_context.init_app(app)
+    jira_issue_index.init_app(app)
+    secrets_vault.init_app(app)
 
     with app.app_context():
         from sqlalchemy import event
@@ -30,15 +40,18 @@ def create_app():
 
     from models.user import User
     from models.time_record import TimeRecord
-    from models.jira import JiraConnection, JiraSyncLog
+    from models.jira import JiraConnection, JiraProjectRoute, JiraSyncLog, JiraSyncJob, JiraSyncJobItem
+    from models.refresh_token import RefreshToken
 
     from routes.auth import auth_bp
     from routes.time_records import time_records_bp
     from routes.jira import jira_bp
+    from routes.metrics import metrics_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(time_records_bp, url_prefix='/api')
     app.register_blueprint(jira_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp)
 
     @app.cli.command()
     def init_db():
@@ -62,6 +75,133 @@ def create_app():
         else:
             print(f"User '{username}' not found.")
 
+    @app.cli.command("jira-worker")
+    @click.option("--processes", default=1, help="Number of worker processes.")
+    @click.option("--poll-interval", default=1.0, help="Seconds between queue polls when idle.")
+    @click.option("--stale-after", default=300, help="Requeue running jobs without a heartbeat for this many seconds.")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty.")
+    def jira_worker(processes, poll_interval, stale_after, once):
+        """Process queued JIRA bulk sync jobs."""
+        from services.jira_jobs import work, worker_name
+        import multiprocessing
+        import signal
+
+        def run():
+            stopping = []
+            signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+            with app.app_context():
+                # Forked workers must not share the parent's pooled connections
+                db.engine.dispose(close=False)
+                work(worker_name(), poll_interval, stale_after, once, should_stop=lambda: bool(stopping))
+
+        if processes <= 1:
+            run()
+            return
+
+        workers = [multiprocessing.Process(target=run, name=f"jira-worker-{n}") for n in range(processes)]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+
+    @app.cli.command("jira-reconcile")
+    @click.option("--fix", is_flag=True, help="Write drifted records back to JIRA instead of only marking them.")
+    def jira_reconcile(fix):
+        """Compare synced records with JIRA worklogs for every active connection."""
+        from services.jira_reconcile import reconcile_all
+        for summary in reconcile_all(fix=fix):
+            if 'error' in summary:
+                print(f"connection {summary['connection_id']}: error: {summary['error']}")
+            else:
+                print(f"connection {summary['connection_id']}: {summary['checked']} changed worklogs, "
+                      f"{summary['drifted']} drifted, {summary['fixed']} fixed, {summary['failed']} failed")
+
+    @app.cli.command("jira-autosync")
+    @click.option("--interval", default=None, type=float, help="Seconds between passes (default JIRA_AUTOSYNC_INTERVAL_SECONDS).")
+    @click.option("--once", is_flag=True, help="Run a single pass and exit.")
+    def jira_autosync(interval, once):
+        """Periodically sync finished time records for connections with auto-sync enabled."""
+        from services.jira_autosync import run_scheduler
+        import signal
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        run_scheduler(interval, once, should_stop=lambda: bool(stopping))
+
+    @app.cli.command("jira-compact-history")
+    @click.option("--days", default=None, type=int, help="Keep every attempt newer than this (default JIRA_SYNC_LOG_RETENTION_DAYS).")
+    @click.option("--batch-size", default=500, help="Records compacted per transaction.")
+    def jira_compact_history(days, batch_size):
+        """Collapse old successful JIRA sync log entries into one row per record."""
+        from services.jira_history import compact_sync_log
+        if days is None:
+            days = app.config.get('JIRA_SYNC_LOG_RETENTION_DAYS', 90)
+        summary = compact_sync_log(days, batch_size)
+        print(f"Compacted {summary['records']} records, deleted {summary['deleted']} sync log entries.")
+
+    @app.cli.command("jira-rotate-keys")
+    @click.option("--batch-size", default=200, help="Connections re-encrypted per transaction.")
+    @click.option("--pause", default=0.0, help="Seconds to sleep between batches.")
+    def jira_rotate_keys(batch_size, pause):
+        """Re-encrypt stored JIRA tokens under the first JIRA_ENCRYPTION_KEY."""
+        from services.jira_credentials import reencrypt_tokens
+        summary = reencrypt_tokens(batch_size, pause)
+        print(f"Re-encrypted {summary['rotated']} tokens in {summary['connections']} connections, "
+              f"{summary['skipped']} changed meanwhile, {summary['failed']} could not be decrypted.")
+
+    @app.cli.command("seed-bench")
+    @click.option("--users", default=5, help="Number of bench users to create.")
+    @click.option("--years", default=1.0, help="Years of history per user.")
+    @click.option("--records-per-day", default=8, help="Time records per weekday.")
+    @click.option("--jira-url", default="http://127.0.0.1:8081", help="JIRA URL for the bench connections.")
+    @click.option("--seed", default=0, help="Random seed.")
+    def seed_bench(users, years, records_per_day, jira_url, seed):
+        """Generate synthetic users and time records for benchmarking."""
+        from bench.seed import seed_bench_data
+        total = seed_bench_data(users, years, records_per_day, jira_url, seed)
+        print(f"Created {total} time records for {users} bench users.")
+
+    @app.cli.command("bench")
+    @click.option("--user", "username", default="bench_user_0", help="Bench user to run as.")
+    @click.option("--iterations", default=20, help="Calls per scenario.")
+    @click.option("--bulk-size", default=20, help="Records per bulk sync call.")
+    @click.option("--only", default=None, help="Only run scenarios containing this text.")
+    @click.option("--save", default=None, help="Write results to this JSON file.")
+    @click.option("--compare", default=None, help="Compare against a saved JSON baseline.")
+    @click.option("--tolerance", default=0.25, help="Allowed p50 slowdown before flagging.")
+    def bench(username, iterations, bulk_size, only, save, compare, tolerance):
+        """Benchmark every API route against seeded data."""
+        from bench.runner import run_benchmarks, format_results, find_regressions, load_results, save_results
+        results = run_benchmarks(app, username, iterations, bulk_size, only)
+        baseline = load_results(compare) if compare else None
+        print(format_results(results, baseline))
+        if save:
+            save_results(save, results)
+        if baseline:
+            regressions = find_regressions(results, baseline, tolerance)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            if regressions:
+                raise SystemExit(1)
+
+    @app.cli.command("bench-sync")
+    @click.option("--user", "username", default="bench_user_0", help="Bench user to run as.")
+    @click.option("--records", default=200, help="Records per bulk sync.")
+    @click.option("--latency-ms", default=50.0, help="Fake JIRA latency per request.")
+    @click.option("--concurrency", default="1,4,8,16", help="Comma-separated concurrency caps to try.")
+    @click.option("--rate-limit", default=None, type=float, help="Fake JIRA requests per second before 429s.")
+    @click.option("--error-rate", default=0.0, help="Fraction of fake JIRA requests failed with 5xx.")
+    def bench_sync(username, records, latency_ms, concurrency, rate_limit, error_rate):
+        """Benchmark bulk sync against a local fake JIRA server."""
+        from bench.sync_bench import run_sync_benchmark, format_sync_results
+        caps = [int(c) for c in concurrency.split(',')]
+        print(format_sync_results(run_sync_benchmark(app, username, records, latency_ms, caps,
+                                                     rate_limit=rate_limit, error_rate=error_rate)))
+
     return app
 
 app = create_app()
@@ -0,0 +1 @@
+"""Benchmark data generation and route benchmarks"""
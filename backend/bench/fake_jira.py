@@ -0,0 +1,611 @@
+"""
+Local stand-in for the JIRA Cloud REST API.
+
+Implements the endpoints ``JiraService`` calls: server info, myself, issue
+search (``search/jql`` with ``nextPageToken`` paging, and the older
+``search``), issue lookup and worklogs (create, list, update, delete,
+change feeds and bulk fetch). JQL is evaluated for the shapes JiraService
+builds: ``text ~``/``key ~``/``summary ~``, ``=``, ``key in (...)`` and
+relative dates such as ``updated >= -90m``, joined with AND/OR.
+
+For load and failure testing each request can be delayed (``latency`` plus
+random ``jitter``), failed at random (``error_rate``) or by queued
+``inject()`` calls, and throttled by a token bucket (``rate_limit`` requests
+per second) that answers 429 with ``Retry-After``.
+
+Use it as a context manager, through the ``fake_jira`` pytest fixture
+(``pytest_plugins = ['bench.fake_jira']``), or standalone::
+
+    python -m bench.fake_jira --port 8081 --latency-ms 50 --rate-limit 20
+
+which serves issues for the projects created by ``flask seed-bench``.
+"""
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+import argparse
+import base64
+import itertools
+import json
+import random
+import re
+import sys
+import threading
+import time
+
+API = r'^/rest/api/\d+'
+SERVER_INFO_PATH = re.compile(API + r'/serverInfo/?$')
+MYSELF_PATH = re.compile(API + r'/myself/?$')
+SEARCH_PATH = re.compile(API + r'/search(?P<enhanced>/jql)?/?$')
+ISSUE_PATH = re.compile(API + r'/issue/(?P<key>[^/]+)/?$')
+FEED_PATH = re.compile(API + r'/worklog/(?P<feed>updated|deleted)/?$')
+WORKLOG_LIST_PATH = re.compile(API + r'/worklog/list/?$')
+WORKLOG_PATH = re.compile(API + r'/issue/(?P<key>[^/]+)/worklog(?:/(?P<id>\d+))?/?$')
+
+JIRA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'
+DONE_STATUSES = ('Done', 'Closed', 'Resolved')
+STATUSES = ('To Do', 'In Progress', 'In Review', 'Done')
+ISSUE_TYPES = ('Task', 'Bug', 'Story')
+WORDS = ('api', 'login', 'report', 'export', 'billing', 'search', 'cache', 'dashboard',
+         'timeout', 'migration', 'mobile', 'sync', 'invoice', 'profile', 'upload')
+
+
+def _jira_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime(JIRA_TIME_FORMAT)
+
+
+def _parse_jira_time(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+
+
+class JQLError(ValueError):
+    pass
+
+
+class _Clause:
+    """One ``field op value`` comparison of a JQL query"""
+
+    PATTERN = re.compile(
+        r'^\s*(?P<field>\w+)\s*(?:'
+        r'(?P<op>~|!=|=|>=|<=|>|<)\s*(?P<value>"(?:[^"\\]|\\.)*"|\S+)'
+        r'|(?P<not>not\s+)?in\s*\((?P<values>[^)]*)\))\s*$',
+        re.IGNORECASE
+    )
+
+    def __init__(self, text: str):
+        match = self.PATTERN.match(text)
+        if not match:
+            raise JQLError(f"Error in the JQL Query: cannot parse '{text.strip()}'")
+        self.field = match.group('field').lower()
+        if match.group('values') is not None:
+            self.op = 'not in' if match.group('not') else 'in'
+            self.value = [v.strip().strip('"').upper() for v in match.group('values').split(',') if v.strip()]
+        else:
+            self.op = match.group('op')
+            self.value = match.group('value').strip('"').replace('\\"', '"')
+
+    def matches(self, issue: Dict, now: datetime) -> bool:
+        fields = issue['fields']
+        if self.op in ('in', 'not in'):
+            found = self._text(issue).upper() in self.value
+            return found if self.op == 'in' else not found
+        if self.op == '~':
+            needle = self.value.lower().rstrip('*')
+            if self.field == 'text':
+                haystack = f"{fields['summary']} {fields.get('description') or ''}"
+            else:
+                haystack = self._text(issue)
+            return needle in haystack.lower()
+        if self.field in ('updated', 'created'):
+            return self._compare(_parse_jira_time(fields[self.field]), self._date(now))
+        if self.field == 'resolution':
+            resolved = fields['status']['name'] in DONE_STATUSES
+            wanted = self.value.lower() != 'unresolved'
+            return (resolved == wanted) == (self.op == '=')
+        equal = self._text(issue).lower() == self.value.lower() or (
+            self.field == 'assignee' and fields.get('assignee') is not None
+            and self.value.lower() in (fields['assignee'].get('emailAddress', '').lower(),
+                                       fields['assignee'].get('accountId', '').lower())
+        )
+        if self.op in ('=', '!='):
+            return equal == (self.op == '=')
+        raise JQLError(f"Operator '{self.op}' is not supported for field '{self.field}'")
+
+    def _text(self, issue: Dict) -> str:
+        fields = issue['fields']
+        if self.field in ('key', 'issue', 'issuekey'):
+            return issue['key']
+        if self.field == 'project':
+            return fields['project']['key']
+        if self.field == 'status':
+            return fields['status']['name']
+        if self.field in ('type', 'issuetype'):
+            return fields['issuetype']['name']
+        if self.field == 'assignee':
+            return (fields.get('assignee') or {}).get('displayName', '')
+        if self.field in ('summary', 'description'):
+            return fields.get(self.field) or ''
+        raise JQLError(f"Field '{self.field}' does not exist or you do not have permission to view it.")
+
+    def _date(self, now: datetime) -> datetime:
+        match = re.match(r'^-(\d+)([mhdw])$', self.value)
+        if match:
+            unit = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}[match.group(2)]
+            return now - timedelta(**{unit: int(match.group(1))})
+        try:
+            return datetime.strptime(self.value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        except ValueError:
+            raise JQLError(f"Date value '{self.value}' for field '{self.field}' is invalid.")
+
+    def _compare(self, left: datetime, right: datetime) -> bool:
+        return {
+            '=': left == right, '!=': left != right, '>=': left >= right,
+            '<=': left <= right, '>': left > right, '<': left < right,
+        }[self.op]
+
+
+class JQL:
+    """The subset of JQL JiraService generates: clauses joined by AND/OR, optional ORDER BY"""
+
+    def __init__(self, query: str):
+        order = ''
+        match = re.search(r'\s+order\s+by\s+(.+)$', query, re.IGNORECASE)
+        if match:
+            query, order = query[:match.start()], match.group(1)
+        self.order_field, self.descending = 'key', False
+        if order:
+            parts = order.split()
+            self.order_field = parts[0].lower()
+            self.descending = len(parts) > 1 and parts[1].lower() == 'desc'
+        # OR of ANDs; parentheses only appear inside ``in (...)``
+        self.terms = [
+            [_Clause(clause) for clause in _split(term, 'and')]
+            for term in _split(query, 'or') if term.strip()
+        ]
+
+    def filter(self, issues: Iterable[Dict]) -> List[Dict]:
+        now = datetime.now(timezone.utc)
+        found = [
+            issue for issue in issues
+            if not self.terms or any(all(c.matches(issue, now) for c in term) for term in self.terms)
+        ]
+        if self.order_field == 'key':
+            sort_key = lambda issue: _key_order(issue['key'])
+        else:
+            sort_key = lambda issue: str(issue['fields'].get(self.order_field) or '')
+        return sorted(found, key=sort_key, reverse=self.descending)
+
+
+def _split(query: str, word: str) -> List[str]:
+    """Split on a boolean keyword outside quotes and parentheses"""
+    parts, depth, quoted, start = [], 0, False, 0
+    pattern = re.compile(rf'\s+{word}\s+', re.IGNORECASE)
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char == '"' and (i == 0 or query[i - 1] != '\\'):
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0:
+            match = pattern.match(query, i)
+            if match:
+                parts.append(query[start:i])
+                start = i = match.end()
+                continue
+        i += 1
+    parts.append(query[start:])
+    return parts
+
+
+def _key_order(key: str):
+    project, _, number = key.partition('-')
+    return project, int(number) if number.isdigit() else 0
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping pooled keep-alive connections is routine, not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeJiraServer:
+    """Threaded HTTP server; use as a context manager or start()/stop()"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: Optional[float] = None, rate_burst: Optional[int] = None,
+                 retry_after: float = 1.0, api_token: Optional[str] = None, strict_issues: bool = False,
+                 feed_page_size: int = 1000, seed: Optional[int] = None):
+        """
+        Args:
+            latency, jitter: Seconds added to every request (jitter is uniform random on top)
+            error_rate: Fraction of requests answered with a random 500/502/503
+            rate_limit: Requests per second before answering 429 (None for unlimited)
+            rate_burst: Token bucket size (defaults to one second of requests)
+            retry_after: Retry-After seconds sent with 429s
+            api_token: If set, requests must use basic auth with this password
+            strict_issues: Reject worklogs for issues the server doesn't know
+            feed_page_size: Changes per page of the worklog/updated and worklog/deleted feeds
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst or max(1, int(rate_limit or 1))
+        self.retry_after = retry_after
+        self.api_token = api_token
+        self.strict_issues = strict_issues
+        self.feed_page_size = feed_page_size
+
+        self.issues = {}
+        self.worklogs = {}
+        self.deleted = []
+        self.requests = 0
+        self.throttled = 0
+        self.injected = 0
+        self.calls = Counter()
+        self._ids = itertools.count(10000)
+        self._random = random.Random(seed)
+        self._failures = deque()
+        self._tokens = float(self.rate_burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakeJiraServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='fake-jira', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Test data and failure control
+    # ------------------------------------------------------------------
+
+    def add_issue(self, key: str, summary: Optional[str] = None, status: str = 'To Do',
+                  assignee: Optional[str] = None, issue_type: str = 'Task',
+                  description: str = '', updated: Optional[datetime] = None) -> Dict:
+        """Create or replace an issue; ``assignee`` is an email address"""
+        project = key.rsplit('-', 1)[0]
+        updated = updated or datetime.now(timezone.utc)
+        issue = {
+            'id': str(len(self.issues) + 10000),
+            'key': key,
+            'fields': {
+                'summary': summary if summary is not None else f'{key} summary',
+                'description': description,
+                'status': {'name': status},
+                'assignee': {
+                    'accountId': f'acct-{assignee}',
+                    'displayName': assignee.split('@')[0].replace('.', ' ').title(),
+                    'emailAddress': assignee,
+                } if assignee else None,
+                'issuetype': {'name': issue_type},
+                'project': {'key': project, 'name': project.title()},
+                'created': _jira_time(updated - timedelta(days=7)),
+                'updated': _jira_time(updated),
+            },
+        }
+        with self._lock:
+            self.issues[key] = issue
+        return issue
+
+    def seed_issues(self, projects: Iterable[str] = ('PLAT', 'WEB', 'OPS'), per_project: int = 400,
+                    assignee: Optional[str] = None, days: int = 180):
+        """Fill every project with ``per_project`` issues with varied summaries and update times"""
+        now = datetime.now(timezone.utc)
+        for project in projects:
+            for number in range(1, per_project + 1):
+                self.add_issue(
+                    f'{project}-{number}',
+                    summary=' '.join(self._random.sample(WORDS, 3)).capitalize(),
+                    status=self._random.choice(STATUSES),
+                    assignee=assignee if assignee and self._random.random() < 0.3 else None,
+                    issue_type=self._random.choice(ISSUE_TYPES),
+                    updated=now - timedelta(minutes=self._random.randint(0, days * 24 * 60))
+                )
+
+    def inject(self, status: int, count: int = 1, path: Optional[str] = None,
+               method: Optional[str] = None, retry_after: Optional[float] = None):
+        """Fail the next ``count`` requests (matching the ``path`` regex / ``method``) with ``status``"""
+        with self._lock:
+            for _ in range(count):
+                self._failures.append((status, re.compile(path) if path else None, method, retry_after))
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = self.throttled = self.injected = 0
+            self.calls.clear()
+
+    def _touch(self, worklog: dict):
+        worklog['updatedMs'] = int(time.time() * 1000)
+        worklog['updated'] = _jira_time(datetime.now(timezone.utc))
+
+    def _take_token(self) -> bool:
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_burst, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _failure_for(self, method: str, path: str):
+        """Status (and Retry-After) to fail this request with, or None"""
+        with self._lock:
+            for index, (status, pattern, wanted_method, retry_after) in enumerate(self._failures):
+                if (pattern is None or pattern.search(path)) and (wanted_method in (None, method)):
+                    del self._failures[index]
+                    self.injected += 1
+                    return status, retry_after
+            if not self._take_token():
+                self.throttled += 1
+                return 429, self.retry_after
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.injected += 1
+                return self._random.choice((500, 502, 503)), None
+        return None
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def _search_issues(self, query: Dict, enhanced: bool):
+        try:
+            found = JQL(query.get('jql', '')).filter(list(self.issues.values()))
+        except JQLError as e:
+            return 400, {'errorMessages': [str(e)], 'warningMessages': []}
+        limit = min(int(query.get('maxResults') or 50), 5000)
+        if enhanced:
+            start = int(base64.urlsafe_b64decode(query['nextPageToken']).decode()) if query.get('nextPageToken') else 0
+            page = found[start:start + limit]
+            body = {'issues': page, 'isLast': start + limit >= len(found)}
+            if not body['isLast']:
+                body['nextPageToken'] = base64.urlsafe_b64encode(str(start + limit).encode()).decode()
+            return 200, body
+        start = int(query.get('startAt') or 0)
+        return 200, {'startAt': start, 'maxResults': limit, 'total': len(found), 'issues': found[start:start + limit]}
+
+    def _feed(self, feed: str, query: Dict):
+        since = int(query.get('since') or 0)
+        with self._lock:
+            if feed == 'deleted':
+                changes = [(worklog_id, ms) for worklog_id, ms in self.deleted if ms > since]
+            else:
+                changes = [(w['id'], w['updatedMs']) for w in self.worklogs.values() if w['updatedMs'] > since]
+        changes.sort(key=lambda change: change[1])
+        page = changes[:self.feed_page_size]
+        return {
+            'values': [{'worklogId': int(worklog_id), 'updatedTime': ms} for worklog_id, ms in page],
+            'since': since,
+            'until': page[-1][1] if page else since,
+            'lastPage': len(changes) <= self.feed_page_size,
+        }
+
+    def _dispatch(self, method: str, path: str, query: Dict, body) -> tuple:
+        """(status, body) for a request; the per-endpoint call count is kept in ``calls``"""
+        routes = (
+            ('GET', SERVER_INFO_PATH, 'serverInfo'),
+            ('GET', MYSELF_PATH, 'myself'),
+            ('GET', SEARCH_PATH, 'search'),
+            ('POST', WORKLOG_LIST_PATH, 'worklog/list'),
+            ('GET', FEED_PATH, 'worklog/feed'),
+            (None, WORKLOG_PATH, 'worklog'),
+            ('GET', ISSUE_PATH, 'issue'),
+        )
+        for wanted, pattern, name in routes:
+            match = pattern.match(path)
+            if match and wanted in (None, method):
+                with self._lock:
+                    self.calls[f'{method} {name}'] += 1
+                return getattr(self, '_' + name.replace('/', '_'))(method, match, query, body)
+        return 404, {'errorMessages': ['Not found']}
+
+    def _serverInfo(self, method, match, query, body):
+        return 200, {'version': '1001.0.0', 'deploymentType': 'Cloud', 'serverTitle': 'Fake JIRA'}
+
+    def _myself(self, method, match, query, body):
+        return 200, {'accountId': 'acct-fake', 'emailAddress': 'fake@example.com',
+                     'displayName': 'Fake User', 'active': True, 'timeZone': 'UTC'}
+
+    def _search(self, method, match, query, body):
+        return self._search_issues(query, enhanced=bool(match.group('enhanced')))
+
+    def _issue(self, method, match, query, body):
+        issue = self.issues.get(unquote(match.group('key')).upper())
+        if issue is None:
+            return 404, {'errorMessages': ['Issue does not exist or you do not have permission to see it.'],
+                         'errors': {}}
+        return 200, issue
+
+    def _worklog_feed(self, method, match, query, body):
+        return 200, self._feed(match.group('feed'), query)
+
+    def _worklog_list(self, method, match, query, body):
+        ids = {str(i) for i in (body or {}).get('ids', [])}
+        with self._lock:
+            return 200, [dict(w) for w in self.worklogs.values() if w['id'] in ids]
+
+    def _worklog(self, method, match, query, body):
+        key = unquote(match.group('key'))
+        if self.strict_issues and key not in self.issues:
+            return 404, {'errorMessages': ['Issue does not exist or you do not have permission to see it.']}
+        worklog_id = match.group('id')
+
+        if worklog_id is None:
+            if method == 'GET':
+                with self._lock:
+                    worklogs = [dict(w) for w in self.worklogs.values() if w['issueKey'] == key]
+                return 200, {'startAt': 0, 'maxResults': len(worklogs), 'total': len(worklogs), 'worklogs': worklogs}
+            if method == 'POST':
+                if not (body or {}).get('timeSpentSeconds') or not body.get('started'):
+                    return 400, {'errorMessages': [], 'errors': {'timeLogged': 'You must indicate the time spent working.'}}
+                worklog_id = str(next(self._ids))
+                with self._lock:
+                    worklog = self.worklogs[worklog_id] = dict(body, id=worklog_id, issueKey=key, issueId=key)
+                    self._touch(worklog)
+                return 201, dict(worklog)
+            return 405, {'errorMessages': [f'Method {method} not allowed']}
+
+        with self._lock:
+            worklog = self.worklogs.get(worklog_id)
+            if worklog is None or worklog['issueKey'] != key:
+                return 404, {'errorMessages': ['Cannot find worklog with id: ' + worklog_id]}
+            if method == 'GET':
+                return 200, dict(worklog)
+            if method == 'PUT':
+                worklog.update(body or {})
+                self._touch(worklog)
+                return 200, dict(worklog)
+            if method == 'DELETE':
+                self.worklogs.pop(worklog_id)
+                self.deleted.append((worklog_id, int(time.time() * 1000)))
+                return 204, None
+        return 405, {'errorMessages': [f'Method {method} not allowed']}
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    def _authorized(self, header: Optional[str]) -> bool:
+        if self.api_token is None:
+            return True
+        if not header or not header.startswith('Basic '):
+            return False
+        try:
+            _, _, password = base64.b64decode(header[6:]).decode().partition(':')
+        except (ValueError, UnicodeDecodeError):
+            return False
+        return password == self.api_token
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body=None, headers: Optional[Dict] = None):
+                payload = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _handle(self):
+                # Always read the body first so keep-alive connections stay in step
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                with server._lock:
+                    server.requests += 1
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + server._random.uniform(0, server.jitter))
+
+                parts = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                failure = server._failure_for(self.command, parts.path)
+                if failure is not None:
+                    status, retry_after = failure
+                    headers = {'Retry-After': f'{retry_after:g}'} if retry_after is not None else None
+                    message = 'Rate limit exceeded' if status == 429 else 'Injected failure'
+                    return self._send(status, {'errorMessages': [message]}, headers)
+                if not server._authorized(self.headers.get('Authorization')):
+                    return self._send(401, {'errorMessages': ['You are not authenticated.']})
+
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    return self._send(400, {'errorMessages': ['Invalid JSON body']})
+                status, response = server._dispatch(self.command, parts.path, query, body)
+                self._send(status, response)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        return Handler
+
+
+
+try:
+    import pytest
+except ImportError:  # Only needed when loaded as a pytest plugin
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def fake_jira():
+        """A running FakeJiraServer, stopped after the test"""
+        with FakeJiraServer() as server:
+            yield server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Run a fake JIRA Cloud REST API for local testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every request.')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra delay, up to this much.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failed with 5xx.')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Requests per second before 429s.')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s.')
+    parser.add_argument('--projects', default='PLAT,WEB,OPS', help='Comma-separated project keys to create.')
+    parser.add_argument('--issues-per-project', type=int, default=400)
+    parser.add_argument('--assignee', default=None, help='Email some issues are assigned to.')
+    parser.add_argument('--api-token', default=None, help='Require basic auth with this token.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args(argv)
+
+    server = FakeJiraServer(
+        args.host, args.port,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        api_token=args.api_token,
+        seed=args.seed
+    )
+    projects = [p.strip().upper() for p in args.projects.split(',') if p.strip()]
+    server.seed_issues(projects, args.issues_per_project, assignee=args.assignee)
+    print(f"Fake JIRA serving {len(server.issues)} issues on {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"{server.requests} requests, {server.throttled} throttled, {server.injected} failed on purpose")
+        for call, count in sorted(server.calls.items()):
+            print(f"  {call}: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+End-to-end route benchmarks.
+
+Drives every route in ``routes/auth.py``, ``routes/time_records.py`` and
+``routes/jira.py`` through the Flask test client against data created by
+``flask seed-bench`` and reports latency percentiles and SQL statements per
+request (from the ``X-Query-Count`` header). Results can be written to JSON
+and compared against a previous run so regressions show up as numbers.
+
+Routes that call JIRA go to the ``jira_url`` stored on the bench user's
+connection, so point it at a local fake server to include upstream latency.
+The same scenarios run as pytest-benchmark tests in
+``tests/test_route_benchmarks.py``.
+Set ``JIRA_ENCRYPTION_KEY`` for both ``seed-bench`` and ``bench`` so the
+stored API tokens can be decrypted.
+"""
+from typing import Callable, Dict, List, Optional
+import json
+import logging
+import statistics
+import time
+import uuid
+
+from models.user import User
+from models.time_record import TimeRecord
+from models.jira import JiraConnection
+from bench.seed import BENCH_PASSWORD
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+
+
+class Scenario:
+    """One benchmarked route call"""
+
+    def __init__(self, name: str, method: str, path: Callable[[Dict], str],
+                 body: Optional[Callable[[Dict], Dict]] = None,
+                 setup: Optional[Callable[[Dict], Dict]] = None,
+                 token: str = 'access'):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.setup = setup
+        self.token = token
+
+
+class BenchContext(dict):
+    """Shared state for scenarios: tokens, ids and the test client"""
+
+
+def _new_record(ctx: BenchContext) -> Dict:
+    response = ctx['client'].post('/api/timerecords', headers=ctx['headers'], json={
+        'domain_id': ctx['domain_id'],
+        'category_id': ctx['category_id'],
+        'title_id': ctx['title_id'],
+        'timein': '2024-01-02T09:00:00.000Z',
+        'jira_issue_key': 'PLAT-1',
+    })
+    return {'record_id': response.get_json()['id']}
+
+
+def _fresh_tokens(ctx: BenchContext) -> Dict:
+    response = ctx['client'].post('/api/login', json={
+        'username': ctx['username'], 'password': BENCH_PASSWORD
+    })
+    return {'refresh_token': response.get_json()['refresh_token']}
+
+
+def _day_range(ctx: BenchContext) -> str:
+    return (f"/api/timerecords?start_date={ctx['day_start']}"
+            f"&end_date={ctx['day_end']}")
+
+
+SCENARIOS: List[Scenario] = [
+    # auth
+    Scenario('auth.register', 'POST', lambda c: '/api/register',
+             body=lambda c: {'username': f'bench_{uuid.uuid4().hex[:12]}', 'password': 'pw'}, token=None),
+    Scenario('auth.login', 'POST', lambda c: '/api/login',
+             body=lambda c: {'username': c['username'], 'password': BENCH_PASSWORD}, token=None),
+    Scenario('auth.refresh', 'POST', lambda c: '/api/refresh', setup=_fresh_tokens, token='refresh'),
+    Scenario('auth.logout', 'POST', lambda c: '/api/logout', setup=_fresh_tokens, token='refresh'),
+
+    # time records
+    Scenario('time_records.list_all', 'GET', lambda c: '/api/timerecords'),
+    Scenario('time_records.list_day', 'GET', _day_range),
+    Scenario('time_records.attributes', 'GET', lambda c: '/api/recordattributes'),
+    Scenario('time_records.create', 'POST', lambda c: '/api/timerecords', body=lambda c: {
+        'domain_id': c['domain_id'], 'category_id': c['category_id'], 'title_id': c['title_id'],
+        'timein': '2024-01-02T09:00:00.000Z',
+    }),
+    Scenario('time_records.update', 'PUT', lambda c: f"/api/timerecords/{c['record_id']}", body=lambda c: {
+        'domain_id': c['domain_id'], 'category_id': c['category_id'], 'title_id': c['title_id'],
+        'timein': '2024-01-02T09:00:00.000Z', 'timeout': '2024-01-02T10:00:00.000Z',
+        'jira_issue_key': 'PLAT-1',
+    }),
+    Scenario('time_records.delete', 'DELETE', lambda c: f"/api/timerecords/{c['record_id']}", setup=_new_record),
+    Scenario('time_records.update_attribute', 'PUT', lambda c: f"/api/recordattributes/{c['title_id']}",
+             body=lambda c: {'color': '#336699'}),
+
+    # jira
+    Scenario('jira.get_connections', 'GET', lambda c: '/api/jira/connections'),
+    Scenario('jira.create_connection', 'POST', lambda c: '/api/jira/connections', body=lambda c: {
+        'jira_url': c['jira_url'], 'email': 'bench@example.com', 'api_token': 'bench-token'
+    }),
+    Scenario('jira.update_connection', 'PUT', lambda c: f"/api/jira/connections/{c['connection_id']}",
+             body=lambda c: {'email': 'bench@example.com'}),
+    Scenario('jira.test_connection', 'POST', lambda c: f"/api/jira/connections/{c['connection_id']}/test"),
+    Scenario('jira.search_issues', 'GET', lambda c: '/api/jira/issues/search?q=PLAT-1'),
+    Scenario('jira.get_issue', 'GET', lambda c: '/api/jira/issues/PLAT-1'),
+    Scenario('jira.get_assigned_issues', 'GET', lambda c: '/api/jira/issues/assigned'),
+    Scenario('jira.sync_record', 'POST', lambda c: f"/api/jira/sync/record/{c['record_id']}"),
+    Scenario('jira.bulk_sync', 'POST', lambda c: '/api/jira/sync/bulk',
+             body=lambda c: {'record_ids': c['bulk_ids']}),
+    Scenario('jira.sync_history', 'GET', lambda c: '/api/jira/sync/history'),
+    Scenario('jira.delete_worklog', 'DELETE', lambda c: f"/api/jira/worklog/{c['record_id']}"),
+]
+
+
+def prepare_context(app, client, username: str, bulk_size: int) -> BenchContext:
+    """Log in as the bench user and collect the ids the scenarios need"""
+    ctx = BenchContext(client=client, username=username)
+    response = client.post('/api/login', json={'username': username, 'password': BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f"Cannot log in as {username}; run 'flask seed-bench' first")
+    tokens = response.get_json()
+    ctx['headers'] = {'Authorization': f"Bearer {tokens['access_token']}"}
+
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        record = TimeRecord.query.filter(
+            TimeRecord.user_id == user.id,
+            TimeRecord.timeout.isnot(None)
+        ).order_by(TimeRecord.timein.desc()).first()
+        connection = JiraConnection.query.filter_by(user_id=user.id).first()
+        bulk_ids = [r.id for r in TimeRecord.query.filter(
+            TimeRecord.user_id == user.id,
+            TimeRecord.jira_issue_key.isnot(None),
+            TimeRecord.timeout.isnot(None)
+        ).order_by(TimeRecord.timein.desc()).limit(bulk_size).all()]
+
+        ctx.update(
+            domain_id=record.domain_id,
+            category_id=record.category_id,
+            title_id=record.title_id,
+            record_id=record.id,
+            connection_id=connection.id,
+            jira_url=connection.jira_url,
+            bulk_ids=bulk_ids,
+            day_start=(record.timein.replace(hour=0, minute=0, second=0)).strftime(DATE_FORMAT),
+            day_end=(record.timein.replace(hour=23, minute=59, second=59)).strftime(DATE_FORMAT),
+        )
+    return ctx
+
+
+def scenario_context(scenario: Scenario, ctx: BenchContext) -> BenchContext:
+    """Context for one call, after the scenario's (untimed) setup"""
+    local = BenchContext(ctx)
+    if scenario.setup:
+        local.update(scenario.setup(local))
+    return local
+
+
+def call_scenario(client, scenario: Scenario, local: BenchContext):
+    """Make the scenario's request; returns the response"""
+    headers = {}
+    if scenario.token == 'access':
+        headers = local['headers']
+    elif scenario.token == 'refresh':
+        headers = {'Authorization': f"Bearer {local['refresh_token']}"}
+
+    kwargs = {'headers': headers}
+    if scenario.body:
+        kwargs['json'] = scenario.body(local)
+    return client.open(scenario.path(local), method=scenario.method, **kwargs)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmarks(app, username: str = 'bench_user_0', iterations: int = 20,
+                   bulk_size: int = 20, only: Optional[str] = None) -> Dict[str, Dict]:
+    """Run every scenario ``iterations`` times; returns stats keyed by scenario name"""
+    # Per-request log lines would dominate the measurements
+    logging.getLogger('services.instrumentation').setLevel(logging.WARNING)
+
+    client = app.test_client()
+    ctx = prepare_context(app, client, username, bulk_size)
+    results = {}
+
+    for scenario in SCENARIOS:
+        if only and only not in scenario.name:
+            continue
+
+        latencies = []
+        queries = []
+        statuses = set()
+        for _ in range(iterations):
+            local = scenario_context(scenario, ctx)
+            started = time.perf_counter()
+            response = call_scenario(client, scenario, local)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(int(response.headers.get('X-Query-Count', 0)))
+            statuses.add(response.status_code)
+
+        results[scenario.name] = {
+            'iterations': iterations,
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(_percentile(latencies, 95), 3),
+            'max_ms': round(max(latencies), 3),
+            'queries': statistics.median(queries),
+            'statuses': sorted(statuses),
+        }
+
+    return results
+
+
+def format_results(results: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None) -> str:
+    lines = [f"{'scenario':34} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'queries':>8}  status"]
+    for name, stats in results.items():
+        line = (f"{name:34} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} "
+                f"{stats['max_ms']:9.2f} {stats['queries']:8g}  {','.join(map(str, stats['statuses']))}")
+        if baseline and name in baseline:
+            before = baseline[name]
+            line += f"  (p50 {before['p50_ms']:.2f}, queries {before['queries']:g})"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def find_regressions(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                     tolerance: float = 0.25) -> List[str]:
+    """Scenarios whose median latency or query count grew beyond the tolerance"""
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if stats['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']:g} -> {stats['queries']:g}")
+        if stats['p50_ms'] > before['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before['p50_ms']:.2f}ms -> {stats['p50_ms']:.2f}ms")
+    return regressions
+
+
+def load_results(path: str) -> Dict[str, Dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(path: str, results: Dict[str, Dict]):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,171 @@
+"""
+Synthetic data generator for benchmarking.
+
+Creates ``bench_user_<n>`` users (password ``bench``) with a three-level
+attribute hierarchy and ``records_per_day`` time records for every weekday
+over the last ``years`` years. Records carry notes, external links and JIRA
+issue keys at realistic rates, some are already synced, and every user is
+left with one open timer.
+"""
+from datetime import datetime, timedelta, timezone
+import random
+
+from sqlalchemy import insert
+from database import db
+from models.user import User
+from models.time_record import TimeRecord, RecordAttribute
+from models.jira import JiraConnection
+
+BENCH_PASSWORD = 'bench'
+
+DOMAINS = {
+    'work': {
+        'Platform': ['API design', 'Code review', 'Incident follow-up', 'Database tuning'],
+        'Frontend': ['Calendar view', 'Reports', 'Accessibility'],
+        'Meetings': ['Standup', 'Planning', 'Retro', '1:1'],
+    },
+    'home': {
+        'Timecard app': ['Database structure', 'Deploy', 'Bug fixes'],
+        'Chores': ['Groceries', 'Laundry'],
+    },
+    'learning': {
+        'Reading': ['Papers', 'Books'],
+        'Courses': ['Distributed systems', 'Compilers'],
+    },
+}
+
+PROJECT_KEYS = ['PLAT', 'WEB', 'OPS']
+
+NOTES = [
+    'Paired on the migration',
+    'Follow-up from yesterday',
+    'Investigated slow query on record list',
+    'Reviewed two PRs',
+    'Wrote docs for the new endpoint',
+]
+
+
+def _create_attributes(user_id: int):
+    """Create the attribute hierarchy for a user; returns (domain_id, category_id, title_id, is_work) tuples"""
+    triples = []
+    for domain_name, categories in DOMAINS.items():
+        domain = RecordAttribute(user_id=user_id, name=domain_name, level_num=1)
+        db.session.add(domain)
+        db.session.flush()
+        for category_name, titles in categories.items():
+            category = RecordAttribute(user_id=user_id, name=category_name, parent_id=domain.id, level_num=2)
+            db.session.add(category)
+            db.session.flush()
+            for title_name in titles:
+                title = RecordAttribute(user_id=user_id, name=title_name, parent_id=category.id, level_num=3)
+                db.session.add(title)
+                db.session.flush()
+                triples.append((domain.id, category.id, title.id, domain_name == 'work'))
+    return triples
+
+
+def _records_for_user(user_id: int, connection_id: int, triples, start: datetime, end: datetime,
+                      records_per_day: int, rng: random.Random):
+    rows = []
+    day = start
+    while day < end:
+        if day.weekday() < 5:
+            cursor = day.replace(hour=8, minute=rng.randint(0, 30))
+            for _ in range(records_per_day):
+                domain_id, category_id, title_id, is_work = rng.choice(triples)
+                duration = timedelta(minutes=rng.choice([5, 15, 25, 30, 45, 60, 90, 120]))
+                timein = cursor
+                timeout = timein + duration
+                cursor = timeout + timedelta(minutes=rng.randint(0, 20))
+
+                jira_issue_key = None
+                jira_synced = False
+                jira_worklog_id = None
+                last_synced_at = None
+                if is_work and rng.random() < 0.6:
+                    jira_issue_key = f'{rng.choice(PROJECT_KEYS)}-{rng.randint(1, 400)}'
+                    if rng.random() < 0.7:
+                        jira_synced = True
+                        jira_worklog_id = str(rng.randint(10000, 999999))
+                        last_synced_at = timeout + timedelta(hours=1)
+
+                rows.append({
+                    'user_id': user_id,
+                    'domain_id': domain_id,
+                    'category_id': category_id,
+                    'title_id': title_id,
+                    'timein': timein,
+                    'timeout': timeout,
+                    'notes': rng.choice(NOTES) if rng.random() < 0.3 else None,
+                    'external_link': 'https://example.com/ticket' if rng.random() < 0.05 else None,
+                    'jira_issue_key': jira_issue_key,
+                    'jira_worklog_id': jira_worklog_id,
+                    'jira_connection_id': connection_id if jira_worklog_id else None,
+                    'jira_synced': jira_synced,
+                    'last_synced_at': last_synced_at,
+                })
+        day += timedelta(days=1)
+    return rows
+
+
+def seed_bench_data(users: int, years: float, records_per_day: int,
+                    jira_url: str, seed: int = 0, batch_size: int = 5000) -> int:
+    """Generate benchmark data; returns the number of time records created"""
+    rng = random.Random(seed)
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    start = end - timedelta(days=int(365 * years))
+
+    # bcrypt is slow; hash once and reuse for every bench user
+    template = User(username='template')
+    template.set_password(BENCH_PASSWORD)
+
+    total = 0
+    for n in range(users):
+        username = f'bench_user_{n}'
+        if User.query.filter_by(username=username).first():
+            continue
+
+        user = User(username=username, password_hash=template.password_hash,
+                    email=f'{username}@example.com')
+        db.session.add(user)
+        db.session.flush()
+
+        triples = _create_attributes(user.id)
+
+        connection = JiraConnection(
+            user_id=user.id,
+            jira_url=jira_url.rstrip('/'),
+            email=user.email,
+            auth_type='api_token',
+            is_active=True
+        )
+        connection.set_api_token('bench-token')
+        db.session.add(connection)
+        db.session.flush()
+
+        rows = _records_for_user(user.id, connection.id, triples, start, end, records_per_day, rng)
+
+        # Leave an open timer running
+        domain_id, category_id, title_id, _ = triples[0]
+        rows.append({
+            'user_id': user.id,
+            'domain_id': domain_id,
+            'category_id': category_id,
+            'title_id': title_id,
+            'timein': end - timedelta(minutes=20),
+            'timeout': None,
+            'notes': None,
+            'external_link': None,
+            'jira_issue_key': f'{PROJECT_KEYS[0]}-1',
+            'jira_worklog_id': None,
+            'jira_connection_id': None,
+            'jira_synced': False,
+            'last_synced_at': None,
+        })
+
+        for i in range(0, len(rows), batch_size):
+            db.session.execute(insert(TimeRecord), rows[i:i + batch_size])
+        db.session.commit()
+        total += len(rows)
+
+    return total
@@ -0,0 +1,119 @@
+"""
+Bulk sync throughput benchmark against a local fake JIRA server.
+
+Points the bench user's connection at a FakeJiraServer with a fixed
+per-request latency, then times ``POST /api/jira/sync/bulk`` over the same
+records at several concurrency caps. The server can also throttle
+(``rate_limit``, answered with 429s) and fail a fraction of requests
+(``error_rate``) to measure how the pacing and retries cope.
+"""
+from typing import Dict, List, Optional
+import logging
+import time
+
+from database import db
+from models.user import User
+from models.time_record import TimeRecord
+from models.jira import JiraConnection, JiraSyncLog
+from services.jira_client_pool import client_pool
+from services.jira_rate_limit import reset_limiters
+from bench.fake_jira import FakeJiraServer
+from bench.seed import BENCH_PASSWORD
+
+
+def _reset_records(record_ids: List[int]):
+    JiraSyncLog.query.filter(JiraSyncLog.time_record_id.in_(record_ids)).delete(synchronize_session=False)
+    TimeRecord.query.filter(TimeRecord.id.in_(record_ids)).update({
+        'jira_synced': False,
+        'jira_worklog_id': None,
+        'jira_sync_error': None,
+        'last_synced_at': None,
+        'jira_sync_hash': None,
+        'jira_connection_id': None,
+    }, synchronize_session=False)
+    db.session.commit()
+
+
+def run_sync_benchmark(app, username: str = 'bench_user_0', records: int = 200,
+                       latency_ms: float = 50, concurrency: List[int] = (1, 4, 8, 16),
+                       rate_limit: Optional[float] = None, error_rate: float = 0.0) -> List[Dict]:
+    """Time bulk sync of ``records`` records at each concurrency cap"""
+    logging.getLogger('services.instrumentation').setLevel(logging.WARNING)
+
+    results = []
+    server = FakeJiraServer(latency=latency_ms / 1000, rate_limit=rate_limit, error_rate=error_rate, seed=0)
+    with server:
+        with app.app_context():
+            user = User.query.filter_by(username=username).first()
+            if user is None:
+                raise RuntimeError(f"Unknown user {username}; run 'flask seed-bench' first")
+            connection = JiraConnection.query.filter_by(user_id=user.id, is_active=True).first()
+            connection_id = connection.id
+            original_url = connection.jira_url
+            connection.jira_url = server.url
+            db.session.commit()
+
+            record_ids = [r.id for r in TimeRecord.query.filter(
+                TimeRecord.user_id == user.id,
+                TimeRecord.jira_issue_key.isnot(None),
+                TimeRecord.timeout.isnot(None)
+            ).order_by(TimeRecord.timein.desc()).limit(records).all()]
+
+        client = app.test_client()
+        tokens = client.post('/api/login', json={'username': username, 'password': BENCH_PASSWORD}).get_json()
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        original_concurrency = app.config.get('JIRA_SYNC_CONCURRENCY')
+        original_mode = app.config.get('JIRA_SYNC_MODE')
+        original_rate = app.config.get('JIRA_RATE_LIMIT_PER_SECOND')
+        # Measure the sync itself rather than the enqueue, with only the concurrency cap limiting it
+        app.config['JIRA_SYNC_MODE'] = 'inline'
+        app.config['JIRA_RATE_LIMIT_PER_SECOND'] = 10000
+
+        try:
+            for limit in concurrency:
+                with app.app_context():
+                    _reset_records(record_ids)
+                app.config['JIRA_SYNC_CONCURRENCY'] = limit
+                # Limiters are sized on first use; start each run fresh
+                client_pool.clear()
+                reset_limiters()
+
+                server.reset_stats()
+                started = time.perf_counter()
+                response = client.post('/api/jira/sync/bulk', headers=headers, json={'record_ids': record_ids})
+                elapsed = time.perf_counter() - started
+                body = response.get_json() or {}
+                results.append({
+                    'concurrency': limit,
+                    'records': len(record_ids),
+                    'seconds': round(elapsed, 3),
+                    'records_per_second': round(len(record_ids) / elapsed, 1) if elapsed else None,
+                    'succeeded': body.get('succeeded'),
+                    'failed': body.get('failed'),
+                    'upstream_calls': server.requests,
+                    'throttled': server.throttled,
+                    'injected_errors': server.injected,
+                    'queries': int(response.headers.get('X-Query-Count', 0)),
+                })
+        finally:
+            app.config['JIRA_SYNC_CONCURRENCY'] = original_concurrency
+            app.config['JIRA_SYNC_MODE'] = original_mode
+            app.config['JIRA_RATE_LIMIT_PER_SECOND'] = original_rate
+            client_pool.clear()
+            reset_limiters()
+            with app.app_context():
+                connection = db.session.get(JiraConnection, connection_id)
+                connection.jira_url = original_url
+                db.session.commit()
+
+    return results
+
+
+def format_sync_results(results: List[Dict]) -> str:
+    lines = [f"{'concurrency':>11} {'records':>8} {'seconds':>8} {'rec/s':>7} {'ok':>5} {'failed':>6} "
+             f"{'calls':>6} {'429s':>5} {'5xx':>5} {'queries':>8}"]
+    for r in results:
+        lines.append(f"{r['concurrency']:>11} {r['records']:>8} {r['seconds']:>8.2f} {r['records_per_second']:>7} "
+                     f"{r['succeeded']:>5} {r['failed']:>6} {r['upstream_calls']:>6} {r['throttled']:>5} "
+                     f"{r['injected_errors']:>5} {r['queries']:>8}")
+    return '\n'.join(lines)
@@ -9,4 +9,76 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=15)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # How often each process pulls revoked token families from the database
+    JWT_REVOCATION_SYNC_SECONDS = int(os.getenv('JWT_REVOCATION_SYNC_SECONDS', 30))
+    # Window in which a rotated refresh token may be presented again (parallel refreshes)
+    JWT_REFRESH_REUSE_GRACE_SECONDS = int(os.getenv('JWT_REFRESH_REUSE_GRACE_SECONDS', 10))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Requests slower than this get a warning log with a stack sample (0 disables)
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 1000))
+    # Shared directory for per-worker metric snapshots (needed with several gunicorn workers)
+    METRICS_DIR = os.getenv('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = int(os.getenv('METRICS_FLUSH_SECONDS', 5))
+    # Optional bearer token required to scrape /metrics
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # Comma-separated Fernet keys for stored JIRA tokens: the first encrypts, all decrypt.
+    # Rotate by prepending a new key, then run `flask jira-rotate-keys` and drop the old one
+    JIRA_ENCRYPTION_KEY = os.getenv('JIRA_ENCRYPTION_KEY')
+    # Decrypted tokens kept in memory (zeroed when evicted)
+    JIRA_TOKEN_CACHE_SIZE = int(os.getenv('JIRA_TOKEN_CACHE_SIZE', 1024))
+    # Maximum concurrent JIRA calls per connection during bulk sync
+    JIRA_SYNC_CONCURRENCY = int(os.getenv('JIRA_SYNC_CONCURRENCY', 8))
+    # Connections synced side by side by one bulk sync or inline auto-sync pass (a thread each)
+    JIRA_SYNC_PARALLEL_CONNECTIONS = int(os.getenv('JIRA_SYNC_PARALLEL_CONNECTIONS', 4))
+    # "queue" hands bulk syncs to `flask jira-worker`; "inline" runs them in the request
+    JIRA_SYNC_MODE = os.getenv('JIRA_SYNC_MODE', 'queue')
+    # "async" writes sync-engine worklogs from one asyncio event loop per process instead of
+    # a thread per call (needs httpx; HTTP/2 with h2); "threads" is the JiraService path
+    JIRA_HTTP_CLIENT = os.getenv('JIRA_HTTP_CLIENT', 'threads')
+    # Pooled JIRA clients are rebuilt after this many idle seconds
+    JIRA_CLIENT_TTL_SECONDS = int(os.getenv('JIRA_CLIENT_TTL_SECONDS', 300))
+    JIRA_CLIENT_POOL_SIZE = int(os.getenv('JIRA_CLIENT_POOL_SIZE', 256))
+    # Per-connection request rate; halved on each 429 and recovered on success
+    JIRA_RATE_LIMIT_PER_SECOND = float(os.getenv('JIRA_RATE_LIMIT_PER_SECOND', 10))
+    JIRA_RATE_LIMIT_BURST = int(os.getenv('JIRA_RATE_LIMIT_BURST', 20))
+    # Retries for 429/503 and transient connection errors (jittered exponential backoff)
+    JIRA_MAX_RETRIES = int(os.getenv('JIRA_MAX_RETRIES', 4))
+    JIRA_RETRY_BASE_SECONDS = float(os.getenv('JIRA_RETRY_BASE_SECONDS', 0.5))
+    JIRA_RETRY_MAX_SECONDS = float(os.getenv('JIRA_RETRY_MAX_SECONDS', 30))
+    # Retries for calls a user is waiting on (issue lookups, connection tests, worklog deletes)
+    JIRA_INTERACTIVE_MAX_RETRIES = int(os.getenv('JIRA_INTERACTIVE_MAX_RETRIES', 1))
+    JIRA_INTERACTIVE_RETRY_MAX_SECONDS = float(os.getenv('JIRA_INTERACTIVE_RETRY_MAX_SECONDS', 2))
+    # Pages of each worklog change feed one POST /jira/sync/reconcile reads per connection
+    JIRA_RECONCILE_MAX_PAGES = int(os.getenv('JIRA_RECONCILE_MAX_PAGES', 10))
+    # Explicit connect/read timeouts for JIRA calls (the client default is 75s)
+    JIRA_CONNECT_TIMEOUT_SECONDS = float(os.getenv('JIRA_CONNECT_TIMEOUT_SECONDS', 5))
+    JIRA_READ_TIMEOUT_SECONDS = float(os.getenv('JIRA_READ_TIMEOUT_SECONDS', 30))
+    # Consecutive failures that open a connection's circuit breaker, and how long it stays open
+    JIRA_BREAKER_FAILURES = int(os.getenv('JIRA_BREAKER_FAILURES', 5))
+    JIRA_BREAKER_RESET_SECONDS = float(os.getenv('JIRA_BREAKER_RESET_SECONDS', 30))
+    # Issue search/lookup results are fresh for the TTL, then served stale while refreshing
+    JIRA_CACHE_TTL_SECONDS = int(os.getenv('JIRA_CACHE_TTL_SECONDS', 60))
+    JIRA_CACHE_STALE_SECONDS = int(os.getenv('JIRA_CACHE_STALE_SECONDS', 300))
+    JIRA_CACHE_MAX_ENTRIES = int(os.getenv('JIRA_CACHE_MAX_ENTRIES', 5000))
+    # Local FTS index for issue typeahead (defaults to instance/jira_issue_index.db)
+    JIRA_ISSUE_INDEX_PATH = os.getenv('JIRA_ISSUE_INDEX_PATH')
+    JIRA_ISSUE_INDEX_REFRESH_SECONDS = int(os.getenv('JIRA_ISSUE_INDEX_REFRESH_SECONDS', 120))
+    # An index not refreshed for this long no longer answers searches on its own
+    JIRA_ISSUE_INDEX_STALE_SECONDS = int(os.getenv('JIRA_ISSUE_INDEX_STALE_SECONDS', 900))
+    # How far back the first index build for a connection reaches, and how many issues a build or refresh fetches
+    JIRA_ISSUE_INDEX_DAYS = int(os.getenv('JIRA_ISSUE_INDEX_DAYS', 180))
+    JIRA_ISSUE_INDEX_MAX_ISSUES = int(os.getenv('JIRA_ISSUE_INDEX_MAX_ISSUES', 10000))
+    # `flask jira-autosync`: seconds between passes and records queued per connection per pass
+    JIRA_AUTOSYNC_INTERVAL_SECONDS = int(os.getenv('JIRA_AUTOSYNC_INTERVAL_SECONDS', 300))
+    JIRA_AUTOSYNC_BATCH_SIZE = int(os.getenv('JIRA_AUTOSYNC_BATCH_SIZE', 100))
+    # Records are picked up this long after clock-out, and only if closed within the lookback
+    JIRA_AUTOSYNC_DELAY_MINUTES = int(os.getenv('JIRA_AUTOSYNC_DELAY_MINUTES', 15))
+    JIRA_AUTOSYNC_LOOKBACK_DAYS = int(os.getenv('JIRA_AUTOSYNC_LOOKBACK_DAYS', 30))
+    # Failed records are retried after this long
+    JIRA_AUTOSYNC_RETRY_MINUTES = int(os.getenv('JIRA_AUTOSYNC_RETRY_MINUTES', 60))
+    # No new auto-sync jobs while this many jobs are waiting for a worker
+    JIRA_AUTOSYNC_MAX_QUEUED = int(os.getenv('JIRA_AUTOSYNC_MAX_QUEUED', 20))
+    # Optional UTC time-of-day window for passes, e.g. "18:00-06:00"
+    JIRA_AUTOSYNC_WINDOW = os.getenv('JIRA_AUTOSYNC_WINDOW')
+    # Successful sync log entries older than this are compacted by `flask jira-compact-history`
+    JIRA_SYNC_LOG_RETENTION_DAYS = int(os.getenv('JIRA_SYNC_LOG_RETENTION_DAYS', 90))
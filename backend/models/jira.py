@@ -1,13 +1,6 @@
 from database import db
 from datetime import datetime, timezone
-from cryptography.fernet import Fernet
-import os
-
-# Get encryption key from environment (will be set in config)
-ENCRYPTION_KEY = os.getenv('JIRA_ENCRYPTION_KEY', Fernet.generate_key())
-if isinstance(ENCRYPTION_KEY, str):
-    ENCRYPTION_KEY = ENCRYPTION_KEY.encode()
-cipher = Fernet(ENCRYPTION_KEY)
+from services.secrets_vault import vault
 
 
 class JiraConnection(db.Model):
@@ -23,21 +16,26 @@ class JiraConnection(db.Model):
     oauth_access_token_encrypted = db.Column(db.Text, nullable=True)  # Encrypted OAuth token
     oauth_refresh_token_encrypted = db.Column(db.Text, nullable=True)  # Encrypted OAuth refresh token
     is_active = db.Column(db.Boolean, nullable=False, default=True)
+    auto_sync = db.Column(db.Boolean, nullable=False, default=False)  # Picked up by `flask jira-autosync`
+    aggregate_worklogs = db.Column(db.Boolean, nullable=False, default=False)  # One worklog per issue per day
+    worklogs_reconciled_until = db.Column(db.BigInteger, nullable=True)  # JIRA worklog feed watermark (epoch ms)
     created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
     # Relationship
     user = db.relationship('User', backref='jira_connections')
+    project_routes = db.relationship('JiraProjectRoute', backref='connection', cascade='all, delete-orphan',
+                                     order_by='JiraProjectRoute.project_key')
     
     def set_api_token(self, token: str):
         """Encrypt and store API token"""
         if token:
-            self.api_token_encrypted = cipher.encrypt(token.encode()).decode()
+            self.api_token_encrypted = vault.encrypt(token)
     
     def get_api_token(self) -> str | None:
         """Decrypt and return API token"""
         if self.api_token_encrypted:
-            return cipher.decrypt(self.api_token_encrypted.encode()).decode()
+            return vault.decrypt(self.api_token_encrypted)
         return None
     
     def set_encrypted_token(self, token: str):
@@ -56,18 +54,18 @@ class JiraConnection(db.Model):
     def set_oauth_tokens(self, access_token: str, refresh_token: str):
         """Encrypt and store OAuth tokens"""
         if access_token:
-            self.oauth_access_token_encrypted = cipher.encrypt(access_token.encode()).decode()
+            self.oauth_access_token_encrypted = vault.encrypt(access_token)
         if refresh_token:
-            self.oauth_refresh_token_encrypted = cipher.encrypt(refresh_token.encode()).decode()
+            self.oauth_refresh_token_encrypted = vault.encrypt(refresh_token)
     
     def get_oauth_tokens(self) -> tuple[str | None, str | None]:
         """Decrypt and return OAuth tokens"""
         access_token = None
         refresh_token = None
         if self.oauth_access_token_encrypted:
-            access_token = cipher.decrypt(self.oauth_access_token_encrypted.encode()).decode()
+            access_token = vault.decrypt(self.oauth_access_token_encrypted)
         if self.oauth_refresh_token_encrypted:
-            refresh_token = cipher.decrypt(self.oauth_refresh_token_encrypted.encode()).decode()
+            refresh_token = vault.decrypt(self.oauth_refresh_token_encrypted)
         return access_token, refresh_token
     
     def to_dict(self):
@@ -78,6 +76,9 @@ class JiraConnection(db.Model):
             'auth_type': self.auth_type,
             'email': self.email,
             'is_active': self.is_active,
+            'auto_sync': self.auto_sync,
+            'aggregate_worklogs': self.aggregate_worklogs,
+            'project_keys': [route.project_key for route in self.project_routes],
             'created_at': self.created_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.created_at else None,
             'updated_at': self.updated_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.updated_at else None,
         }
@@ -86,6 +87,24 @@ class JiraConnection(db.Model):
         return f'<JiraConnection {self.id}: {self.jira_url} (user={self.user_id})>'
 
 
+class JiraProjectRoute(db.Model):
+    """Send a JIRA project's issues (key prefix) to one of the user's connections"""
+    __tablename__ = 'jira_project_route'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    connection_id = db.Column(db.Integer, db.ForeignKey('jira_connection.id', ondelete='CASCADE'), nullable=False, index=True)
+    project_key = db.Column(db.String(50), nullable=False)  # e.g., "PROJ" for PROJ-123
+    
+    __table_args__ = (
+        # A project routes to at most one connection per user
+        db.Index('ix_jira_project_route_user_id_project_key', 'user_id', 'project_key', unique=True),
+    )
+    
+    def __repr__(self):
+        return f'<JiraProjectRoute {self.project_key} -> {self.connection_id} (user={self.user_id})>'
+
+
 class JiraSyncLog(db.Model):
     """Track history of JIRA worklog syncs"""
     __tablename__ = 'jira_sync_log'
@@ -94,10 +113,18 @@ class JiraSyncLog(db.Model):
     time_record_id = db.Column(db.Integer, db.ForeignKey('time_record.id'), nullable=False)
     jira_issue_key = db.Column(db.String(50), nullable=False)  # e.g., "PROJ-123"
     jira_worklog_id = db.Column(db.String(50), nullable=True)  # JIRA's worklog ID
-    sync_status = db.Column(db.String(20), nullable=False)  # "pending", "success", "failed"
+    sync_status = db.Column(db.String(20), nullable=False)  # "pending", "success", "failed", "drift"
     sync_error = db.Column(db.Text, nullable=True)  # Error message if failed
     synced_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     synced_by_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=1)  # >1 once older successes are compacted into this row
+    first_synced_at = db.Column(db.DateTime, nullable=True)  # Earliest attempt compacted into this row
+    
+    __table_args__ = (
+        db.Index('ix_jira_sync_log_time_record_id_synced_at', 'time_record_id', 'synced_at'),
+        db.Index('ix_jira_sync_log_sync_status_synced_at', 'sync_status', 'synced_at'),
+        db.Index('ix_jira_sync_log_synced_by_user_id_synced_at', 'synced_by_user_id', 'synced_at'),
+    )
     
     # Relationships
     time_record = db.relationship('TimeRecord', backref='sync_logs')
@@ -113,7 +140,78 @@ class JiraSyncLog(db.Model):
             'sync_error': self.sync_error,
             'synced_at': self.synced_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.synced_at else None,
             'synced_by_user_id': self.synced_by_user_id,
+            'attempts': self.attempts,
+            'first_synced_at': self.first_synced_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.first_synced_at else None,
         }
     
     def __repr__(self):
         return f'<JiraSyncLog {self.id}: {self.jira_issue_key} - {self.sync_status}>'
+
+
+class JiraSyncJob(db.Model):
+    """A queued bulk sync, processed by `flask jira-worker`"""
+    __tablename__ = 'jira_sync_job'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    connection_id = db.Column(db.Integer, db.ForeignKey('jira_connection.id', ondelete='CASCADE'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # "queued", "running", "completed", "failed"
+    total = db.Column(db.Integer, nullable=False, default=0)
+    succeeded = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)  # Set if the job itself failed
+    worker_id = db.Column(db.String(64), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_jira_sync_job_status_id', 'status', 'id'),
+        db.Index('ix_jira_sync_job_user_id', 'user_id'),
+    )
+    
+    items = db.relationship('JiraSyncJobItem', backref='job', cascade='all, delete-orphan',
+                            order_by='JiraSyncJobItem.id')
+    
+    def to_dict(self, include_items: bool = False):
+        data = {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'completed': self.succeeded + self.failed,
+            'error': self.error,
+            'created_at': self.created_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.created_at else None,
+            'started_at': self.started_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.started_at else None,
+            'finished_at': self.finished_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.finished_at else None,
+        }
+        if include_items:
+            data['items'] = [item.to_dict() for item in self.items]
+        return data
+    
+    def __repr__(self):
+        return f'<JiraSyncJob {self.id}: {self.status} ({self.succeeded + self.failed}/{self.total})>'
+
+
+class JiraSyncJobItem(db.Model):
+    """Per-record status within a JiraSyncJob"""
+    __tablename__ = 'jira_sync_job_item'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jira_sync_job.id', ondelete='CASCADE'), nullable=False, index=True)
+    time_record_id = db.Column(db.Integer, nullable=False)  # Not a FK: the record may be deleted while queued
+    status = db.Column(db.String(20), nullable=False, default='pending')  # "pending", "success", "failed"
+    jira_worklog_id = db.Column(db.String(50), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'record_id': self.time_record_id,
+            'status': self.status,
+            'worklog_id': self.jira_worklog_id,
+            'error': self.error,
+            'finished_at': self.finished_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.finished_at else None,
+        }
@@ -0,0 +1,26 @@
+from database import db
+from datetime import datetime, timezone
+
+
+class RefreshToken(db.Model):
+    """Server-side record of an issued refresh token.
+
+    Tokens issued from the same login share a ``family_id``. Each refresh
+    rotates the token: the presented one is marked used and a child is issued
+    in the same family. Presenting a used token again revokes the family.
+    """
+    __tablename__ = 'refresh_token'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
+    family_id = db.Column(db.String(36), nullable=False, index=True)
+    parent_jti = db.Column(db.String(36), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    issued_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    expires_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=True)  # Set when rotated
+    revoked_at = db.Column(db.DateTime, nullable=True, index=True)
+    revoked_reason = db.Column(db.String(20), nullable=True)  # "logout", "reuse"
+
+    def __repr__(self):
+        return f'<RefreshToken {self.jti} family={self.family_id} (user={self.user_id})>'
@@ -36,10 +36,26 @@ class TimeRecord(db.Model):
     
     # JIRA integration fields
     jira_issue_key = db.Column(db.String(50), nullable=True)  # e.g., "PROJ-123"
-    jira_worklog_id = db.Column(db.String(50), nullable=True)  # JIRA's worklog ID
+    jira_worklog_id = db.Column(db.String(50), nullable=True, index=True)  # JIRA's worklog ID
     jira_synced = db.Column(db.Boolean, nullable=False, default=False)
     jira_sync_error = db.Column(db.Text, nullable=True)
     last_synced_at = db.Column(db.DateTime, nullable=True)
+    jira_sync_hash = db.Column(db.String(64), nullable=True)  # Hash of the worklog last written to JIRA
+    jira_worklog_group = db.Column(db.String(64), nullable=True, index=True)  # "PROJ-123@2024-01-31" if the worklog is aggregated
+    jira_connection_id = db.Column(db.Integer, db.ForeignKey('jira_connection.id', ondelete='SET NULL'), nullable=True)  # Connection (JIRA site) holding the worklog
+
+    __table_args__ = (
+        # Closed, unsynced records for the auto-sync scheduler
+        db.Index('ix_time_record_jira_unsynced', 'jira_synced', 'timeout', 'jira_issue_key'),
+        # Partial index behind GET /jira/sync/pending: only records still waiting for JIRA
+        db.Index(
+            'ix_time_record_jira_pending', 'user_id',
+            sqlite_where=db.and_(jira_issue_key.isnot(None), jira_synced == False),  # noqa: E712
+            postgresql_where=db.and_(jira_issue_key.isnot(None), jira_synced == False)  # noqa: E712
+        ),
+        # Worklog ids are only unique within a JIRA site
+        db.Index('ix_time_record_jira_connection_worklog', 'jira_connection_id', 'jira_worklog_id'),
+    )
 
     domain = db.relationship('RecordAttribute', foreign_keys=[domain_id])
     category = db.relationship('RecordAttribute', foreign_keys=[category_id])
@@ -60,6 +76,8 @@ class TimeRecord(db.Model):
             'jira_synced': self.jira_synced,
             'jira_sync_error': self.jira_sync_error,
             'last_synced_at': self.last_synced_at.strftime('%Y-%m-%dT%H:%M:%SZ') if self.last_synced_at else None,
+            'jira_worklog_group': self.jira_worklog_group,
+            'jira_connection_id': self.jira_connection_id,
         }
 
     def __str__(self):
@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt
 from models.user import User
 from database import db
+from services.token_store import issue_token_pair, rotate_refresh_token, revoke_family, RefreshTokenError
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -38,15 +39,24 @@ def login():
     user = User.query.filter_by(username=username).first()
 
     if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id))
-        refresh_token = create_refresh_token(identity=str(user.id))
-        return jsonify(access_token=access_token, refresh_token=refresh_token)
+        return jsonify(issue_token_pair(user.id))
     return jsonify({'message': 'Bad username or password'}), 401
 
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
-    "Refreshes an expired access token."
-    current_user_id = get_jwt_identity()
-    new_access_token = create_access_token(identity=current_user_id)
-    return jsonify(access_token=new_access_token)
+    "Rotates the refresh token and issues a new access token."
+    try:
+        tokens = rotate_refresh_token(get_jwt())
+    except RefreshTokenError as e:
+        return jsonify({'message': e.message}), 401
+    return jsonify(tokens)
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    "Revokes every token issued from the current login."
+    family_id = get_jwt().get('fam')
+    if family_id:
+        revoke_family(family_id, 'logout')
+    return jsonify({'message': 'Logged out'}), 200
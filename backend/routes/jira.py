@@ -1,10 +1,30 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
 from database import db
-from models.jira import JiraConnection, JiraSyncLog
+from models.jira import JiraConnection, JiraSyncJob
 from models.time_record import TimeRecord
-from services.jira_service import JiraService
-from services.jira_errors import validate_time_record_for_sync, parse_jira_error
+from services.jira_client_pool import client_pool, get_jira_service
+from services.jira_cache import issue_cache
+from services.jira_circuit import forget_breaker
+from services.jira_rate_limit import interactive_retries
+from services.jira_issue_index import issue_index, search_issues as search_indexed_issues
+from services.jira_errors import validate_time_record_for_sync
+from services.jira_sync import previous_issue_keys, sync_records
+from services.jira_jobs import enqueue_bulk_sync
+from services.jira_reconcile import reconcile_connection
+from services.jira_history import history_page
+from services.jira_pending import pending_records
+from services.jira_stream import event_stream, inline_events, job_events
+from services.jira_routing import parse_project_keys, route_records, set_project_keys, sync_routed
+from services.request_context import (
+    current_user_id,
+    jira_connection_for,
+    jira_router,
+    owned_jira_connection,
+    owned_record,
+    owned_record_with_connection
+)
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timezone
 import logging
 
@@ -12,6 +32,9 @@ logger = logging.getLogger(__name__)
 
 jira_bp = Blueprint('jira', __name__)
 
+# Upper bound on keys accepted by POST /jira/issues/batch
+MAX_BATCH_ISSUE_KEYS = 500
+
 
 # ============================================================================
 # Connection Management Routes
@@ -22,7 +45,7 @@ jira_bp = Blueprint('jira', __name__)
 def create_connection():
     """Create a new JIRA connection for the current user"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
         
         # Validate required fields
@@ -31,12 +54,12 @@ def create_connection():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Check if user already has a connection (for now, only allow one)
-        existing = JiraConnection.query.filter_by(user_id=user_id).first()
-        if existing:
-            return jsonify({'error': 'You already have a JIRA connection. Please update or delete it first.'}), 400
+        try:
+            project_keys = parse_project_keys(data.get('project_keys', []))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Create new connection
+        # Create new connection (a user may have several, routed by project key)
         connection = JiraConnection(
             user_id=user_id,
             jira_url=data['jira_url'].rstrip('/'),  # Remove trailing slash
@@ -49,6 +72,11 @@ def create_connection():
         connection.set_encrypted_token(data['api_token'])
         
         db.session.add(connection)
+        try:
+            set_project_keys(connection, project_keys)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
         db.session.commit()
         
         return jsonify({
@@ -67,8 +95,10 @@ def create_connection():
 def get_connections():
     """Get all JIRA connections for the current user"""
     try:
-        user_id = get_jwt_identity()
-        connections = JiraConnection.query.filter_by(user_id=user_id).all()
+        user_id = current_user_id()
+        connections = JiraConnection.query.filter_by(user_id=user_id).options(
+            selectinload(JiraConnection.project_routes)
+        ).order_by(JiraConnection.id).all()
         
         return jsonify({
             'connections': [conn.to_dict() for conn in connections]
@@ -84,11 +114,7 @@ def get_connections():
 def update_connection(connection_id):
     """Update a JIRA connection"""
     try:
-        user_id = get_jwt_identity()
-        connection = JiraConnection.query.filter_by(
-            id=connection_id,
-            user_id=user_id
-        ).first()
+        connection = owned_jira_connection(connection_id)
         
         if not connection:
             return jsonify({'error': 'Connection not found'}), 404
@@ -96,7 +122,9 @@ def update_connection(connection_id):
         data = request.get_json()
         
         # Update fields
+        site_changed = False
         if 'jira_url' in data:
+            site_changed = data['jira_url'].rstrip('/') != connection.jira_url
             connection.jira_url = data['jira_url'].rstrip('/')
         if 'email' in data:
             connection.email = data['email']
@@ -104,9 +132,25 @@ def update_connection(connection_id):
             connection.set_encrypted_token(data['api_token'])
         if 'is_active' in data:
             connection.is_active = data['is_active']
+        if 'auto_sync' in data:
+            connection.auto_sync = bool(data['auto_sync'])
+        if 'aggregate_worklogs' in data:
+            connection.aggregate_worklogs = bool(data['aggregate_worklogs'])
+        if 'project_keys' in data:
+            try:
+                set_project_keys(connection, parse_project_keys(data['project_keys']))
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({'error': str(e)}), 400
         
         connection.updated_at = datetime.now(timezone.utc)
         db.session.commit()
+        client_pool.invalidate(connection.id)
+        issue_cache.invalidate(connection.id)
+        if site_changed:
+            issue_index.drop(connection.id)
+        if site_changed or 'email' in data or 'api_token' in data:
+            forget_breaker(connection.id)
         
         return jsonify({
             'message': 'Connection updated successfully',
@@ -124,17 +168,17 @@ def update_connection(connection_id):
 def delete_connection(connection_id):
     """Delete a JIRA connection"""
     try:
-        user_id = get_jwt_identity()
-        connection = JiraConnection.query.filter_by(
-            id=connection_id,
-            user_id=user_id
-        ).first()
+        connection = owned_jira_connection(connection_id)
         
         if not connection:
             return jsonify({'error': 'Connection not found'}), 404
         
         db.session.delete(connection)
         db.session.commit()
+        client_pool.invalidate(connection_id)
+        issue_cache.invalidate(connection_id)
+        issue_index.drop(connection_id)
+        forget_breaker(connection_id)
         
         return jsonify({'message': 'Connection deleted successfully'}), 200
         
@@ -146,32 +190,31 @@ def delete_connection(connection_id):
 
 @jira_bp.route('/jira/connections/<int:connection_id>/test', methods=['POST'])
 @jwt_required()
+@interactive_retries()
 def test_connection(connection_id):
     """Test a JIRA connection"""
     try:
-        user_id = get_jwt_identity()
-        connection = JiraConnection.query.filter_by(
-            id=connection_id,
-            user_id=user_id
-        ).first()
+        connection = owned_jira_connection(connection_id)
         
         if not connection:
             return jsonify({'error': 'Connection not found'}), 404
         
         # Create JIRA service and test connection
-        jira_service = JiraService(connection)
+        jira_service = get_jira_service(connection)
         result = jira_service.test_connection()
         
         if result['success']:
             return jsonify({
                 'success': True,
                 'message': 'Connection successful',
-                'server_info': result.get('server_info')
+                'server_info': result.get('server_info'),
+                'circuit': result.get('circuit')
             }), 200
         else:
             return jsonify({
                 'success': False,
-                'error': result.get('error')
+                'error': result.get('error'),
+                'circuit': result.get('circuit')
             }), 400
         
     except Exception as e:
@@ -188,27 +231,29 @@ def test_connection(connection_id):
 
 @jira_bp.route('/jira/issues/search', methods=['GET'])
 @jwt_required()
+@interactive_retries()
 def search_issues():
     """Search for JIRA issues"""
     try:
-        user_id = get_jwt_identity()
         query = request.args.get('q', '')
         
         if not query:
             return jsonify({'error': 'Query parameter "q" is required'}), 400
         
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
+        # One connection if asked for, otherwise every active connection
+        connections = jira_router().connections
+        connection_id = request.args.get('connection_id', type=int)
+        if connection_id is not None:
+            connections = [c for c in connections if c.id == connection_id]
         
-        if not connection:
+        if not connections:
             return jsonify({'error': 'No active JIRA connection found'}), 404
         
         # Search issues
-        jira_service = JiraService(connection)
-        issues = jira_service.search_issues(query)
+        issues = []
+        for connection in connections:
+            jira_service = get_jira_service(connection)
+            issues.extend(search_indexed_issues(connection, jira_service, query))
         
         return jsonify({'issues': issues}), 200
         
@@ -219,23 +264,19 @@ def search_issues():
 
 @jira_bp.route('/jira/issues/<issue_key>', methods=['GET'])
 @jwt_required()
+@interactive_retries()
 def get_issue(issue_key):
     """Get details of a specific JIRA issue"""
     try:
-        user_id = get_jwt_identity()
-        
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
+        # Get the connection the issue's project routes to
+        connection = jira_connection_for(issue_key)
         
         if not connection:
             return jsonify({'error': 'No active JIRA connection found'}), 404
         
         # Get issue
-        jira_service = JiraService(connection)
-        issue = jira_service.get_issue(issue_key)
+        jira_service = get_jira_service(connection)
+        issue = issue_cache.get_issue(connection, jira_service, issue_key)
         
         if issue:
             return jsonify({'issue': issue}), 200
@@ -247,25 +288,62 @@ def get_issue(issue_key):
         return jsonify({'error': str(e)}), 500
 
 
+@jira_bp.route('/jira/issues/batch', methods=['POST'])
+@jwt_required()
+@interactive_retries()
+def get_issues_batch():
+    """Get details of many JIRA issues at once (e.g. every badge on a week view)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        keys = data.get('keys')
+        
+        if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+            return jsonify({'error': 'keys must be a list of issue keys'}), 400
+        if len(keys) > MAX_BATCH_ISSUE_KEYS:
+            return jsonify({'error': f'At most {MAX_BATCH_ISSUE_KEYS} issue keys per request'}), 400
+        
+        router = jira_router()
+        
+        if not router.connections:
+            return jsonify({'error': 'No active JIRA connection found'}), 404
+        
+        # Each connection looks up the keys of the projects routed to it
+        issues, unavailable = {}, set()
+        for connection, connection_keys in router.partition(keys):
+            jira_service = get_jira_service(connection)
+            found, failed = issue_cache.get_issues(connection, jira_service, connection_keys)
+            issues.update(found)
+            unavailable.update(failed)
+        
+        # Missing issues don't exist (or aren't visible); unavailable ones couldn't be looked up
+        requested = list(dict.fromkeys(k.upper() for k in keys))
+        return jsonify({
+            'issues': issues,
+            'missing': [key for key in requested if key not in issues and key not in unavailable],
+            'unavailable': [key for key in requested if key in unavailable]
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Error getting JIRA issues: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @jira_bp.route('/jira/issues/assigned', methods=['GET'])
 @jwt_required()
+@interactive_retries()
 def get_assigned_issues():
     """Get issues assigned to the current user"""
     try:
-        user_id = get_jwt_identity()
-        
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
+        connections = jira_router().connections
         
-        if not connection:
+        if not connections:
             return jsonify({'error': 'No active JIRA connection found'}), 404
         
-        # Get assigned issues
-        jira_service = JiraService(connection)
-        issues = jira_service.get_assigned_issues(connection.email)
+        # Get assigned issues from every active connection
+        issues = []
+        for connection in connections:
+            jira_service = get_jira_service(connection)
+            issues.extend(issue_cache.get_assigned_issues(connection, jira_service))
         
         return jsonify({'issues': issues}), 200
         
@@ -283,87 +361,37 @@ def get_assigned_issues():
 def sync_record(record_id):
     """Sync a single time record to JIRA"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         
-        # Get the time record and verify ownership
-        record = TimeRecord.query.filter_by(
-            id=record_id,
-            user_id=user_id
-        ).first()
+        # Get the time record (verifying ownership) and the user's active connection
+        record, connection = owned_record_with_connection(record_id)
         
         if not record:
             return jsonify({'error': 'Time record not found'}), 404
         
         # Validate record using comprehensive validation
-        validation_error = validate_time_record_for_sync(record)
+        aggregated = bool(record.jira_worklog_group or (connection and connection.aggregate_worklogs))
+        validation_error = validate_time_record_for_sync(record, min_seconds=0 if aggregated else 60)
         if validation_error:
             return jsonify({'error': validation_error}), 400
         
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
-        
         if not connection:
             return jsonify({'error': 'No active JIRA connection found. Please set up JIRA connection in settings.'}), 404
         
-        # Calculate time spent in seconds
-        time_diff = record.timeout - record.timein
-        time_spent_seconds = int(time_diff.total_seconds())
-        
-        # Prepare comment (use notes or default message)
-        comment = record.notes if record.notes else "Time logged from Timecard App"
-        
-        # Create worklog in JIRA
-        jira_service = JiraService(connection)
-        result = jira_service.create_worklog(
-            issue_key=record.jira_issue_key,
-            time_spent_seconds=time_spent_seconds,
-            started=record.timein,
-            comment=comment
-        )
-        
-        # Create sync log entry
-        sync_log = JiraSyncLog(
-            time_record_id=record.id,
-            jira_issue_key=record.jira_issue_key,
-            synced_by_user_id=user_id,
-            synced_at=datetime.now(timezone.utc)
-        )
+        # Create or update the worklog in JIRA (the day's worklog for the issue
+        # when aggregating) and record the outcome
+        outcomes = {}
+        sync_records(user_id, connection, [record.id], on_results=outcomes.update)
+        db.session.commit()
+        result = outcomes[record.id]
         
         if result['success']:
-            # Update time record
-            record.jira_synced = True
-            record.jira_worklog_id = result['worklog_id']
-            record.jira_sync_error = None
-            record.last_synced_at = datetime.now(timezone.utc)
-            
-            # Update sync log
-            sync_log.jira_worklog_id = result['worklog_id']
-            sync_log.sync_status = 'success'
-            
-            db.session.add(sync_log)
-            db.session.commit()
-            
             return jsonify({
                 'success': True,
                 'message': 'Time record synced to JIRA successfully',
                 'worklog_id': result['worklog_id']
             }), 200
         else:
-            # Update time record with error
-            record.jira_synced = False
-            record.jira_sync_error = result['error']
-            record.last_synced_at = datetime.now(timezone.utc)
-            
-            # Update sync log
-            sync_log.sync_status = 'failed'
-            sync_log.sync_error = result['error']
-            
-            db.session.add(sync_log)
-            db.session.commit()
-            
             return jsonify({
                 'success': False,
                 'error': result['error']
@@ -381,9 +409,17 @@ def sync_record(record_id):
 @jira_bp.route('/jira/sync/bulk', methods=['POST'])
 @jwt_required()
 def bulk_sync():
-    """Sync multiple time records to JIRA"""
+    """Sync multiple time records to JIRA
+
+    Records are partitioned by the connection their issue routes to. Queues
+    a background job per connection and returns their ids (202) unless
+    JIRA_SYNC_MODE is "inline", in which case the connections' shares sync
+    in parallel in the request. With ``Accept: text/event-stream``
+    per-record results are streamed as Server-Sent Events in either mode
+    (see services/jira_stream.py).
+    """
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
         
         if 'record_ids' not in data or not isinstance(data['record_ids'], list):
@@ -391,112 +427,33 @@ def bulk_sync():
         
         record_ids = data['record_ids']
         
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
+        router = jira_router()
         
-        if not connection:
+        if not router.connections:
             return jsonify({'error': 'No active JIRA connection found'}), 404
         
-        jira_service = JiraService(connection)
-        
-        results = {
-            'total': len(record_ids),
-            'succeeded': 0,
-            'failed': 0,
-            'errors': []
-        }
-        
-        for record_id in record_ids:
-            # Get the time record and verify ownership
-            record = TimeRecord.query.filter_by(
-                id=record_id,
-                user_id=user_id
-            ).first()
-            
-            if not record:
-                results['failed'] += 1
-                results['errors'].append({
-                    'record_id': record_id,
-                    'error': 'Record not found'
-                })
-                continue
-            
-            # Validate record
-            if not record.jira_issue_key:
-                results['failed'] += 1
-                results['errors'].append({
-                    'record_id': record_id,
-                    'error': 'No JIRA issue key'
-                })
-                continue
-            
-            if not record.timein or not record.timeout:
-                results['failed'] += 1
-                results['errors'].append({
-                    'record_id': record_id,
-                    'error': 'Missing timein or timeout'
-                })
-                continue
-            
-            # Calculate time spent
-            time_diff = record.timeout - record.timein
-            time_spent_seconds = int(time_diff.total_seconds())
-            
-            # Prepare comment
-            comment = record.notes if record.notes else "Time logged from Timecard App"
-            
-            # Sync to JIRA
-            result = jira_service.create_worklog(
-                issue_key=record.jira_issue_key,
-                time_spent_seconds=time_spent_seconds,
-                started=record.timein,
-                comment=comment
-            )
-            
-            # Create sync log
-            sync_log = JiraSyncLog(
-                time_record_id=record.id,
-                jira_issue_key=record.jira_issue_key,
-                synced_by_user_id=user_id,
-                synced_at=datetime.now(timezone.utc)
-            )
-            
-            if result['success']:
-                results['succeeded'] += 1
-                
-                # Update record
-                record.jira_synced = True
-                record.jira_worklog_id = result['worklog_id']
-                record.jira_sync_error = None
-                record.last_synced_at = datetime.now(timezone.utc)
-                
-                # Update sync log
-                sync_log.jira_worklog_id = result['worklog_id']
-                sync_log.sync_status = 'success'
-            else:
-                results['failed'] += 1
-                results['errors'].append({
-                    'record_id': record_id,
-                    'error': result['error']
-                })
-                
-                # Update record
-                record.jira_synced = False
-                record.jira_sync_error = result['error']
-                record.last_synced_at = datetime.now(timezone.utc)
-                
-                # Update sync log
-                sync_log.sync_status = 'failed'
-                sync_log.sync_error = result['error']
-            
-            db.session.add(sync_log)
+        stream = request.accept_mimetypes.best_match(
+            ['application/json', 'text/event-stream']) == 'text/event-stream'
         
-        db.session.commit()
+        if current_app.config.get('JIRA_SYNC_MODE') == 'inline':
+            if stream:
+                return event_stream(inline_events(user_id, record_ids))
+            results = sync_routed(user_id, record_ids, router)
+            db.session.commit()
+            return jsonify(results), 200
         
-        return jsonify(results), 200
+        # One job per connection, so workers sync each site's share in parallel
+        partitions = route_records(user_id, record_ids, router) or [(router.default, [])]
+        jobs = [enqueue_bulk_sync(user_id, connection, ids) for connection, ids in partitions]
+        if stream:
+            return event_stream(job_events([job.id for job in jobs]))
+        
+        return jsonify({
+            'job_id': jobs[0].id,
+            'job_ids': [job.id for job in jobs],
+            'status': 'queued',
+            'total': sum(job.total for job in jobs)
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in bulk sync: {str(e)}")
@@ -504,41 +461,121 @@ def bulk_sync():
         return jsonify({'error': str(e)}), 500
 
 
+@jira_bp.route('/jira/sync/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_sync_job(job_id):
+    """Get progress and per-record status of a queued bulk sync"""
+    try:
+        job = JiraSyncJob.query.filter_by(
+            id=job_id,
+            user_id=current_user_id()
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Sync job not found'}), 404
+        
+        return jsonify({'job': job.to_dict(include_items=True)}), 200
+        
+    except Exception as e:
+        logger.error(f"Error fetching sync job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@jira_bp.route('/jira/sync/jobs/<int:job_id>/events', methods=['GET'])
+@jwt_required()
+def stream_sync_job(job_id):
+    """Stream a queued bulk sync's per-record results as Server-Sent Events"""
+    try:
+        job = JiraSyncJob.query.filter_by(
+            id=job_id,
+            user_id=current_user_id()
+        ).first()
+        
+        if not job:
+            return jsonify({'error': 'Sync job not found'}), 404
+        
+        return event_stream(job_events([job.id]))
+        
+    except Exception as e:
+        logger.error(f"Error streaming sync job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@jira_bp.route('/jira/sync/reconcile', methods=['POST'])
+@jwt_required()
+def reconcile():
+    """Find records whose JIRA worklog drifted (and optionally rewrite them)
+
+    Each call reads a bounded part of JIRA's change feeds; while ``complete``
+    is false, call again to continue from where this one stopped.
+    """
+    try:
+        router = jira_router()
+        
+        if not router.connections:
+            return jsonify({'error': 'No active JIRA connection found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        max_pages = current_app.config.get('JIRA_RECONCILE_MAX_PAGES', 10)
+        results = {'checked': 0, 'drifted': 0, 'fixed': 0, 'failed': 0, 'records': [], 'complete': True}
+        for connection in router.connections:
+            summary = reconcile_connection(connection, fix=bool(data.get('fix')), router=router,
+                                           max_pages=max_pages)
+            for name in ('checked', 'drifted', 'fixed', 'failed'):
+                results[name] += summary[name]
+            results['records'].extend(summary['records'])
+            results['complete'] = results['complete'] and summary['complete']
+        
+        return jsonify(results), 200
+        
+    except Exception as e:
+        logger.error(f"Error reconciling JIRA worklogs: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@jira_bp.route('/jira/sync/pending', methods=['GET'])
+@jwt_required()
+def get_pending_sync():
+    """Get the records that still need syncing (pending, failed or drifted)
+
+    Each record includes its duration and the validation a sync would run.
+    """
+    try:
+        limit = request.args.get('limit', 500, type=int)
+        results = pending_records(current_user_id(), jira_router(), limit)
+        
+        return jsonify(results), 200
+        
+    except Exception as e:
+        logger.error(f"Error fetching pending JIRA sync records: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
 @jira_bp.route('/jira/sync/history', methods=['GET'])
 @jwt_required()
 def get_sync_history():
-    """Get sync history for the current user"""
+    """Get sync history for the current user
+
+    Newest first; pass the returned next_cursor as ``cursor`` for the next page.
+    """
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         
         # Get query parameters for filtering
         status = request.args.get('status')  # 'success', 'failed', or None for all
         limit = request.args.get('limit', 100, type=int)
         record_id = request.args.get('record_id', type=int)  # Filter by specific record
+        cursor = request.args.get('cursor')
         
-        # Build query - join with time_records to ensure user ownership
-        query = db.session.query(JiraSyncLog).join(
-            TimeRecord,
-            JiraSyncLog.time_record_id == TimeRecord.id
-        ).filter(
-            TimeRecord.user_id == user_id
-        )
-        
-        # Apply record_id filter if provided
-        if record_id:
-            query = query.filter(JiraSyncLog.time_record_id == record_id)
-        
-        # Apply status filter if provided
-        if status:
-            query = query.filter(JiraSyncLog.sync_status == status)
-        
-        # Order by most recent first and limit
-        sync_logs = query.order_by(
-            JiraSyncLog.synced_at.desc()
-        ).limit(limit).all()
+        try:
+            sync_logs, next_cursor = history_page(user_id, status, record_id, limit, cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
-            'history': [log.to_dict() for log in sync_logs]
+            'history': [log.to_dict() for log in sync_logs],
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -548,45 +585,56 @@ def get_sync_history():
 
 @jira_bp.route('/jira/worklog/<int:time_record_id>', methods=['DELETE'])
 @jwt_required()
+@interactive_retries()
 def delete_worklog(time_record_id):
     """Delete a worklog from JIRA and clear sync status"""
     try:
-        user_id = get_jwt_identity()
-        
-        # Get the time record and verify ownership
-        record = TimeRecord.query.filter_by(
-            id=time_record_id,
-            user_id=user_id
-        ).first()
+        # Get the time record (verifying ownership)
+        record = owned_record(time_record_id)
         
         if not record:
             return jsonify({'error': 'Time record not found'}), 404
         
-        if not record.jira_worklog_id or not record.jira_issue_key:
+        if not record.jira_worklog_id:
             return jsonify({'error': 'Time record is not synced to JIRA'}), 400
         
-        # Get user's active connection
-        connection = JiraConnection.query.filter_by(
-            user_id=user_id,
-            is_active=True
-        ).first()
-        
+        # The worklog lives on the site it was written to, which its issue may no longer route to
+        connection = owned_jira_connection(record.jira_connection_id) if record.jira_connection_id else None
         if not connection:
-            return jsonify({'error': 'No active JIRA connection found'}), 404
+            return jsonify({'error': 'The JIRA connection holding this worklog no longer exists'}), 404
+        
+        # ...and on the issue it was written to
+        if record.jira_worklog_group:
+            issue_key = record.jira_worklog_group.split('@')[0]
+        else:
+            issue_key = previous_issue_keys([record]).get(record.id, record.jira_issue_key)
+        if not issue_key:
+            return jsonify({'error': 'Time record is not synced to JIRA'}), 400
         
         # Delete worklog from JIRA
-        jira_service = JiraService(connection)
+        jira_service = get_jira_service(connection)
         result = jira_service.delete_worklog(
-            issue_key=record.jira_issue_key,
+            issue_key=issue_key,
             worklog_id=record.jira_worklog_id
         )
         
         if result['success']:
-            # Clear sync status from record
-            record.jira_synced = False
-            record.jira_worklog_id = None
-            record.jira_sync_error = None
-            record.last_synced_at = None
+            # Clear sync status from the record, or from every record an
+            # aggregated worklog covered
+            records = [record]
+            if record.jira_worklog_group:
+                records = TimeRecord.query.filter(
+                    TimeRecord.user_id == record.user_id,
+                    TimeRecord.jira_worklog_group == record.jira_worklog_group
+                ).all()
+            for covered in records:
+                covered.jira_synced = False
+                covered.jira_worklog_id = None
+                covered.jira_sync_error = None
+                covered.last_synced_at = None
+                covered.jira_sync_hash = None
+                covered.jira_worklog_group = None
+                covered.jira_connection_id = None
             
             db.session.commit()
             
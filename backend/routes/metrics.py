@@ -0,0 +1,14 @@
+from flask import Blueprint, Response, current_app, request
+from services.metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text-format metrics for every worker process"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.time_record import TimeRecord, RecordAttribute
 from database import db
+from services.request_context import owned_record
 from datetime import datetime, timezone
 
 time_records_bp = Blueprint('time_records', __name__)
@@ -111,12 +112,13 @@ def create_time_record():
 def update_time_record(record_id):
     current_user_id = get_jwt_identity()
 
-    record = TimeRecord.query.filter_by(id=record_id, user_id=current_user_id).first()
+    record = owned_record(record_id)
 
     if not record:
         return jsonify({"msg": "Record not found or access denied"}), 404
 
     data = request.get_json()
+    synced_fields = (record.timein, record.timeout, record.notes, record.jira_issue_key)
 
     if not isinstance(data['domain_id'], int):
         domain_id = create_record_attribute(current_user_id, data['domain_id'], None, 1)
@@ -162,6 +164,10 @@ def update_time_record(record_id):
     if 'jira_issue_key' in data:
         record.jira_issue_key = data['jira_issue_key']
 
+    # The worklog in JIRA no longer matches, so the record is queued for sync again
+    if (record.timein, record.timeout, record.notes, record.jira_issue_key) != synced_fields:
+        record.jira_synced = False
+
     db.session.commit()
 
     return jsonify(record.to_dict()), 200
@@ -172,7 +178,7 @@ def update_time_record(record_id):
 def delete_time_record(record_id):
     current_user_id = get_jwt_identity()
     
-    record = TimeRecord.query.filter_by(id=record_id, user_id=current_user_id).first()
+    record = owned_record(record_id)
     
     if not record:
         return jsonify({"msg": "Record not found or access denied"}), 404
@@ -0,0 +1,273 @@
+"""
+Per-request performance instrumentation.
+
+For every request this records wall time, SQL statement count and time,
+JSON serialization time and outbound HTTP (JIRA) time. Results are returned
+in a ``Server-Timing`` header (plus ``X-Query-Count``) and logged as one JSON
+line per request. Requests running longer than ``SLOW_REQUEST_MS`` get a
+stack sample of the handling thread captured while they are still running.
+"""
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from requests.adapters import HTTPAdapter
+from services import metrics
+import requests
+import json
+import sys
+import threading
+import time
+import traceback
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Counters accumulated while a single request is handled"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serialize_time = 0.0
+        self.http_count = 0
+        self.http_time = 0.0
+        self.stack_sample = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_local = threading.local()
+_timings_lock = threading.Lock()
+
+
+def current_timings():
+    """The RequestTimings to charge work to, or None outside a request"""
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        return timings
+    if has_request_context():
+        return g.get('timings')
+    return None
+
+
+@contextmanager
+def attribute_to(timings):
+    """Charge work done on this thread (e.g. a worker pool) to ``timings``"""
+    previous = getattr(_local, 'timings', None)
+    _local.timings = timings
+    try:
+        yield
+    finally:
+        _local.timings = previous
+
+
+# ----------------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    timings = current_timings()
+    if timings is not None:
+        timings.sql_count += 1
+        timings.sql_time += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_start'):
+        conn.info['query_start'].pop()
+
+
+# ----------------------------------------------------------------------------
+# Serialization
+# ----------------------------------------------------------------------------
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that records time spent building JSON responses"""
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                timings.serialize_time += time.perf_counter() - started
+
+
+# ----------------------------------------------------------------------------
+# Outbound HTTP
+# ----------------------------------------------------------------------------
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """requests adapter that records outbound call time on the active request"""
+
+    def send(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = super().send(request, *args, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            record_http_call(request.method, status_code, time.perf_counter() - started, current_timings())
+
+
+def record_http_call(method: str, status_code, elapsed: float, timings=None):
+    """Count an outbound JIRA call in the metrics and on ``timings`` (if any)"""
+    metrics.jira_requests.inc(method=method, outcome=metrics.jira_outcome(status_code))
+    metrics.jira_request_duration.observe(elapsed, method=method)
+    if timings is not None:
+        with _timings_lock:
+            timings.http_count += 1
+            timings.http_time += elapsed
+
+
+def timed_session(pool_maxsize: int = 10) -> requests.Session:
+    """A requests Session whose calls are attributed to the active request"""
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# ----------------------------------------------------------------------------
+# Slow request sampling
+# ----------------------------------------------------------------------------
+
+class SlowRequestSampler:
+    """
+    Background thread that captures the stack of requests still running
+    after the slow threshold. One thread serves all requests.
+    """
+
+    def __init__(self, threshold_ms: int):
+        self.threshold = threshold_ms / 1000.0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, timings: RequestTimings):
+        with self._lock:
+            self._active[threading.get_ident()] = timings
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='slow-request-sampler', daemon=True)
+                self._thread.start()
+
+    def untrack(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        interval = max(self.threshold / 2, 0.01)
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                overdue = [
+                    (thread_id, timings) for thread_id, timings in self._active.items()
+                    if timings.stack_sample is None and timings.elapsed() >= self.threshold
+                ]
+            if not overdue:
+                continue
+            frames = sys._current_frames()
+            for thread_id, timings in overdue:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    timings.stack_sample = ''.join(traceback.format_stack(frame))
+
+
+# ----------------------------------------------------------------------------
+# Request hooks
+# ----------------------------------------------------------------------------
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+_sampler = None
+
+
+def _start_request():
+    g.timings = RequestTimings()
+    if _sampler is not None:
+        _sampler.track(g.timings)
+
+
+def _finish_request(response):
+    timings = g.get('timings')
+    if timings is None:
+        return response
+
+    total = timings.elapsed()
+    response.headers['X-Query-Count'] = str(timings.sql_count)
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={_ms(timings.sql_time)};desc="{timings.sql_count} queries"',
+        f'ser;dur={_ms(timings.serialize_time)}',
+        f'jira;dur={_ms(timings.http_time)};desc="{timings.http_count} calls"',
+        f'total;dur={_ms(total)}',
+    ])
+
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'duration_ms': _ms(total),
+        'sql_count': timings.sql_count,
+        'sql_ms': _ms(timings.sql_time),
+        'serialize_ms': _ms(timings.serialize_time),
+        'http_count': timings.http_count,
+        'http_ms': _ms(timings.http_time),
+    }
+    logger.info(json.dumps(record))
+
+    blueprint = request.blueprint or 'app'
+    metrics.http_requests.inc(blueprint=blueprint, method=request.method, status=response.status_code)
+    metrics.http_request_duration.observe(total, blueprint=blueprint)
+    metrics.db_queries.inc(timings.sql_count, blueprint=blueprint)
+    metrics.registry.maybe_flush()
+
+    if _sampler is not None and total >= _sampler.threshold:
+        _sampler.untrack()
+        logger.warning(
+            f"Slow request {request.method} {request.path} took {record['duration_ms']}ms "
+            f"({timings.sql_count} queries, {timings.http_count} JIRA calls)"
+            + (f"\nStack sample:\n{timings.stack_sample}" if timings.stack_sample else '')
+        )
+    return response
+
+
+def _teardown_request(exc):
+    if _sampler is not None:
+        _sampler.untrack()
+
+
+def init_app(app, db):
+    """Attach instrumentation to the app's engine, JSON provider and requests"""
+    global _sampler
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(db.engine, 'handle_error', _handle_error)
+
+    app.json = TimedJSONProvider(app)
+
+    threshold_ms = app.config.get('SLOW_REQUEST_MS')
+    if threshold_ms:
+        _sampler = SlowRequestSampler(threshold_ms)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,340 @@
+"""
+asyncio JIRA client for the sync engine.
+
+JiraService wraps the blocking atlassian client, so every in-flight call
+holds a thread. With ``JIRA_HTTP_CLIENT`` set to "async" the sync engine
+instead runs its worklog writes on one event loop per process
+(``async_runner``), where each connection gets an ``AsyncJiraClient``: an
+``httpx.AsyncClient`` with a keep-alive connection pool, speaking HTTP/2
+when the ``h2`` package is installed. Calls are paced by the connection's
+AdaptiveLimiter and retried like RetryingHTTPAdapter does, so one process
+can have hundreds of calls in flight across many connections without a
+thread for each. The connection's circuit breaker and the configured
+connect/read timeouts apply as well.
+
+Only what the sync engine needs is implemented: worklog create, update,
+delete and lookup (``upsert_worklog`` with JiraService's contract), JQL
+search and issue get. httpx is optional; without it ``async_available()``
+is False and the threaded JiraService path is used.
+"""
+from concurrent.futures import Future
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import contextvars
+import threading
+import time
+import logging
+
+from flask import current_app
+from models.jira import JiraConnection
+from services import metrics
+from services.instrumentation import record_http_call
+from services.jira_circuit import OPEN, CircuitBreaker, breaker_for, is_failure_status
+from services.jira_rate_limit import (
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    AdaptiveLimiter,
+    backoff_delay,
+    jira_timeouts,
+    limiter_for,
+    parse_retry_after
+)
+from services.jira_service import upsert_worklog_steps
+
+try:
+    import httpx
+except ImportError:  # Optional: pip install "httpx[http2]"
+    httpx = None
+
+try:
+    import h2  # noqa: F401 (lets httpx negotiate HTTP/2)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+# Request timings (see services/instrumentation.py) of the sync a call belongs to
+_timings = contextvars.ContextVar('jira_async_timings', default=None)
+
+
+def async_available() -> bool:
+    return httpx is not None
+
+
+def async_enabled() -> bool:
+    """Whether the sync engine should use the async client (configured and installed)"""
+    if current_app.config.get('JIRA_HTTP_CLIENT', 'threads') != 'async':
+        return False
+    if not async_available():
+        logger.warning("JIRA_HTTP_CLIENT is 'async' but httpx is not installed; using threads")
+        return False
+    return True
+
+
+class AsyncJiraClient:
+    """JIRA REST calls on an httpx.AsyncClient, paced and retried per connection"""
+
+    def __init__(self, connection: JiraConnection, limiter: AdaptiveLimiter, max_connections: int = 10,
+                 retries: int = 4, backoff_base: float = 0.5, backoff_cap: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None, timeout: Tuple[float, float] = (5.0, 30.0)):
+        token = connection.get_decrypted_token()
+        if not token:
+            raise ValueError("Failed to decrypt JIRA token")
+
+        self.connection_id = connection.id
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._client = httpx.AsyncClient(
+            base_url=f"{connection.jira_url}/rest/api/2/",
+            auth=(connection.email or '', token),
+            headers={'Accept': 'application/json'},
+            http2=HTTP2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0])
+        )
+        # Set (on the client's loop) whenever the limiter releases a call
+        self._released = asyncio.Event()
+        self._loop = None
+        limiter.add_release_listener(self._on_release)
+
+    async def aclose(self):
+        self.limiter.remove_release_listener(self._on_release)
+        await self._client.aclose()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _on_release(self):
+        # Any thread may release, including blocking syncs sharing the limiter
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._released.set)
+
+    async def _acquire(self):
+        """Wait for the limiter: until the bucket refills or the pause ends, or for a release"""
+        self._loop = asyncio.get_running_loop()
+        while True:
+            # Cleared before trying so a release in between still wakes us
+            self._released.clear()
+            started, wait = self.limiter.try_acquire()
+            if started:
+                return
+            try:
+                await asyncio.wait_for(self._released.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _request(self, method: str, path: str, **kwargs):
+        """Send a request, retrying 429/503 and transient failures; raises for other error statuses"""
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.allow()
+            await self._acquire()
+            started = time.perf_counter()
+            status_code = None
+            try:
+                response = await self._client.request(method, path, **kwargs)
+                status_code = response.status_code
+            except httpx.TransportError as e:
+                self.limiter.release()
+                self._record(failure=type(e).__name__)
+                if self._circuit_open() or not self._may_retry(method, attempt, e):
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                reason = 'connection'
+            except BaseException:
+                self.limiter.release()
+                if self.breaker is not None:
+                    self.breaker.abandon()
+                raise
+            else:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.limiter.release(throttled=status_code == 429, retry_after=retry_after)
+                self._record(failure=f"HTTP {status_code}" if is_failure_status(status_code) else None)
+                if status_code not in RETRY_STATUSES or attempt >= self.retries or self._circuit_open():
+                    response.raise_for_status()
+                    return response
+                delay = retry_after if retry_after is not None else backoff_delay(
+                    attempt, self.backoff_base, self.backoff_cap)
+                delay = min(delay, self.backoff_cap)
+                reason = str(status_code)
+            finally:
+                record_http_call(method, status_code, time.perf_counter() - started, _timings.get())
+
+            attempt += 1
+            metrics.jira_retries.inc(reason=reason)
+            logger.info(f"Retrying JIRA {method} {path} in {delay:.2f}s "
+                        f"(attempt {attempt}/{self.retries}, {reason})")
+            await asyncio.sleep(delay)
+
+    def _circuit_open(self) -> bool:
+        """Whether the breaker opened, so a retry would only be rejected"""
+        return self.breaker is not None and self.breaker.state == OPEN
+
+    def _record(self, failure: Optional[str] = None):
+        if self.breaker is None:
+            return
+        if failure:
+            self.breaker.record_failure(failure)
+        else:
+            self.breaker.record_success()
+
+    def _may_retry(self, method: str, attempt: int, error: Exception) -> bool:
+        if attempt >= self.retries:
+            return False
+        if method in IDEMPOTENT_METHODS:
+            return True
+        # The request never reached JIRA, so even a POST is safe to resend
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    async def _json(self, method: str, path: str, **kwargs):
+        response = await self._request(method, path, **kwargs)
+        return response.json() if response.content else None
+
+    # ------------------------------------------------------------------
+    # Issues
+    # ------------------------------------------------------------------
+
+    async def search(self, jql: str, fields='*all', limit: Optional[int] = None,
+                     next_page_token: Optional[str] = None) -> Dict:
+        """One page of ``search/jql`` (issues, nextPageToken, isLast)"""
+        params = {'jql': jql, 'fields': ','.join(fields) if isinstance(fields, (list, tuple)) else fields}
+        if limit is not None:
+            params['maxResults'] = int(limit)
+        if next_page_token is not None:
+            params['nextPageToken'] = next_page_token
+        return await self._json('GET', 'search/jql', params=params) or {}
+
+    async def issue(self, issue_key: str, fields='*all') -> Optional[Dict]:
+        """The issue's JSON, or None if it doesn't exist (or isn't visible)"""
+        try:
+            return await self._json('GET', f'issue/{issue_key}', params={'fields': fields})
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    # ------------------------------------------------------------------
+    # Worklogs
+    # ------------------------------------------------------------------
+
+    async def post_worklog(self, issue_key: str, data: Dict) -> Dict:
+        return await self._json('POST', f'issue/{issue_key}/worklog', json=data) or {}
+
+    async def put_worklog(self, issue_key: str, worklog_id: str, data: Dict) -> Dict:
+        return await self._json('PUT', f'issue/{issue_key}/worklog/{worklog_id}', json=data) or {}
+
+    async def delete_worklog(self, issue_key: str, worklog_id: str) -> Dict:
+        """Same result shape as JiraService.delete_worklog"""
+        try:
+            await self._request('DELETE', f'issue/{issue_key}/worklog/{worklog_id}')
+            return {'success': True}
+        except Exception as e:
+            logger.error(f"Failed to delete worklog {worklog_id}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    async def find_worklogs(self, issue_key: str, marker: str) -> List[Dict]:
+        """Worklogs on an issue whose comment contains ``marker``, oldest first"""
+        result = await self._json('GET', f'issue/{issue_key}/worklog') or {}
+        worklogs = [w for w in result.get('worklogs', []) if marker in str(w.get('comment') or '')]
+        return sorted(worklogs, key=lambda w: int(w['id']))
+
+    async def upsert_worklog(self, issue_key: str, time_spent_seconds: int, started: datetime,
+                             comment: str, marker: str, worklog_id: str = None,
+                             previous_issue_key: str = None, lookup: bool = False) -> Dict:
+        """Async JiraService.upsert_worklog: runs the calls ``upsert_worklog_steps`` decides on"""
+        steps = upsert_worklog_steps(issue_key, time_spent_seconds, started, comment, marker,
+                                     worklog_id, previous_issue_key, lookup)
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as done:
+                return done.value
+            result, error = None, None
+            try:
+                result = await getattr(self, step[0])(*step[1:])
+            except Exception as e:
+                error = e
+
+
+class _Entry:
+    __slots__ = ('updated_at', 'client')
+
+    def __init__(self, updated_at, client: AsyncJiraClient):
+        self.updated_at = updated_at
+        self.client = client
+
+
+class AsyncJiraRunner:
+    """A process-wide event loop thread and an LRU of AsyncJiraClients by connection id"""
+
+    def __init__(self):
+        self._loop = None
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='jira-async', daemon=True).start()
+            return self._loop
+
+    def client(self, connection: JiraConnection) -> AsyncJiraClient:
+        """The connection's client, rebuilt when the connection was edited (needs an app context)"""
+        config = current_app.config
+        with self._lock:
+            entry = self._clients.get(connection.id)
+            if entry is not None and entry.updated_at == connection.updated_at:
+                self._clients.move_to_end(connection.id)
+                return entry.client
+
+        client = AsyncJiraClient(
+            connection,
+            limiter_for(connection.id),
+            breaker=breaker_for(connection.id),
+            timeout=jira_timeouts(),
+            max_connections=max(10, int(config.get('JIRA_SYNC_CONCURRENCY', 8))),
+            retries=config.get('JIRA_MAX_RETRIES', 4),
+            backoff_base=config.get('JIRA_RETRY_BASE_SECONDS', 0.5),
+            backoff_cap=config.get('JIRA_RETRY_MAX_SECONDS', 30)
+        )
+        with self._lock:
+            stale = [self._clients.pop(connection.id)] if connection.id in self._clients else []
+            self._clients[connection.id] = _Entry(connection.updated_at, client)
+            while len(self._clients) > config.get('JIRA_CLIENT_POOL_SIZE', 256):
+                stale.append(self._clients.popitem(last=False)[1])
+        for entry in stale:
+            self.submit(entry.client.aclose())
+        return client
+
+    def submit(self, coro, timings=None) -> Future:
+        """Schedule ``coro`` on the loop; ``timings`` is charged for its HTTP calls"""
+        async def attributed():
+            _timings.set(timings)
+            return await coro
+        return asyncio.run_coroutine_threadsafe(attributed(), self._event_loop())
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run ``coro`` on the loop and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+    def invalidate(self, connection_id: int):
+        with self._lock:
+            entry = self._clients.pop(connection_id, None)
+        if entry is not None:
+            self.submit(entry.client.aclose())
+
+
+async_runner = AsyncJiraRunner()
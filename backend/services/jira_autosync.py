@@ -0,0 +1,197 @@
+"""
+Scheduled sync of finished time records to JIRA.
+
+``flask jira-autosync`` runs a pass every ``JIRA_AUTOSYNC_INTERVAL_SECONDS``.
+Each pass looks at active connections with ``auto_sync`` enabled and picks
+the owner's closed records that have an issue key but are not synced
+(``ix_time_record_jira_unsynced``), oldest first:
+
+- only records closed at least ``JIRA_AUTOSYNC_DELAY_MINUTES`` ago, so a
+  record still being corrected isn't written and then rewritten
+- only records closed within ``JIRA_AUTOSYNC_LOOKBACK_DAYS``
+- failed records again only after ``JIRA_AUTOSYNC_RETRY_MINUTES``
+- never records whose worklog was changed or deleted in JIRA (reconcile
+  drift); those are left for the user or ``flask jira-reconcile --fix``
+
+Up to ``JIRA_AUTOSYNC_BATCH_SIZE`` records per connection are queued as one
+JiraSyncJob for ``flask jira-worker``. For backpressure a connection that
+still has a queued or running job is skipped until it finishes, and no jobs
+are added while ``JIRA_AUTOSYNC_MAX_QUEUED`` are waiting; the connections
+that waited longest go first. ``JIRA_AUTOSYNC_WINDOW`` ("HH:MM-HH:MM", UTC)
+restricts passes to a time of day.
+
+A user with several connections gets a batch per connection, each taking
+only the records whose issue routes to it (see services/jira_routing.py).
+With ``JIRA_SYNC_MODE`` "inline" the batches are synced by the scheduler
+process itself, one thread per connection. Connections with ``aggregate_worklogs`` get one worklog per
+issue per day either way (see services/jira_sync.py).
+"""
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Dict, List, Optional
+import time
+import logging
+
+from flask import current_app
+from sqlalchemy import or_, true
+from database import db
+from models.jira import JiraConnection, JiraSyncJob
+from models.time_record import TimeRecord
+from services.jira_jobs import enqueue_bulk_sync
+from services.jira_reconcile import DRIFT_DELETED, DRIFT_EDITED_REMOTE
+from services.jira_routing import ConnectionRouter, run_partitions
+
+logger = logging.getLogger(__name__)
+
+# Records in this state need a decision about which side wins
+REMOTE_DRIFT = (DRIFT_DELETED, DRIFT_EDITED_REMOTE)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def parse_window(window: Optional[str]) -> Optional[tuple]:
+    """``"HH:MM-HH:MM"`` to a (start, end) pair of times; None means always"""
+    if not window or not window.strip():
+        return None
+    try:
+        start, end = (datetime.strptime(part.strip(), '%H:%M').time() for part in window.split('-'))
+    except ValueError:
+        raise ValueError(f"Invalid JIRA_AUTOSYNC_WINDOW {window!r}, expected HH:MM-HH:MM")
+    return start, end
+
+
+def in_window(now: datetime, window: Optional[str]) -> bool:
+    """Whether ``now`` (UTC) falls in the window; windows may wrap past midnight"""
+    bounds = parse_window(window)
+    if bounds is None:
+        return True
+    start, end = bounds
+    current = dt_time(now.hour, now.minute)
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def due_record_ids(user_id: int, now: datetime, limit: int, routed=None) -> List[int]:
+    """The user's oldest closed, unsynced records that are due for an auto-sync (and match ``routed``)"""
+    config = current_app.config
+    settled_before = now - timedelta(minutes=config.get('JIRA_AUTOSYNC_DELAY_MINUTES', 15))
+    closed_after = now - timedelta(days=config.get('JIRA_AUTOSYNC_LOOKBACK_DAYS', 30))
+    retry_before = now - timedelta(minutes=config.get('JIRA_AUTOSYNC_RETRY_MINUTES', 60))
+
+    rows = db.session.query(TimeRecord.id).filter(
+        TimeRecord.jira_synced.is_(False),
+        TimeRecord.timeout.isnot(None),
+        TimeRecord.timeout <= settled_before,
+        TimeRecord.timeout >= closed_after,
+        TimeRecord.jira_issue_key.isnot(None),
+        TimeRecord.jira_issue_key != '',
+        TimeRecord.user_id == user_id,
+        or_(TimeRecord.last_synced_at.is_(None), TimeRecord.last_synced_at <= retry_before),
+        or_(TimeRecord.jira_sync_error.is_(None), TimeRecord.jira_sync_error.notin_(REMOTE_DRIFT)),
+        routed if routed is not None else true()
+    ).order_by(TimeRecord.timeout, TimeRecord.id).limit(limit).all()
+    return [record_id for record_id, in rows]
+
+
+def _connections_by_last_job() -> List[JiraConnection]:
+    """Auto-sync connections, those that haven't had a job for longest first"""
+    last_job = db.session.query(
+        JiraSyncJob.connection_id,
+        db.func.max(JiraSyncJob.id).label('job_id')
+    ).group_by(JiraSyncJob.connection_id).subquery()
+    return JiraConnection.query.outerjoin(
+        last_job, last_job.c.connection_id == JiraConnection.id
+    ).filter(
+        JiraConnection.is_active.is_(True),
+        JiraConnection.auto_sync.is_(True)
+    ).order_by(last_job.c.job_id.isnot(None), last_job.c.job_id, JiraConnection.id).all()
+
+
+def autosync_pass(now: Optional[datetime] = None) -> Dict:
+    """Queue (or, inline, run) one batch of due records per eligible connection"""
+    config = current_app.config
+    now = now or _now()
+    summary = {'connections': 0, 'jobs': 0, 'records': 0, 'busy': 0, 'deferred': 0, 'failed': 0}
+    if not in_window(now, config.get('JIRA_AUTOSYNC_WINDOW')):
+        summary['outside_window'] = True
+        return summary
+
+    inline = config.get('JIRA_SYNC_MODE') == 'inline'
+    batch_size = max(1, config.get('JIRA_AUTOSYNC_BATCH_SIZE', 100))
+    active_jobs = db.session.query(JiraSyncJob.connection_id, JiraSyncJob.status).filter(
+        JiraSyncJob.status.in_(['queued', 'running'])
+    ).all()
+    busy = {connection_id for connection_id, _ in active_jobs}
+    capacity = config.get('JIRA_AUTOSYNC_MAX_QUEUED', 20) - sum(1 for _, s in active_jobs if s == 'queued')
+
+    routers = {}
+    partitions = []
+    for connection in _connections_by_last_job():
+        summary['connections'] += 1
+
+        if connection.id in busy:
+            summary['busy'] += 1
+            continue
+        if connection.user_id not in routers:
+            routers[connection.user_id] = ConnectionRouter(connection.user_id)
+        routed = routers[connection.user_id].record_filter(connection)
+        record_ids = due_record_ids(connection.user_id, now, batch_size, routed)
+        if not record_ids:
+            continue
+        if inline:
+            partitions.append((connection.user_id, connection, record_ids))
+            continue
+        if capacity <= 0:
+            summary['deferred'] += 1
+            continue
+
+        try:
+            enqueue_bulk_sync(connection.user_id, connection, record_ids)
+            capacity -= 1
+        except Exception as e:
+            logger.error(f"JIRA auto-sync failed for connection {connection.id}: {str(e)}", exc_info=True)
+            db.session.rollback()
+            continue
+        summary['jobs'] += 1
+        summary['records'] += len(record_ids)
+
+    if partitions:
+        try:
+            results = run_partitions(partitions)
+            db.session.commit()
+            summary['failed'] += results['failed']
+            summary['jobs'] += len(partitions)
+            summary['records'] += results['total']
+        except Exception as e:
+            logger.error(f"JIRA auto-sync failed: {str(e)}", exc_info=True)
+            db.session.rollback()
+
+    if summary['records'] or summary['deferred']:
+        logger.info(f"JIRA auto-sync: {summary['records']} records in {summary['jobs']} batches, "
+                    f"{summary['busy']} connections busy, {summary['deferred']} deferred")
+    return summary
+
+
+def run_scheduler(interval: Optional[float] = None, once: bool = False, should_stop=lambda: False):
+    """Run auto-sync passes every ``interval`` seconds until ``should_stop()``"""
+    if interval is None:
+        interval = current_app.config.get('JIRA_AUTOSYNC_INTERVAL_SECONDS', 300)
+    parse_window(current_app.config.get('JIRA_AUTOSYNC_WINDOW'))  # Fail fast on a bad setting
+    logger.info(f"JIRA auto-sync scheduler started (every {interval}s)")
+    while not should_stop():
+        try:
+            autosync_pass()
+        except Exception as e:
+            logger.error(f"JIRA auto-sync pass failed: {str(e)}", exc_info=True)
+            db.session.rollback()
+        finally:
+            db.session.remove()
+        if once:
+            break
+
+        deadline = time.monotonic() + interval
+        while not should_stop() and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(1.0, deadline - time.monotonic())))
+    logger.info("JIRA auto-sync scheduler stopped")
@@ -0,0 +1,253 @@
+"""
+Per-connection cache for JIRA issue lookups.
+
+The issue selector searches on every keystroke, so search, issue and
+assigned-issue results are kept for ``JIRA_CACHE_TTL_SECONDS``. For a further
+``JIRA_CACHE_STALE_SECONDS`` an expired entry is still served while a single
+background refresh fetches a new one (stale-while-revalidate), and it is
+also the fallback when JIRA errors. Concurrent misses for the same key share
+one upstream call.
+
+Batch issue lookups share the per-issue entries with ``get_issue`` and only
+ask JIRA for the keys that are missing, ``ISSUE_BATCH_SIZE`` at a time. Keys
+whose chunk failed are reported as unavailable rather than missing, and
+aren't cached.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from flask import current_app
+from models.jira import JiraConnection
+from services.jira_service import JiraService
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Missing issues are remembered briefly so typos don't hammer JIRA
+NOT_FOUND_TTL_SECONDS = 10
+# Issue keys per ``key in (...)`` query in batch lookups
+ISSUE_BATCH_SIZE = 100
+
+
+class _Entry:
+    __slots__ = ('value', 'fetched_at', 'ttl', 'refreshing')
+
+    def __init__(self, value, ttl: float):
+        self.value = value
+        self.fetched_at = time.monotonic()
+        self.ttl = ttl
+        self.refreshing = False
+
+
+class _Flight:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class JiraIssueCache:
+    """LRU of JIRA lookups keyed by connection, with TTL, SWR and single-flight loads"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public lookups
+    # ------------------------------------------------------------------
+
+    def search_issues(self, connection: JiraConnection, service: JiraService,
+                      query: str, max_results: int = 50) -> List[Dict]:
+        query = query.strip()
+        if not query:
+            return []
+        key = self._key(connection, 'search', query.lower(), max_results)
+        loader = lambda: service.search_issues(query, max_results, raise_errors=True)
+        return self._get('jira_search', key, self._lookup(key), loader, self._ttl(), on_error=[])
+
+    def get_issue(self, connection: JiraConnection, service: JiraService, issue_key: str) -> Optional[Dict]:
+        key = self._key(connection, 'issue', issue_key.upper())
+        loader = lambda: service.get_issue(issue_key, raise_errors=True)
+        found_ttl = self._ttl()
+        ttl = lambda value: found_ttl if value is not None else min(found_ttl, NOT_FOUND_TTL_SECONDS)
+        return self._get('jira_issue', key, self._lookup(key), loader, ttl, on_error=None)
+
+    def get_issues(self, connection: JiraConnection, service: JiraService,
+                   issue_keys: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Details for many issues; cached ones are reused and the rest fetched in chunks.
+        Returns the issues found and the keys that couldn't be looked up (JIRA errors).
+        """
+        found_ttl = self._ttl()
+        max_entries = current_app.config.get('JIRA_CACHE_MAX_ENTRIES', 5000)
+        issues, missing, stale = {}, [], {}
+        for issue_key in dict.fromkeys(k.upper() for k in issue_keys):
+            entry = self._lookup(self._key(connection, 'issue', issue_key))
+            record_cache('jira_issue', entry is not None)
+            if entry is None:
+                missing.append(issue_key)
+                continue
+            if entry.value is not None:
+                issues[issue_key] = entry.value
+            if not self._is_fresh(entry) and not entry.refreshing:
+                entry.refreshing = True
+                stale[issue_key] = entry
+
+        def fetch(keys: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+            fetched, failed = {}, []
+            for start in range(0, len(keys), ISSUE_BATCH_SIZE):
+                chunk = keys[start:start + ISSUE_BATCH_SIZE]
+                try:
+                    found = service.get_issues(chunk)
+                except Exception as e:
+                    logger.warning(f"JIRA batch issue lookup failed for {len(chunk)} keys: {str(e)}")
+                    failed.extend(chunk)
+                    continue
+                for issue_key in chunk:
+                    value = found.get(issue_key)
+                    ttl = found_ttl if value is not None else min(found_ttl, NOT_FOUND_TTL_SECONDS)
+                    self._store(self._key(connection, 'issue', issue_key), value, ttl, max_entries)
+                fetched.update(found)
+            return fetched, failed
+
+        def refresh():
+            try:
+                fetch(list(stale))
+            finally:
+                # Stored entries replaced these; any left (failed chunks) are retried by a later lookup
+                for entry in stale.values():
+                    entry.refreshing = False
+
+        if stale:
+            threading.Thread(target=refresh, name='jira-cache-refresh', daemon=True).start()
+        unavailable = []
+        if missing:
+            fetched, unavailable = fetch(missing)
+            issues.update(fetched)
+        return issues, unavailable
+
+    def get_assigned_issues(self, connection: JiraConnection, service: JiraService) -> List[Dict]:
+        key = self._key(connection, 'assigned', connection.email)
+        loader = lambda: service.get_assigned_issues(connection.email)
+        return self._get('jira_assigned', key, self._lookup(key), loader, self._ttl())
+
+    def invalidate(self, connection_id: int):
+        """Drop everything cached for a connection"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == connection_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(connection: JiraConnection, kind: str, *args) -> tuple:
+        # updated_at makes edits from other processes invalidate implicitly
+        return (connection.id, connection.updated_at, kind) + args
+
+    @staticmethod
+    def _ttl() -> float:
+        return current_app.config.get('JIRA_CACHE_TTL_SECONDS', 60)
+
+    @staticmethod
+    def _stale_window() -> float:
+        return current_app.config.get('JIRA_CACHE_STALE_SECONDS', 300)
+
+    @staticmethod
+    def _is_fresh(entry: _Entry) -> bool:
+        return time.monotonic() - entry.fetched_at < entry.ttl
+
+    def _lookup(self, key: tuple) -> Optional[_Entry]:
+        """Entry for ``key`` if still within its TTL plus the stale window"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.fetched_at >= entry.ttl + self._stale_window():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _get(self, cache: str, key: tuple, entry: Optional[_Entry], loader: Callable,
+             ttl, on_error=Ellipsis):
+        # Settings are read here because refreshes run outside the app context
+        max_entries = current_app.config.get('JIRA_CACHE_MAX_ENTRIES', 5000)
+        if entry is not None:
+            record_cache(cache, True)
+            if not self._is_fresh(entry):
+                self._refresh_in_background(key, entry, loader, ttl, max_entries)
+            return entry.value
+
+        record_cache(cache, False)
+        try:
+            return self._load(key, loader, ttl, max_entries)
+        except Exception as e:
+            if on_error is Ellipsis:
+                raise
+            logger.warning(f"JIRA lookup failed, returning {on_error!r}: {str(e)}")
+            return on_error
+
+    def _refresh_in_background(self, key: tuple, entry: _Entry, loader: Callable, ttl, max_entries: int):
+        with self._lock:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+
+        def refresh():
+            try:
+                self._load(key, loader, ttl, max_entries)
+            except Exception as e:
+                # Keep serving the stale value; the next request retries
+                logger.warning(f"Background JIRA cache refresh failed: {str(e)}")
+                entry.refreshing = False
+
+        threading.Thread(target=refresh, name='jira-cache-refresh', daemon=True).start()
+
+    def _load(self, key: tuple, loader: Callable, ttl, max_entries: int):
+        """Call ``loader`` once per key at a time; concurrent callers wait for its result"""
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self._store(key, flight.value, ttl(flight.value) if callable(ttl) else ttl, max_entries)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def _store(self, key: tuple, value, ttl: float, max_entries: int):
+        with self._lock:
+            self._entries[key] = _Entry(value, ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+
+issue_cache = JiraIssueCache()
@@ -0,0 +1,169 @@
+"""
+Per-connection circuit breakers for outbound JIRA calls.
+
+When a customer's JIRA site is down every call to it waits out the network
+timeout, tying up request and sync workers for all tenants. Each connection
+gets a ``CircuitBreaker`` that the HTTP layer (RetryingHTTPAdapter and
+AsyncJiraClient) consults before every attempt:
+
+- closed: calls go through; ``JIRA_BREAKER_FAILURES`` consecutive failures
+  (connection errors, timeouts and 5xx responses) open the breaker.
+- open: calls fail immediately with JiraCircuitOpenError for
+  ``JIRA_BREAKER_RESET_SECONDS``.
+- half_open: after that one probe call is let through; success closes the
+  breaker, failure opens it again.
+
+429s and other 4xx responses mean JIRA is up, so they count as successes
+(throttling is the rate limiter's job). ``test_connection`` forces a probe
+so a user can check a connection without waiting for the reset timeout.
+"""
+from typing import Dict, Optional
+import threading
+import time
+import logging
+
+from flask import current_app
+from services import metrics
+from services.jira_errors import JiraCircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+def is_failure_status(status_code: int) -> bool:
+    """Whether a response status means JIRA itself is failing"""
+    return status_code >= 500
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, connection_id: int, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.connection_id = connection_id
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.info(f"JIRA circuit for connection {self.connection_id}: {self.state} -> {state}")
+        self.state = state
+        metrics.jira_circuit_transitions.inc(state=state)
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self):
+        """Claim permission for one call; raises JiraCircuitOpenError while the breaker is open"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            wait = max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+        metrics.jira_circuit_rejections.inc()
+        raise JiraCircuitOpenError(f"JIRA circuit open for connection {self.connection_id}", wait)
+
+    def force_probe(self):
+        """Let the next call through as a probe even if the reset timeout hasn't passed"""
+        with self._lock:
+            if self.state == OPEN:
+                self._transition(HALF_OPEN)
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED)
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            probe = self._probing
+            self._probing = False
+            if probe or self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def abandon(self):
+        """Give back a claimed call that ended without telling us anything about JIRA"""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            retry_after = 0.0
+            if self.state == OPEN:
+                retry_after = max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'retry_after': round(retry_after, 1),
+                'last_error': self.last_error
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(connection_id: int) -> CircuitBreaker:
+    """The process-wide breaker for a connection (configured from the app config on first use)"""
+    with _breakers_lock:
+        breaker = _breakers.get(connection_id)
+        if breaker is None:
+            config = current_app.config
+            breaker = _breakers[connection_id] = CircuitBreaker(
+                connection_id,
+                failure_threshold=config.get('JIRA_BREAKER_FAILURES', 5),
+                reset_seconds=config.get('JIRA_BREAKER_RESET_SECONDS', 30)
+            )
+        return breaker
+
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def forget_breaker(connection_id: int):
+    """Drop a connection's breaker (after its URL or credentials change, or it is deleted)"""
+    with _breakers_lock:
+        _breakers.pop(connection_id, None)
+
+
+def _collect_states(gauge: metrics.Gauge):
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    counts = dict.fromkeys(STATES, 0)
+    for breaker in breakers:
+        counts[breaker.state] += 1
+    for state, count in counts.items():
+        gauge.set(count, state=state)
+
+
+metrics.registry.gauge(
+    'timecard_jira_circuits',
+    'JIRA connection circuit breakers by state',
+    ['state'],
+    collect=_collect_states
+)
@@ -0,0 +1,88 @@
+"""
+Process-wide pool of JiraService clients.
+
+Building a JiraService decrypts the stored token and opens a new HTTP
+session, so every request paid for a Fernet decrypt and a fresh TLS
+handshake. Clients are instead kept per connection id and reused while the
+connection's ``updated_at`` is unchanged (so edits made by other processes
+are picked up) and the client has been used within the TTL.
+
+A replaced or evicted client is only dropped from the pool, never closed:
+sync threads and other requests may still be using it, and its HTTP
+connections are released when the last of them lets go of it.
+"""
+from collections import OrderedDict
+import threading
+import time
+import logging
+
+from flask import current_app
+from models.jira import JiraConnection
+from services.jira_service import JiraService
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('updated_at', 'service', 'last_used')
+
+    def __init__(self, updated_at, service: JiraService):
+        self.updated_at = updated_at
+        self.service = service
+        self.last_used = time.monotonic()
+
+
+class JiraClientPool:
+    """LRU of JiraService instances keyed by connection id, with idle TTL"""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, connection: JiraConnection) -> JiraService:
+        config = current_app.config
+        ttl = config.get('JIRA_CLIENT_TTL_SECONDS', 300)
+        max_size = config.get('JIRA_CLIENT_POOL_SIZE', 256)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(connection.id)
+            if entry is not None and entry.updated_at == connection.updated_at and now - entry.last_used < ttl:
+                entry.last_used = now
+                self._entries.move_to_end(connection.id)
+                record_cache('jira_client', True)
+                return entry.service
+
+        record_cache('jira_client', False)
+        pool_size = max(10, int(config.get('JIRA_SYNC_CONCURRENCY', 8)))
+        service = JiraService(connection, pool_size=pool_size)
+
+        with self._lock:
+            self._entries.pop(connection.id, None)
+            self._entries[connection.id] = _Entry(connection.updated_at, service)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+            self._evict_idle(now, ttl)
+        return service
+
+    def _evict_idle(self, now: float, ttl: float):
+        for connection_id in [cid for cid, e in self._entries.items() if now - e.last_used >= ttl]:
+            del self._entries[connection_id]
+
+    def invalidate(self, connection_id: int):
+        """Drop the client for a connection (after it is updated or deleted)"""
+        with self._lock:
+            self._entries.pop(connection_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+client_pool = JiraClientPool()
+
+
+def get_jira_service(connection: JiraConnection) -> JiraService:
+    """A pooled JiraService for ``connection``"""
+    return client_pool.get(connection)
@@ -0,0 +1,68 @@
+"""
+Re-encryption of stored JIRA credentials after a key rotation.
+
+``reencrypt_tokens`` walks the connections in id order and rewrites every
+token not yet encrypted under the primary ``JIRA_ENCRYPTION_KEY``, a batch
+per transaction, so it can run while the app serves requests. Each token
+is only replaced if it still holds the ciphertext that was read, so a token
+the user changes meanwhile is kept (and skipped; it is already encrypted
+under the primary key). Tokens that none of the configured keys can
+decrypt are counted and left alone.
+"""
+from typing import Dict
+import time
+import logging
+
+from cryptography.fernet import InvalidToken
+from sqlalchemy import update
+from database import db
+from models.jira import JiraConnection
+from services.secrets_vault import vault
+
+logger = logging.getLogger(__name__)
+
+ENCRYPTED_COLUMNS = ('api_token_encrypted', 'oauth_access_token_encrypted', 'oauth_refresh_token_encrypted')
+
+
+def reencrypt_tokens(batch_size: int = 200, pause: float = 0.0) -> Dict:
+    """Re-encrypt tokens under the primary key; sleeps ``pause`` seconds between batches"""
+    summary = {'connections': 0, 'rotated': 0, 'skipped': 0, 'failed': 0}
+    columns = [getattr(JiraConnection, column) for column in ENCRYPTED_COLUMNS]
+    after = 0
+
+    while True:
+        rows = db.session.query(JiraConnection.id, *columns).filter(
+            JiraConnection.id > after
+        ).order_by(JiraConnection.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        for row in rows:
+            for column in ENCRYPTED_COLUMNS:
+                token = getattr(row, column)
+                if not token or not vault.needs_rotation(token):
+                    continue
+                try:
+                    rotated = vault.rotate(token)
+                except InvalidToken:
+                    logger.error(f"JIRA connection {row.id}: {column} can't be decrypted with any configured key")
+                    summary['failed'] += 1
+                    continue
+                # Compare-and-swap: a token saved since it was read is left as saved.
+                # The token itself is unchanged, so keep updated_at (and pooled clients)
+                result = db.session.execute(
+                    update(JiraConnection)
+                    .where(JiraConnection.id == row.id, getattr(JiraConnection, column) == token)
+                    .values(updated_at=JiraConnection.updated_at, **{column: rotated})
+                )
+                summary['rotated' if result.rowcount else 'skipped'] += 1
+        db.session.commit()
+
+        summary['connections'] += len(rows)
+        after = rows[-1].id
+        if pause:
+            time.sleep(pause)
+
+    logger.info(f"Re-encrypted {summary['rotated']} JIRA tokens across {summary['connections']} connections "
+                f"({summary['skipped']} changed meanwhile, {summary['failed']} unreadable)")
+    return summary
@@ -45,10 +45,25 @@ class JiraRateLimitError(JiraError):
         super().__init__(message, 'rate_limit')
 
 
+class JiraCircuitOpenError(JiraConnectionError):
+    """Raised instead of calling JIRA while the connection's circuit breaker is open"""
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.error_type = 'unavailable'
+        self.retry_after = retry_after
+
+
 def parse_jira_error(error: Exception) -> Dict:
     """
     Parse JIRA API errors into user-friendly messages
     """
+    if isinstance(error, JiraCircuitOpenError):
+        return {
+            'type': 'unavailable',
+            'message': 'JIRA is not responding; calls are paused.',
+            'user_message': f'JIRA is not responding. Requests are paused; try again in {max(1, round(error.retry_after))} seconds.'
+        }
+    
     error_str = str(error).lower()
     
     # Authentication errors
@@ -115,9 +130,12 @@ def parse_jira_error(error: Exception) -> Dict:
     }
 
 
-def validate_time_record_for_sync(record) -> Optional[str]:
+def validate_time_record_for_sync(record, min_seconds: int = 60) -> Optional[str]:
     """
     Validate that a time record has all required fields for JIRA sync
+    
+    ``min_seconds`` is 0 for records that go into an aggregated worklog,
+    where only the day's total has to reach JIRA's minimum.
     Returns: Error message if validation fails, None if valid
     """
     if not record.jira_issue_key:
@@ -137,7 +155,7 @@ def validate_time_record_for_sync(record) -> Optional[str]:
     duration = (record.timeout - record.timein).total_seconds()
     
     # JIRA worklogs must be at least 1 minute
-    if duration < 60:
+    if duration < min_seconds:
         return "Time record must be at least 1 minute long"
     
     # Warn if duration is unusually long (more than 24 hours)
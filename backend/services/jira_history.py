@@ -0,0 +1,136 @@
+"""
+Sync history reads and retention for ``jira_sync_log``.
+
+The log gets a row per sync attempt. History is read newest first with
+keyset pagination on ``(synced_at, id)``: each page returns a cursor for its
+last row and the next page continues strictly after it, so a deep page costs
+the same as the first and rows logged in between don't shift the pages.
+
+``compact_sync_log`` keeps the table from growing forever: successful
+attempts older than ``JIRA_SYNC_LOG_RETENTION_DAYS`` are collapsed into the
+newest of them per time record, which keeps count of the attempts it stands
+for (``attempts``) and when the first one was made (``first_synced_at``).
+Failed and drift entries are kept as they are.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import base64
+import logging
+
+from sqlalchemy import and_, delete, or_, update
+from database import db
+from models.jira import JiraSyncLog
+from models.time_record import TimeRecord
+
+logger = logging.getLogger(__name__)
+
+# Largest page GET /jira/sync/history will return
+MAX_HISTORY_PAGE = 500
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def encode_cursor(log: JiraSyncLog) -> str:
+    raw = f"{log.synced_at.strftime('%Y-%m-%dT%H:%M:%S.%f')}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """``(synced_at, id)`` of the last row of the previous page; ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        synced_at, log_id = raw.split('|')
+        return datetime.strptime(synced_at, '%Y-%m-%dT%H:%M:%S.%f'), int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def history_page(user_id, status: Optional[str] = None, record_id: Optional[int] = None,
+                 limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[JiraSyncLog], Optional[str]]:
+    """A page of the user's sync log, newest first, and the cursor for the next page (None at the end)"""
+    limit = max(1, min(limit, MAX_HISTORY_PAGE))
+
+    # Join with time_records to ensure user ownership
+    query = db.session.query(JiraSyncLog).join(
+        TimeRecord,
+        JiraSyncLog.time_record_id == TimeRecord.id
+    ).filter(
+        TimeRecord.user_id == user_id
+    )
+
+    if record_id:
+        query = query.filter(JiraSyncLog.time_record_id == record_id)
+    else:
+        # Lets the (synced_by_user_id, synced_at) index drive the scan
+        query = query.filter(JiraSyncLog.synced_by_user_id == user_id)
+
+    if status:
+        query = query.filter(JiraSyncLog.sync_status == status)
+
+    if cursor:
+        synced_at, log_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            JiraSyncLog.synced_at < synced_at,
+            and_(JiraSyncLog.synced_at == synced_at, JiraSyncLog.id < log_id)
+        ))
+
+    logs = query.order_by(JiraSyncLog.synced_at.desc(), JiraSyncLog.id.desc()).limit(limit + 1).all()
+    if len(logs) > limit:
+        return logs[:limit], encode_cursor(logs[limit - 1])
+    return logs, None
+
+
+def compact_sync_log(retention_days: int, batch_size: int = 500, now: Optional[datetime] = None) -> Dict:
+    """
+    Collapse successful attempts older than ``retention_days`` into one row per record.
+
+    Works through the records in batches of ``batch_size``, committing each.
+    Returns how many records were compacted and how many rows were deleted.
+    """
+    cutoff = (now or _now()) - timedelta(days=retention_days)
+    summary = {'records': 0, 'deleted': 0}
+    after = 0
+
+    while True:
+        groups = db.session.query(
+            JiraSyncLog.time_record_id,
+            db.func.max(JiraSyncLog.id),
+            db.func.sum(JiraSyncLog.attempts),
+            db.func.min(db.func.coalesce(JiraSyncLog.first_synced_at, JiraSyncLog.synced_at, type_=db.DateTime))
+        ).filter(
+            JiraSyncLog.sync_status == 'success',
+            JiraSyncLog.synced_at < cutoff,
+            JiraSyncLog.time_record_id > after
+        ).group_by(
+            JiraSyncLog.time_record_id
+        ).having(
+            db.func.count(JiraSyncLog.id) > 1
+        ).order_by(JiraSyncLog.time_record_id).limit(batch_size).all()
+        if not groups:
+            break
+
+        keep_ids = [keep_id for _, keep_id, _, _ in groups]
+        db.session.execute(update(JiraSyncLog), [
+            {'id': keep_id, 'attempts': attempts, 'first_synced_at': first_synced_at}
+            for _, keep_id, attempts, first_synced_at in groups
+        ])
+        result = db.session.execute(
+            delete(JiraSyncLog).where(
+                JiraSyncLog.time_record_id.in_([record_id for record_id, _, _, _ in groups]),
+                JiraSyncLog.sync_status == 'success',
+                JiraSyncLog.synced_at < cutoff,
+                JiraSyncLog.id.notin_(keep_ids)
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        summary['records'] += len(groups)
+        summary['deleted'] += result.rowcount
+        after = groups[-1][0]
+
+    if summary['deleted']:
+        logger.info(f"Compacted JIRA sync log: {summary['deleted']} rows folded into "
+                    f"{summary['records']} record summaries")
+    return summary
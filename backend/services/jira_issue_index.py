@@ -0,0 +1,303 @@
+"""
+Local full-text index of JIRA issues for typeahead.
+
+Each connection's issues (key, summary, status and display fields) are kept
+in an SQLite FTS5 table in a separate database file (``JIRA_ISSUE_INDEX_PATH``,
+default ``instance/jira_issue_index.db``) so ``/jira/issues/search`` can answer
+in milliseconds instead of waiting on JQL.
+
+The index is filled incrementally: each refresh asks JIRA for issues updated
+since the previous refresh started (the watermark) and upserts them. The
+window is sent as a relative JQL duration (``updated >= -90m``) because
+absolute JQL dates are read in the JIRA user's timezone. The first refresh
+for a connection covers ``JIRA_ISSUE_INDEX_DAYS``, and every refresh stops
+after ``JIRA_ISSUE_INDEX_MAX_ISSUES``; an index a refresh had to cut short is
+marked incomplete. Refreshes run on a background thread, at most one per
+connection, when a search finds the index older than
+``JIRA_ISSUE_INDEX_REFRESH_SECONDS``.
+
+A complete index refreshed within ``JIRA_ISSUE_INDEX_STALE_SECONDS``
+answers every search it has hits for, however few, so typeahead stays off
+JIRA. Searches it can't be trusted with (an incomplete or stale index, or no
+hits) are topped up from the live, cached JQL search, whose results are
+added to the index.
+"""
+from typing import Dict, Iterable, List, Optional
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+
+from flask import current_app
+from models.jira import JiraConnection
+from services.jira_service import JiraService
+from services.jira_cache import issue_cache
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Re-fetch a little before the watermark so clock skew can't drop an update
+WATERMARK_OVERLAP_MINUTES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue (
+    id INTEGER PRIMARY KEY,
+    connection_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    summary TEXT,
+    status TEXT,
+    assignee TEXT,
+    project TEXT,
+    issue_type TEXT,
+    updated TEXT,
+    UNIQUE (connection_id, key)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS issue_fts USING fts5(
+    key, summary, status, content='issue', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS issue_ai AFTER INSERT ON issue BEGIN
+    INSERT INTO issue_fts (rowid, key, summary, status) VALUES (new.id, new.key, new.summary, new.status);
+END;
+CREATE TRIGGER IF NOT EXISTS issue_ad AFTER DELETE ON issue BEGIN
+    INSERT INTO issue_fts (issue_fts, rowid, key, summary, status) VALUES ('delete', old.id, old.key, old.summary, old.status);
+END;
+CREATE TRIGGER IF NOT EXISTS issue_au AFTER UPDATE ON issue BEGIN
+    INSERT INTO issue_fts (issue_fts, rowid, key, summary, status) VALUES ('delete', old.id, old.key, old.summary, old.status);
+    INSERT INTO issue_fts (rowid, key, summary, status) VALUES (new.id, new.key, new.summary, new.status);
+END;
+CREATE TABLE IF NOT EXISTS index_state (
+    connection_id INTEGER PRIMARY KEY,
+    watermark REAL,
+    refreshed_at REAL,
+    issue_count INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+UPSERT = """
+INSERT INTO issue (connection_id, key, summary, status, assignee, project, issue_type, updated)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (connection_id, key) DO UPDATE SET
+    summary = excluded.summary,
+    status = excluded.status,
+    assignee = excluded.assignee,
+    project = excluded.project,
+    issue_type = excluded.issue_type,
+    updated = COALESCE(excluded.updated, issue.updated)
+"""
+
+
+class JiraIssueIndex:
+    """SQLite FTS5 index of issues per JIRA connection"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def configure(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            if 'complete' not in {row['name'] for row in conn.execute('PRAGMA table_info(index_state)')}:
+                # Index files from before completeness was tracked are rebuilt
+                # (they may also hold project names where keys belong)
+                with _transaction(conn):
+                    conn.execute('ALTER TABLE index_state ADD COLUMN complete INTEGER NOT NULL DEFAULT 0')
+                    conn.execute('DELETE FROM index_state')
+                    conn.execute('DELETE FROM issue')
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def state(self, connection_id: int) -> Optional[sqlite3.Row]:
+        return self._db().execute(
+            'SELECT * FROM index_state WHERE connection_id = ?', (connection_id,)
+        ).fetchone()
+
+    def is_current(self, connection_id: int, max_age: float) -> bool:
+        """Whether the connection's index is complete and was refreshed within ``max_age`` seconds"""
+        state = self.state(connection_id)
+        return bool(state is not None and state['complete'] and state['refreshed_at']
+                    and time.time() - state['refreshed_at'] < max_age)
+
+    def search(self, connection_id: int, query: str, limit: int = 50) -> Optional[List[Dict]]:
+        """Issues matching every word of ``query`` as a prefix; None if the connection isn't indexed"""
+        if self.state(connection_id) is None:
+            return None
+        tokens = re.findall(r'\w+', query.lower())
+        if not tokens:
+            return []
+
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        rows = self._db().execute(
+            """
+            SELECT issue.* FROM issue_fts JOIN issue ON issue.id = issue_fts.rowid
+            WHERE issue_fts MATCH ? AND issue.connection_id = ?
+            ORDER BY issue.key = ? COLLATE NOCASE DESC, bm25(issue_fts), issue.updated DESC
+            LIMIT ?
+            """,
+            (match, connection_id, query.strip(), limit)
+        ).fetchall()
+        return [_row_to_issue(row) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, connection_id: int, issues: Iterable[Dict]) -> int:
+        rows = [
+            (connection_id, issue['key'], issue.get('summary'), issue.get('status'), issue.get('assignee'),
+             issue.get('project'), issue.get('issueType'), issue.get('updated'))
+            for issue in issues if issue.get('key')
+        ]
+        if rows:
+            db = self._db()
+            with _transaction(db):
+                db.executemany(UPSERT, rows)
+        return len(rows)
+
+    def drop(self, connection_id: int):
+        """Forget a connection's issues (deleted, or pointed at another site)"""
+        db = self._db()
+        with _transaction(db):
+            db.execute('DELETE FROM issue WHERE connection_id = ?', (connection_id,))
+            db.execute('DELETE FROM index_state WHERE connection_id = ?', (connection_id,))
+
+    def refresh(self, connection_id: int, service: JiraService, initial_days: int = 180,
+                max_issues: int = 10000) -> int:
+        """Pull issues updated since the watermark into the index; returns how many were fetched"""
+        started = time.time()
+        state = self.state(connection_id)
+        first_build = state is None or state['watermark'] is None
+        if first_build:
+            since_minutes = initial_days * 24 * 60
+        else:
+            since_minutes = math.ceil((started - state['watermark']) / 60) + WATERMARK_OVERLAP_MINUTES
+
+        fetched = 0
+        for page in service.iter_updated_issues(since_minutes, max_issues=max_issues):
+            fetched += self.upsert(connection_id, page)
+        # Cut short: issues updated in the window were left out
+        complete = fetched < max_issues and (first_build or bool(state['complete']))
+
+        db = self._db()
+        with _transaction(db):
+            count = db.execute('SELECT COUNT(*) FROM issue WHERE connection_id = ?', (connection_id,)).fetchone()[0]
+            db.execute(
+                """
+                INSERT INTO index_state (connection_id, watermark, refreshed_at, issue_count, complete)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (connection_id) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    refreshed_at = excluded.refreshed_at,
+                    issue_count = excluded.issue_count,
+                    complete = excluded.complete
+                """,
+                (connection_id, started, time.time(), count, int(complete))
+            )
+        logger.info(f"Refreshed JIRA issue index for connection {connection_id}: "
+                    f"{fetched} updated, {count} indexed{'' if complete else ' (incomplete)'}")
+        return fetched
+
+    def refresh_in_background(self, connection_id: int, service: JiraService, refresh_after: float,
+                              initial_days: int = 180, max_issues: int = 10000) -> bool:
+        """Start a refresh if the index is older than ``refresh_after`` seconds and none is running"""
+        state = self.state(connection_id)
+        if state is not None and state['refreshed_at'] and time.time() - state['refreshed_at'] < refresh_after:
+            return False
+
+        with self._lock:
+            if connection_id in self._refreshing:
+                return False
+            self._refreshing.add(connection_id)
+
+        def run():
+            try:
+                self.refresh(connection_id, service, initial_days, max_issues)
+            except Exception as e:
+                logger.warning(f"JIRA issue index refresh failed for connection {connection_id}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(connection_id)
+
+        threading.Thread(target=run, name=f'jira-index-{connection_id}', daemon=True).start()
+        return True
+
+
+class _transaction:
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+
+def _row_to_issue(row: sqlite3.Row) -> Dict:
+    return {
+        'key': row['key'],
+        'summary': row['summary'] or '',
+        'status': row['status'] or 'Unknown',
+        'assignee': row['assignee'],
+        'issueType': row['issue_type'] or 'Unknown',
+        'project': row['project'] or 'Unknown',
+    }
+
+
+issue_index = JiraIssueIndex()
+
+
+def search_issues(connection: JiraConnection, service: JiraService, query: str,
+                  max_results: int = 50) -> List[Dict]:
+    """Typeahead search: the local index, topped up with live (cached) JQL when it can't answer alone"""
+    config = current_app.config
+    hits, current = [], False
+    try:
+        issue_index.refresh_in_background(
+            connection.id, service,
+            refresh_after=config.get('JIRA_ISSUE_INDEX_REFRESH_SECONDS', 120),
+            initial_days=config.get('JIRA_ISSUE_INDEX_DAYS', 180),
+            max_issues=config.get('JIRA_ISSUE_INDEX_MAX_ISSUES', 10000)
+        )
+        hits = issue_index.search(connection.id, query, max_results) or []
+        current = issue_index.is_current(connection.id, config.get('JIRA_ISSUE_INDEX_STALE_SECONDS', 900))
+    except sqlite3.Error as e:
+        logger.warning(f"JIRA issue index unavailable: {str(e)}")
+
+    answered = current and bool(hits)
+    record_cache('jira_issue_index', answered)
+    if answered:
+        return hits
+
+    live = issue_cache.search_issues(connection, service, query, max_results)
+    try:
+        issue_index.upsert(connection.id, live)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not add live search results to the JIRA issue index: {str(e)}")
+    indexed = {issue['key'] for issue in hits}
+    return (hits + [issue for issue in live if issue['key'] not in indexed])[:max_results]
+
+
+def init_app(app):
+    issue_index.configure(
+        app.config.get('JIRA_ISSUE_INDEX_PATH') or os.path.join(app.instance_path, 'jira_issue_index.db')
+    )
@@ -0,0 +1,209 @@
+"""
+Persistent queue for bulk JIRA syncs.
+
+``POST /jira/sync/bulk`` stores a JiraSyncJob with one JiraSyncJobItem per
+record and returns immediately. ``flask jira-worker`` processes claim queued
+jobs with a conditional UPDATE (so several workers can poll the same
+database), run them through the sync engine and commit outcomes in small
+batches as they complete so ``GET /jira/sync/jobs/<id>`` can report progress.
+While a job runs a timer thread refreshes its heartbeat, however long
+individual JIRA calls take; jobs whose worker stops heartbeating (the
+process died) are put back on the queue.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import os
+import socket
+import threading
+import time
+import logging
+
+from flask import current_app
+from sqlalchemy import insert, update
+from database import db
+from models.jira import JiraConnection, JiraSyncJob, JiraSyncJobItem
+from services.jira_sync import sync_records
+
+logger = logging.getLogger(__name__)
+
+# Progress (records, items and job counters) is committed after this many outcomes or seconds
+PROGRESS_FLUSH_RECORDS = 100
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_bulk_sync(user_id, connection: JiraConnection, record_ids: List[int]) -> JiraSyncJob:
+    """Queue a bulk sync of ``record_ids``; returns the committed job"""
+    record_ids = list(dict.fromkeys(record_ids))
+    job = JiraSyncJob(
+        user_id=user_id,
+        connection_id=connection.id,
+        status='queued',
+        total=len(record_ids)
+    )
+    db.session.add(job)
+    db.session.flush()
+
+    if record_ids:
+        db.session.execute(insert(JiraSyncJobItem), [
+            {'job_id': job.id, 'time_record_id': record_id, 'status': 'pending'}
+            for record_id in record_ids
+        ])
+    db.session.commit()
+    return job
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale_jobs(stale_after: int) -> int:
+    """Put running jobs whose worker stopped heartbeating back on the queue"""
+    cutoff = _now() - timedelta(seconds=stale_after)
+    result = db.session.execute(
+        update(JiraSyncJob)
+        .where(JiraSyncJob.status == 'running', JiraSyncJob.heartbeat_at < cutoff)
+        .values(status='queued', worker_id=None)
+    )
+    db.session.commit()
+    if result.rowcount:
+        logger.warning(f"Requeued {result.rowcount} stale JIRA sync job(s)")
+    return result.rowcount
+
+
+def claim_next_job(worker_id: str) -> Optional[JiraSyncJob]:
+    """Atomically take the oldest queued job, or return None"""
+    while True:
+        job_id = db.session.query(JiraSyncJob.id).filter(
+            JiraSyncJob.status == 'queued'
+        ).order_by(JiraSyncJob.id).limit(1).scalar()
+        if job_id is None:
+            return None
+
+        now = _now()
+        result = db.session.execute(
+            update(JiraSyncJob)
+            .where(JiraSyncJob.id == job_id, JiraSyncJob.status == 'queued')
+            .values(status='running', worker_id=worker_id, started_at=now, heartbeat_at=now)
+        )
+        db.session.commit()
+        if result.rowcount == 1:
+            return db.session.get(JiraSyncJob, job_id)
+        # Another worker claimed it first; try the next one
+
+
+class JobHeartbeat:
+    """Refreshes a running job's ``heartbeat_at`` every ``interval`` seconds from its own thread"""
+
+    def __init__(self, job: JiraSyncJob, interval: float):
+        self.job_id = job.id
+        self.worker_id = job.worker_id
+        self.interval = interval
+        self._app = current_app._get_current_object()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'jira-job-{job.id}-heartbeat', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        with self._app.app_context():
+            while not self._stopped.wait(self.interval):
+                try:
+                    # Only while this worker still owns the job; a requeued job stays requeued
+                    db.session.execute(
+                        update(JiraSyncJob)
+                        .where(JiraSyncJob.id == self.job_id, JiraSyncJob.status == 'running',
+                               JiraSyncJob.worker_id == self.worker_id)
+                        .values(heartbeat_at=_now())
+                    )
+                    db.session.commit()
+                except Exception as e:
+                    logger.warning(f"Heartbeat for JIRA sync job {self.job_id} failed: {str(e)}")
+                    db.session.rollback()
+            db.session.remove()
+
+
+def run_job(job: JiraSyncJob, heartbeat_seconds: float = 60):
+    """Process a claimed job, committing outcomes in batches as they land"""
+    connection = db.session.get(JiraConnection, job.connection_id)
+    item_ids = dict(db.session.query(JiraSyncJobItem.time_record_id, JiraSyncJobItem.id).filter(
+        JiraSyncJobItem.job_id == job.id,
+        JiraSyncJobItem.status == 'pending'
+    ).all())
+
+    if connection is None or not connection.is_active:
+        job.status = 'failed'
+        job.error = 'JIRA connection is no longer active'
+        job.finished_at = _now()
+        db.session.commit()
+        return
+
+    def on_results(outcomes):
+        now = _now()
+        rows = []
+        for record_id, result in outcomes:
+            item_id = item_ids.get(record_id)
+            if item_id is None:
+                continue
+            if result['success']:
+                job.succeeded += 1
+            else:
+                job.failed += 1
+            rows.append({
+                'id': item_id,
+                'status': 'success' if result['success'] else 'failed',
+                'jira_worklog_id': result.get('worklog_id'),
+                'error': result.get('error'),
+                'finished_at': now,
+            })
+        if rows:
+            db.session.execute(update(JiraSyncJobItem), rows)
+        job.heartbeat_at = now
+        db.session.commit()
+
+    try:
+        with JobHeartbeat(job, heartbeat_seconds):
+            sync_records(job.user_id, connection, list(item_ids), on_results=on_results,
+                         flush_every=PROGRESS_FLUSH_RECORDS, flush_seconds=PROGRESS_FLUSH_SECONDS)
+        job.status = 'completed'
+    except Exception as e:
+        logger.error(f"JIRA sync job {job.id} failed: {str(e)}", exc_info=True)
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(e)
+
+    job.finished_at = _now()
+    db.session.commit()
+
+
+def work(worker_id: str, poll_interval: float = 1.0, stale_after: int = 300,
+         once: bool = False, should_stop=lambda: False):
+    """Worker loop: claim and run jobs until ``should_stop()`` (or the queue drains with ``once``)"""
+    logger.info(f"JIRA sync worker {worker_id} started")
+    last_stale_check = 0.0
+    while not should_stop():
+        if time.monotonic() - last_stale_check > stale_after / 2:
+            requeue_stale_jobs(stale_after)
+            last_stale_check = time.monotonic()
+
+        job = claim_next_job(worker_id)
+        if job is None:
+            db.session.remove()
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"Worker {worker_id} running JIRA sync job {job.id} ({job.total} records)")
+        run_job(job, heartbeat_seconds=stale_after / 4)
+        db.session.remove()
+    logger.info(f"JIRA sync worker {worker_id} stopped")
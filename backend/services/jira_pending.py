@@ -0,0 +1,118 @@
+"""
+The "sync queue": a user's time records that still need to reach JIRA.
+
+Records with an issue key that aren't synced are pending (never synced, or
+changed since), failed (the last attempt returned an error) or drifted
+(reconciliation found their worklog changed or deleted in JIRA). They are
+read in one query on the partial index ``ix_time_record_jira_pending``
+(``user_id`` where ``jira_issue_key IS NOT NULL AND jira_synced = 0``), so the
+cost follows the size of the queue rather than the user's whole history.
+Each record comes back with its duration and the result of the same
+validation a sync would run (with the settings of the connection its issue
+routes to).
+
+Only the newest ``limit`` records are returned, but ``counts`` always covers
+the whole queue: when it is longer than the page they come from a COUNT per
+status on the same index, and the validation is run over just the columns it
+reads.
+"""
+from typing import Dict, Optional
+import logging
+
+from sqlalchemy import case, func
+
+from database import db
+from models.time_record import TimeRecord
+from services.jira_errors import validate_time_record_for_sync
+from services.jira_reconcile import DRIFT_DELETED, DRIFT_EDITED_LOCAL, DRIFT_EDITED_REMOTE
+from services.jira_routing import ConnectionRouter
+
+logger = logging.getLogger(__name__)
+
+# Largest number of records GET /jira/sync/pending will return
+MAX_PENDING_RECORDS = 2000
+
+DRIFT_REASONS = (DRIFT_DELETED, DRIFT_EDITED_REMOTE, DRIFT_EDITED_LOCAL)
+
+
+def pending_status(record: TimeRecord) -> str:
+    if not record.jira_sync_error:
+        return 'pending'
+    if record.jira_sync_error in DRIFT_REASONS:
+        return 'drifted'
+    return 'failed'
+
+
+def _queue_filter(user_id):
+    # The first two filters repeat the partial index's WHERE so the planner can use it
+    return (
+        TimeRecord.jira_issue_key.isnot(None),
+        TimeRecord.jira_synced == False,  # noqa: E712
+        TimeRecord.user_id == user_id,
+        TimeRecord.jira_issue_key != ''
+    )
+
+
+def _validation_error(record, router: ConnectionRouter) -> Optional[str]:
+    connection = router.connection_for(record.jira_issue_key)
+    aggregated = bool(record.jira_worklog_group or (connection and connection.aggregate_worklogs))
+    return validate_time_record_for_sync(record, min_seconds=0 if aggregated else 60)
+
+
+def pending_counts(user_id, router: Optional[ConnectionRouter] = None) -> Dict[str, int]:
+    """How many of the user's queued records are pending, failed, drifted and invalid"""
+    router = router or ConnectionRouter(user_id)
+    status = case(
+        (func.coalesce(TimeRecord.jira_sync_error, '') == '', 'pending'),
+        (TimeRecord.jira_sync_error.in_(DRIFT_REASONS), 'drifted'),
+        else_='failed'
+    )
+    counts = {'pending': 0, 'failed': 0, 'drifted': 0, 'invalid': 0}
+    counts.update(db.session.query(status, func.count()).filter(*_queue_filter(user_id)).group_by(status).all())
+
+    rows = db.session.query(
+        TimeRecord.id, TimeRecord.jira_issue_key, TimeRecord.jira_worklog_group,
+        TimeRecord.timein, TimeRecord.timeout
+    ).filter(*_queue_filter(user_id))
+    counts['invalid'] = sum(1 for row in rows if _validation_error(row, router))
+    return counts
+
+
+def _page_counts(entries) -> Dict[str, int]:
+    counts = {'pending': 0, 'failed': 0, 'drifted': 0, 'invalid': 0}
+    for entry in entries:
+        counts[entry['status']] += 1
+        if entry['validation_error']:
+            counts['invalid'] += 1
+    return counts
+
+
+def pending_records(user_id, router: Optional[ConnectionRouter] = None, limit: int = 500) -> Dict:
+    """The user's unsynced records with an issue key, newest first, with durations and validation"""
+    limit = max(1, min(limit, MAX_PENDING_RECORDS))
+    router = router or ConnectionRouter(user_id)
+
+    records = TimeRecord.query.filter(*_queue_filter(user_id)).order_by(
+        TimeRecord.timein.desc(), TimeRecord.id.desc()
+    ).limit(limit + 1).all()
+
+    truncated = len(records) > limit
+    results = []
+    for record in records[:limit]:
+        status = pending_status(record)
+        validation_error = _validation_error(record, router)
+
+        entry = record.to_dict()
+        entry.update({
+            'status': status,
+            'duration_seconds': int((record.timeout - record.timein).total_seconds())
+            if record.timein and record.timeout else None,
+            'validation_error': validation_error
+        })
+        results.append(entry)
+
+    return {
+        'records': results,
+        'counts': pending_counts(user_id, router) if truncated else _page_counts(results),
+        'truncated': truncated
+    }
@@ -0,0 +1,298 @@
+"""
+Per-connection pacing and retries for outbound JIRA calls.
+
+Every HTTP call a JiraService makes goes through its connection's
+``AdaptiveLimiter``: a token bucket caps the request rate and an AIMD window
+caps how many calls are in flight. Each success widens the window a little
+(and lets the rate recover); a 429 halves both and pauses the whole
+connection until JIRA's ``Retry-After`` has passed, so a bulk sync slows to
+the pace JIRA accepts instead of failing every remaining record.
+
+``RetryingHTTPAdapter`` retries 429/503 responses and transient connection
+failures with capped, fully jittered exponential backoff. POST requests are
+only retried when JIRA cannot have processed them (429/503 or a failed
+connect), so a worklog is never created twice by a retry. Each attempt also
+goes through the connection's circuit breaker (services/jira_circuit.py) and
+uses explicit connect/read timeouts.
+
+A user waiting on a response is better served by a quick error than by the
+patience a bulk sync needs, so calls made under ``interactive_retries()``
+retry at most ``JIRA_INTERACTIVE_MAX_RETRIES`` times and wait at most
+``JIRA_INTERACTIVE_RETRY_MAX_SECONDS`` between attempts.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+import random
+import threading
+import time
+import logging
+
+import requests
+from flask import current_app
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from services import metrics
+from services.instrumentation import TimedHTTPAdapter
+from services.jira_circuit import OPEN, CircuitBreaker, breaker_for, is_failure_status
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# (retries, backoff cap) overriding the adapter's own while set
+_retry_policy: ContextVar[Optional[Tuple[int, float]]] = ContextVar('jira_retry_policy', default=None)
+
+
+class AdaptiveLimiter:
+    """Token bucket plus an AIMD concurrency window for one JIRA connection"""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, min_rate: float = 0.5):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(min_rate, self.base_rate)
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._cond = threading.Condition()
+        # Called after every release, for waiters that cannot block on _cond (the async client)
+        self._release_listeners = []
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _try_start(self):
+        """(True, None) if a call was started, else (False, seconds to wait or None until a release)"""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return False, self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return False, None
+        if self._tokens < 1:
+            return False, (1 - self._tokens) / self.rate
+        self._tokens -= 1
+        self.in_flight += 1
+        return True, None
+
+    def acquire(self):
+        """Block until a call may start"""
+        with self._cond:
+            while True:
+                started, wait = self._try_start()
+                if started:
+                    return
+                self._cond.wait(wait)
+
+    def try_acquire(self) -> Tuple[bool, Optional[float]]:
+        """Start a call if one may start now; same result as _try_start"""
+        with self._cond:
+            return self._try_start()
+
+    def add_release_listener(self, listener: Callable[[], None]):
+        with self._cond:
+            self._release_listeners.append(listener)
+
+    def remove_release_listener(self, listener: Callable[[], None]):
+        with self._cond:
+            if listener in self._release_listeners:
+                self._release_listeners.remove(listener)
+
+    def release(self, throttled: bool = False, retry_after: Optional[float] = None):
+        """Finish a call; ``throttled`` (a 429) triggers the multiplicative decrease"""
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+            self._cond.notify_all()
+            listeners = list(self._release_listeners)
+        for listener in listeners:
+            listener()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {'limit': int(self.limit), 'in_flight': self.in_flight, 'rate': round(self.rate, 2)}
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(connection_id: int) -> AdaptiveLimiter:
+    """The process-wide limiter for a connection (sized from the app config on first use)"""
+    with _limiters_lock:
+        limiter = _limiters.get(connection_id)
+        if limiter is None:
+            config = current_app.config
+            limiter = _limiters[connection_id] = AdaptiveLimiter(
+                rate=config.get('JIRA_RATE_LIMIT_PER_SECOND', 10),
+                burst=config.get('JIRA_RATE_LIMIT_BURST', 20),
+                max_concurrency=config.get('JIRA_SYNC_CONCURRENCY', 8)
+            )
+        return limiter
+
+
+def reset_limiters():
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def interactive_retries():
+    """Retry JIRA calls made inside (on this thread) sparingly, for a user waiting on them
+
+    Also usable as a route decorator.
+    """
+    config = current_app.config
+    token = _retry_policy.set((
+        config.get('JIRA_INTERACTIVE_MAX_RETRIES', 1),
+        config.get('JIRA_INTERACTIVE_RETRY_MAX_SECONDS', 2)
+    ))
+    try:
+        yield
+    finally:
+        _retry_policy.reset(token)
+
+
+def never_connected(error: Exception) -> bool:
+    """Whether a requests ConnectionError failed before a connection to JIRA was made"""
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, NewConnectionError)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryingHTTPAdapter(TimedHTTPAdapter):
+    """Paces calls through a connection's limiter and breaker and retries transient failures"""
+
+    def __init__(self, limiter: AdaptiveLimiter, retries: int = 4, backoff_base: float = 0.5,
+                 backoff_cap: float = 30.0, breaker: Optional[CircuitBreaker] = None,
+                 timeout: Optional[Tuple[float, float]] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker
+        self.timeout = timeout
+
+    def send(self, request, *args, **kwargs):
+        if self.timeout is not None:
+            kwargs['timeout'] = self.timeout
+        retries, backoff_cap = _retry_policy.get() or (self.retries, self.backoff_cap)
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.allow()
+            self.limiter.acquire()
+            try:
+                response = super().send(request, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.limiter.release()
+                self._record(failure=type(e).__name__)
+                if self._circuit_open() or not self._may_retry(request, attempt, retries, e):
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, backoff_cap)
+                reason = 'connection'
+            except BaseException:
+                self.limiter.release()
+                if self.breaker is not None:
+                    self.breaker.abandon()
+                raise
+            else:
+                throttled = response.status_code == 429
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.limiter.release(throttled=throttled, retry_after=retry_after)
+                self._record(failure=f"HTTP {response.status_code}"
+                             if is_failure_status(response.status_code) else None)
+                if (response.status_code not in RETRY_STATUSES or attempt >= retries
+                        or self._circuit_open()):
+                    return response
+                delay = retry_after if retry_after is not None else backoff_delay(
+                    attempt, self.backoff_base, backoff_cap)
+                delay = min(delay, backoff_cap)
+                reason = str(response.status_code)
+                response.close()
+
+            attempt += 1
+            metrics.jira_retries.inc(reason=reason)
+            logger.info(f"Retrying JIRA {request.method} {request.path_url} in {delay:.2f}s "
+                        f"(attempt {attempt}/{retries}, {reason})")
+            time.sleep(delay)
+
+    def _circuit_open(self) -> bool:
+        """Whether the breaker opened, so a retry would only be rejected"""
+        return self.breaker is not None and self.breaker.state == OPEN
+
+    def _record(self, failure: Optional[str] = None):
+        if self.breaker is None:
+            return
+        if failure:
+            self.breaker.record_failure(failure)
+        else:
+            self.breaker.record_success()
+
+    def _may_retry(self, request, attempt: int, retries: int, error: Exception) -> bool:
+        if attempt >= retries:
+            return False
+        if request.method in IDEMPOTENT_METHODS:
+            return True
+        # The request never reached JIRA, so even a POST is safe to resend
+        return isinstance(error, requests.ConnectTimeout) or never_connected(error)
+
+
+def jira_timeouts() -> Tuple[float, float]:
+    """(connect, read) timeouts for JIRA calls from the app config"""
+    config = current_app.config
+    return (config.get('JIRA_CONNECT_TIMEOUT_SECONDS', 5), config.get('JIRA_READ_TIMEOUT_SECONDS', 30))
+
+
+def paced_session(connection_id: int, pool_maxsize: int = 10) -> requests.Session:
+    """A timed requests Session paced by the connection's limiter and breaker, with retries"""
+    config = current_app.config
+    adapter = RetryingHTTPAdapter(
+        limiter_for(connection_id),
+        retries=config.get('JIRA_MAX_RETRIES', 4),
+        backoff_base=config.get('JIRA_RETRY_BASE_SECONDS', 0.5),
+        backoff_cap=config.get('JIRA_RETRY_MAX_SECONDS', 30),
+        breaker=breaker_for(connection_id),
+        timeout=jira_timeouts(),
+        pool_maxsize=pool_maxsize
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
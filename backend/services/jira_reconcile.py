@@ -0,0 +1,231 @@
+"""
+Reconciliation of synced time records against JIRA worklogs.
+
+Rather than fetching every synced record's worklog, a reconcile pass reads
+JIRA's site-wide change feeds (``worklog/updated`` and ``worklog/deleted``)
+from the connection's watermark, keeps only the worklog ids our records
+point at, and fetches the details of the changed ones with ``worklog/list``
+in batches of 1000. Records edited locally since their last sync are found
+from ``jira_sync_hash`` without calling JIRA at all; records covered by an
+aggregated worklog are compared as a group.
+
+Drift is written to the sync log (status "drift") and the record is marked
+unsynced with the reason. With ``fix`` the time record is treated as the
+source of truth and its worklog is written back to JIRA (recreated if it was
+deleted there).
+
+The feeds are site-wide, so a first pass (or one after a long gap) can span
+many pages. ``max_pages`` bounds the pages read from each feed in one call;
+the watermark then advances only as far as both feeds were read, and the
+summary's ``complete`` is false until a call reaches the end.
+
+With several JIRA connections each is reconciled against the records whose
+worklogs it holds (``jira_connection_id``); worklog ids are only unique
+within a JIRA site. Fixes are written to the connection each record's issue
+routes to now (services/jira_routing.py).
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import update
+from database import db
+from models.jira import JiraConnection, JiraSyncLog
+from models.time_record import TimeRecord
+from services.jira_client_pool import get_jira_service
+from services.jira_routing import ConnectionRouter, route_records
+from services.jira_sync import aggregate_hash, sync_hash, sync_records, worklog_fingerprint, worklog_group
+
+logger = logging.getLogger(__name__)
+
+DRIFT_DELETED = 'Worklog was deleted in JIRA'
+DRIFT_EDITED_REMOTE = 'Worklog was edited in JIRA'
+DRIFT_EDITED_LOCAL = 'Time record changed since it was synced'
+
+
+def _epoch_ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def remote_hash(record: TimeRecord, worklog: Dict) -> str:
+    """Fingerprint of a JIRA worklog, comparable with the record's ``jira_sync_hash``"""
+    try:
+        started = datetime.strptime(worklog.get('started'), '%Y-%m-%dT%H:%M:%S.%f%z')
+    except (TypeError, ValueError):
+        return ''
+    return worklog_fingerprint(
+        record.jira_issue_key,
+        started.astimezone(timezone.utc).replace(tzinfo=None),
+        worklog.get('timeSpentSeconds') or 0,
+        str(worklog.get('comment') or '')
+    )
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def reconcile_connection(connection: JiraConnection, fix: bool = False, batch_size: int = 500,
+                         router: Optional[ConnectionRouter] = None, max_pages: Optional[int] = None) -> Dict:
+    """
+    Compare the connection owner's synced records with JIRA and record (or fix) drift.
+
+    Only records whose worklogs were written with this connection are considered.
+    At most ``max_pages`` pages of each change feed are read (None reads them all).
+
+    Commits, and advances the connection's watermark to where both feeds were read.
+    Returns a summary: changed worklogs checked, drifted records, per-record
+    details and whether the feeds were read to the end.
+    """
+    user_id = connection.user_id
+    held = TimeRecord.jira_connection_id == connection.id
+    # An aggregated worklog covers several records
+    worklog_records = {}
+    for worklog_id, record_id in db.session.query(TimeRecord.jira_worklog_id, TimeRecord.id).filter(
+        TimeRecord.user_id == user_id,
+        TimeRecord.jira_worklog_id.isnot(None),
+        held
+    ):
+        worklog_records.setdefault(worklog_id, []).append(record_id)
+
+    since = connection.worklogs_reconciled_until
+    if since is None:
+        first_sync = db.session.query(db.func.min(TimeRecord.last_synced_at)).filter(
+            TimeRecord.user_id == user_id,
+            TimeRecord.jira_worklog_id.isnot(None),
+            held
+        ).scalar()
+        since = _epoch_ms(first_sync) if first_sync else _epoch_ms(datetime.now(timezone.utc))
+
+    drift = {}
+    checked = 0
+    watermark = since
+    complete = True
+
+    # Local edits: the record (or its group) no longer hashes to what was written to JIRA
+    groups = {}
+    for record in TimeRecord.query.filter(
+        TimeRecord.user_id == user_id,
+        TimeRecord.jira_synced.is_(True),
+        TimeRecord.jira_sync_hash.isnot(None),
+        held
+    ).yield_per(batch_size):
+        if record.jira_worklog_group:
+            groups.setdefault(record.jira_worklog_group, []).append(record)
+        elif record.timein and record.timeout and record.jira_sync_hash != sync_hash(record):
+            drift[record.id] = DRIFT_EDITED_LOCAL
+    for group, members in groups.items():
+        if any(worklog_group(r) != group for r in members) or \
+                {r.jira_sync_hash for r in members} != {aggregate_hash(group, members)}:
+            for record in members:
+                drift[record.id] = DRIFT_EDITED_LOCAL
+
+    if worklog_records:
+        jira_service = get_jira_service(connection)
+        wanted = set(worklog_records)
+        deleted_ids, deleted_until, deleted_done = jira_service.changed_worklog_ids(
+            since, deleted=True, wanted=wanted, max_pages=max_pages)
+        updated_ids, updated_until, updated_done = jira_service.changed_worklog_ids(
+            since, wanted=wanted, max_pages=max_pages)
+        # A feed read to the end has nothing more before the other's watermark, so
+        # only feeds cut short hold it back; the next call re-reads past it
+        feeds = [(deleted_until, deleted_done), (updated_until, updated_done)]
+        partial = [until for until, done in feeds if not done]
+        watermark = min(partial) if partial else min(deleted_until, updated_until)
+        complete = not partial
+        checked = len(deleted_ids) + len(updated_ids)
+
+        for worklog_id in deleted_ids:
+            for record_id in worklog_records[worklog_id]:
+                drift.setdefault(record_id, DRIFT_DELETED)
+
+        deleted = set(deleted_ids)
+        changed = {w['id']: w for w in jira_service.get_worklogs([i for i in updated_ids if i not in deleted])}
+        for batch in _chunks(list(changed), batch_size):
+            for record in TimeRecord.query.filter(
+                TimeRecord.user_id == user_id,
+                TimeRecord.jira_worklog_id.in_(batch),
+                held
+            ):
+                if record.id in drift or not (record.timein and record.timeout):
+                    continue
+                expected = record.jira_sync_hash or sync_hash(record)
+                if remote_hash(record, changed[record.jira_worklog_id]) != expected:
+                    drift[record.id] = DRIFT_EDITED_REMOTE
+
+    results = {'checked': checked, 'drifted': len(drift), 'fixed': 0, 'failed': 0, 'records': [],
+               'complete': complete}
+    records = []
+    now = datetime.now(timezone.utc)
+    for batch in _chunks(list(drift), batch_size):
+        for record in TimeRecord.query.filter(TimeRecord.id.in_(batch)):
+            reason = drift[record.id]
+            db.session.add(JiraSyncLog(
+                time_record_id=record.id,
+                jira_issue_key=record.jira_issue_key or '',
+                jira_worklog_id=record.jira_worklog_id,
+                sync_status='drift',
+                sync_error=reason,
+                synced_at=now,
+                synced_by_user_id=user_id
+            ))
+            record.jira_synced = False
+            record.jira_sync_error = reason
+            records.append(record)
+            results['records'].append({'record_id': record.id, 'reason': reason})
+
+    if fix:
+        # Also repair drift marked by earlier passes
+        records += TimeRecord.query.filter(
+            TimeRecord.user_id == user_id,
+            TimeRecord.jira_synced.is_(False),
+            TimeRecord.jira_worklog_id.isnot(None),
+            TimeRecord.jira_sync_error.in_([DRIFT_DELETED, DRIFT_EDITED_REMOTE, DRIFT_EDITED_LOCAL]),
+            TimeRecord.id.notin_(list(drift)),
+            held
+        ).all()
+        for record in records[len(results['records']):]:
+            results['records'].append({'record_id': record.id, 'reason': record.jira_sync_error})
+
+        fixable = [r.id for r in records if r.jira_issue_key and r.timein and r.timeout]
+        outcomes = {}
+        for target, record_ids in route_records(user_id, fixable, router):
+            sync_records(user_id, target, record_ids, on_results=outcomes.update)
+        for result in outcomes.values():
+            results['fixed' if result['success'] else 'failed'] += 1
+        for entry in results['records']:
+            result = outcomes.get(entry['record_id'])
+            entry['fixed'] = bool(result and result['success'])
+            if result and not result['success']:
+                entry['error'] = result['error']
+
+    # Core UPDATE so the watermark doesn't bump updated_at (which invalidates pooled clients)
+    db.session.execute(
+        update(JiraConnection)
+        .where(JiraConnection.id == connection.id)
+        .values(worklogs_reconciled_until=watermark, updated_at=JiraConnection.updated_at)
+    )
+    db.session.commit()
+
+    if drift:
+        logger.info(f"Reconciled JIRA connection {connection.id}: {len(drift)} drifted, "
+                    f"{results['fixed']} fixed, {results['failed']} failed")
+    return results
+
+
+def reconcile_all(fix: bool = False) -> List[Dict]:
+    """Reconcile every active connection; returns one summary per connection"""
+    summaries = []
+    for connection_id, in db.session.query(JiraConnection.id).filter(JiraConnection.is_active.is_(True)).all():
+        connection = db.session.get(JiraConnection, connection_id)
+        try:
+            summary = reconcile_connection(connection, fix=fix)
+        except Exception as e:
+            logger.error(f"Reconciliation failed for JIRA connection {connection_id}: {str(e)}", exc_info=True)
+            db.session.rollback()
+            summary = {'error': str(e)}
+        summaries.append(dict(summary, connection_id=connection_id))
+    return summaries
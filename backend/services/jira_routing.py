@@ -0,0 +1,210 @@
+"""
+Routing work across a user's JIRA connections.
+
+A user can connect several JIRA sites. Each connection claims projects in
+``jira_project_route`` (unique per user and project key), and an issue goes
+to the active connection that claims its project, the part of the key
+before the "-". Issues of unclaimed projects go to the user's default
+connection, the oldest active one, so a single connection needs no routes.
+
+``ConnectionRouter`` loads a user's active connections and their routes
+(two indexed queries) into a dict from project key to connection, and also
+expresses "records routed to this connection" as SQL for the scheduler.
+Routing decides where worklogs are written; a record's existing worklog
+stays on the connection that wrote it (``jira_connection_id``) until it is
+rewritten.
+
+``sync_routed`` partitions a bulk sync by connection and runs the shares
+side by side, each paced by its own connection's limiter and breaker, so
+one slow site doesn't hold up the others.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import re
+import threading
+import logging
+
+from flask import current_app
+from sqlalchemy import false, not_, or_, true
+from database import db
+from models.jira import JiraConnection, JiraProjectRoute
+from models.time_record import TimeRecord
+from services.jira_sync import sync_records
+from services.instrumentation import attribute_to, current_timings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_KEY_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]{0,49}$')
+
+
+def project_key(issue_key: Optional[str]) -> Optional[str]:
+    """The project part of an issue key ("PROJ" for "PROJ-123")"""
+    if not issue_key or '-' not in issue_key:
+        return None
+    return issue_key.rsplit('-', 1)[0].strip().upper() or None
+
+
+def parse_project_keys(value) -> List[str]:
+    """Normalized, de-duplicated project keys; ValueError if one is malformed"""
+    if not isinstance(value, list) or not all(isinstance(key, str) for key in value):
+        raise ValueError('project_keys must be a list of JIRA project keys')
+    keys = list(dict.fromkeys(key.strip().upper() for key in value if key.strip()))
+    for key in keys:
+        if not PROJECT_KEY_PATTERN.match(key):
+            raise ValueError(f'Invalid JIRA project key: {key}')
+    return keys
+
+
+def set_project_keys(connection: JiraConnection, keys: List[str]):
+    """Replace the projects a connection claims; ValueError if another connection of the user has one"""
+    claimed = db.session.query(JiraProjectRoute.project_key).filter(
+        JiraProjectRoute.user_id == connection.user_id,
+        JiraProjectRoute.connection_id != connection.id,
+        JiraProjectRoute.project_key.in_(keys)
+    ).all() if keys else []
+    if claimed:
+        raise ValueError(f"Project {claimed[0][0]} is already routed to another JIRA connection")
+
+    current = {route.project_key: route for route in connection.project_routes}
+    for key, route in current.items():
+        if key not in keys:
+            connection.project_routes.remove(route)
+    for key in keys:
+        if key not in current:
+            connection.project_routes.append(JiraProjectRoute(user_id=connection.user_id, project_key=key))
+
+
+def _like_prefix(project: str):
+    escaped = project.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return TimeRecord.jira_issue_key.like(f'{escaped}-%', escape='\\')
+
+
+class ConnectionRouter:
+    """A user's active connections and the project key -> connection map"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.connections = JiraConnection.query.filter_by(
+            user_id=user_id,
+            is_active=True
+        ).order_by(JiraConnection.id).all()
+        by_id = {connection.id: connection for connection in self.connections}
+        self.routes = {
+            project: by_id[connection_id]
+            for project, connection_id in db.session.query(
+                JiraProjectRoute.project_key, JiraProjectRoute.connection_id
+            ).filter(JiraProjectRoute.user_id == user_id)
+            if connection_id in by_id
+        }
+
+    @property
+    def default(self) -> Optional[JiraConnection]:
+        return self.connections[0] if self.connections else None
+
+    def connection_for(self, issue_key: Optional[str]) -> Optional[JiraConnection]:
+        """The connection an issue's worklogs and lookups go to"""
+        return self.routes.get(project_key(issue_key), self.default)
+
+    def partition(self, items: Iterable, issue_key: Callable = lambda item: item) -> List[Tuple[JiraConnection, List]]:
+        """``items`` grouped by the connection their issue key routes to, default connection first"""
+        groups = {}
+        for item in items:
+            connection = self.connection_for(issue_key(item))
+            if connection is not None:
+                groups.setdefault(connection.id, (connection, []))[1].append(item)
+        return [groups[c.id] for c in self.connections if c.id in groups]
+
+    def record_filter(self, connection: JiraConnection):
+        """SQL condition for the user's records whose issue routes to ``connection``"""
+        own = [_like_prefix(p) for p, c in self.routes.items() if c.id == connection.id]
+        default = self.default
+        if default is not None and default.id == connection.id:
+            others = [_like_prefix(p) for p, c in self.routes.items() if c.id != connection.id]
+            own.append(not_(or_(*others)) if others else true())
+        return or_(*own) if own else false()
+
+
+def run_partitions(partitions: List[Tuple[object, JiraConnection, List[int]]],
+                   on_results: Optional[Callable[[List[Tuple[int, Dict]]], None]] = None,
+                   flush_every: Optional[int] = None, flush_seconds: Optional[float] = None) -> Dict:
+    """
+    Run ``sync_records`` for each ``(user_id, connection, record_ids)``,
+    up to JIRA_SYNC_PARALLEL_CONNECTIONS at once.
+
+    A single partition runs on the calling thread and, like sync_records,
+    leaves its results for the caller to commit. Otherwise each partition
+    runs on a pool thread with its own app context and session and commits
+    its results as soon as they are written; no thread holds a write
+    transaction while it waits for the others, so SQLite doesn't time out.
+    ``on_results`` calls are serialized. Returns the merged summary.
+    """
+    results = {'total': 0, 'succeeded': 0, 'failed': 0, 'errors': []}
+    if not partitions:
+        return results
+    if len(partitions) == 1:
+        user_id, connection, record_ids = partitions[0]
+        return sync_records(user_id, connection, record_ids, on_results=on_results,
+                            flush_every=flush_every, flush_seconds=flush_seconds)
+
+    app = current_app._get_current_object()
+    timings = current_timings()
+    callback_lock = threading.Lock()
+    merge_lock = threading.Lock()
+
+    def report(outcomes):
+        db.session.commit()
+        if on_results is not None:
+            with callback_lock:
+                on_results(outcomes)
+
+    def merge(summary: Dict):
+        with merge_lock:
+            for name in ('total', 'succeeded', 'failed'):
+                results[name] += summary[name]
+            results['errors'].extend(summary['errors'])
+
+    def run(user_id, connection_id: int, record_ids: List[int]):
+        with app.app_context(), attribute_to(timings):
+            try:
+                connection = db.session.get(JiraConnection, connection_id)
+                summary = sync_records(user_id, connection, record_ids, on_results=report,
+                                       flush_every=flush_every, flush_seconds=flush_seconds)
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"JIRA sync for connection {connection_id} failed: {str(e)}", exc_info=True)
+                db.session.rollback()
+                failures = [(record_id, {'success': False, 'error': str(e)}) for record_id in record_ids]
+                report(failures)
+                summary = {'total': len(record_ids), 'succeeded': 0, 'failed': len(record_ids),
+                           'errors': [{'record_id': r, 'error': str(e)} for r in record_ids]}
+            merge(summary)
+
+    # An inline auto-sync pass can cover every user's connections
+    workers = min(len(partitions), max(1, int(current_app.config.get('JIRA_SYNC_PARALLEL_CONNECTIONS', 4))))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jira-partition') as executor:
+        futures = [executor.submit(run, user_id, connection.id, record_ids)
+                   for user_id, connection, record_ids in partitions]
+        for future in futures:
+            future.result()
+    return results
+
+
+def route_records(user_id, record_ids: List[int],
+                  router: Optional[ConnectionRouter] = None) -> List[Tuple[JiraConnection, List[int]]]:
+    """The user's ``record_ids`` partitioned by connection (ids that aren't found go to the default)"""
+    router = router or ConnectionRouter(user_id)
+    record_ids = list(dict.fromkeys(record_ids))
+    keys = dict(db.session.query(TimeRecord.id, TimeRecord.jira_issue_key).filter(
+        TimeRecord.user_id == user_id,
+        TimeRecord.id.in_(record_ids)
+    ).all()) if record_ids else {}
+    return router.partition(record_ids, issue_key=keys.get)
+
+
+def sync_routed(user_id, record_ids: List[int], router: Optional[ConnectionRouter] = None,
+                on_results: Optional[Callable[[List[Tuple[int, Dict]]], None]] = None,
+                flush_every: Optional[int] = None, flush_seconds: Optional[float] = None) -> Dict:
+    """Bulk sync the user's records, each connection's share in parallel (see run_partitions)"""
+    partitions = route_records(user_id, record_ids, router)
+    return run_partitions([(user_id, connection, ids) for connection, ids in partitions],
+                          on_results, flush_every, flush_seconds)
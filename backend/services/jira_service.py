@@ -1,12 +1,12 @@
 from atlassian import Jira
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from models.jira import JiraConnection
+from services.jira_circuit import breaker_for
+from services.jira_rate_limit import paced_session
 from services.jira_errors import (
     parse_jira_error, 
-    validate_jira_issue_key,
-    JiraConnectionError,
-    JiraAuthenticationError
+    validate_jira_issue_key
 )
 import logging
 
@@ -16,9 +16,18 @@ logger = logging.getLogger(__name__)
 class JiraService:
     """Service for interacting with JIRA API"""
     
-    def __init__(self, connection: JiraConnection):
-        """Initialize JIRA client with connection details"""
+    def __init__(self, connection: JiraConnection, pool_size: int = 10):
+        """Initialize JIRA client with connection details
+
+        Args:
+            connection: The user's JIRA connection
+            pool_size: HTTP connections kept open to JIRA (match the sync concurrency)
+
+        Calls are paced and retried by the connection's rate limiter and
+        fail fast while its circuit breaker is open.
+        """
         self.connection = connection
+        self.breaker = breaker_for(connection.id)
         decrypted_token = connection.get_decrypted_token()
         
         if not decrypted_token:
@@ -28,14 +37,19 @@ class JiraService:
             url=connection.jira_url,
             username=connection.email,
             password=decrypted_token,
-            cloud=True  # Assuming Atlassian Cloud by default
+            cloud=True,  # Assuming Atlassian Cloud by default
+            session=paced_session(connection.id, pool_size)
         )
     
     def test_connection(self) -> Dict:
         """
         Test if the JIRA connection is valid
-        Returns: Dict with 'success' boolean and optional 'error' message
+
+        Runs as the circuit breaker's probe even while it is open.
+        Returns: Dict with 'success' boolean, the breaker state under 'circuit'
+        and optional 'error' message
         """
+        self.breaker.force_probe()
         try:
             # Try to get server info to verify connection
             server_info = self.client.get_server_info()
@@ -44,23 +58,26 @@ class JiraService:
                 'server_info': {
                     'version': server_info.get('version'),
                     'deployment_type': server_info.get('deploymentType', 'cloud')
-                }
+                },
+                'circuit': self.breaker.snapshot()
             }
         except Exception as e:
             logger.error(f"JIRA connection test failed: {str(e)}")
             error_info = parse_jira_error(e)
             return {
                 'success': False,
-                'error': error_info['user_message']
+                'error': error_info['user_message'],
+                'circuit': self.breaker.snapshot()
             }
     
-    def search_issues(self, query: str, max_results: int = 50) -> List[Dict]:
+    def search_issues(self, query: str, max_results: int = 50, raise_errors: bool = False) -> List[Dict]:
         """
         Search for JIRA issues using JQL
         
         Args:
             query: Search query (will be used in JQL)
             max_results: Maximum number of results to return
+            raise_errors: Re-raise JIRA errors instead of returning no results
             
         Returns: List of issue dicts
         """
@@ -89,7 +106,7 @@ class JiraService:
                     'summary': fields.get('summary', ''),
                     'status': fields.get('status', {}).get('name', 'Unknown'),
                     'assignee': assignee.get('displayName') if assignee else None,
-                    'project': fields.get('project', {}).get('name', ''),
+                    'project': (fields.get('project') or {}).get('key') or 'Unknown',
                     'issueType': fields.get('issuetype', {}).get('name', '')
                 })
             
@@ -97,6 +114,8 @@ class JiraService:
             
         except Exception as e:
             logger.error(f"Failed to search JIRA issues: {str(e)}")
+            if raise_errors:
+                raise
             error_info = parse_jira_error(e)
             # For search, we'll just return empty results but log the error
             logger.warning(f"Search error type: {error_info['type']}, message: {error_info['user_message']}")
@@ -191,12 +210,62 @@ class JiraService:
             logger.error(f"Failed to get assigned issues: {str(e)}")
             raise
     
-    def get_issue(self, issue_key: str) -> Optional[Dict]:
+    def iter_updated_issues(self, since_minutes: int, page_size: int = 100,
+                            max_issues: int = 10000) -> Iterator[List[Dict]]:
+        """
+        Page through issues updated in the last ``since_minutes`` minutes, newest first
+        
+        Args:
+            since_minutes: Relative JQL window (avoids the JIRA user's timezone)
+            page_size: Issues fetched per request
+            max_issues: Stop after this many issues
+            
+        Returns: Iterator of pages (lists of issue dicts)
+        """
+        jql = f'updated >= -{int(since_minutes)}m ORDER BY updated DESC'
+        fetched = 0
+        token = None
+        while fetched < max_issues:
+            # Cloud only pages search/jql by token (``jql`` rejects a start offset)
+            results = self.client.enhanced_jql(
+                jql,
+                nextPageToken=token,
+                limit=min(page_size, max_issues - fetched),
+                fields='key,summary,status,assignee,issuetype,project,updated'
+            ) or {}
+            
+            page = []
+            for issue_data in results.get('issues', []):
+                fields = issue_data.get('fields', {})
+                assignee = fields.get('assignee')
+                status = fields.get('status')
+                issuetype = fields.get('issuetype')
+                project = fields.get('project')
+                
+                page.append({
+                    'key': issue_data.get('key'),
+                    'summary': fields.get('summary', ''),
+                    'status': status.get('name') if status else 'Unknown',
+                    'assignee': assignee.get('displayName') if assignee else None,
+                    'issueType': issuetype.get('name') if issuetype else 'Unknown',
+                    'project': project.get('key') if project else 'Unknown',
+                    'updated': fields.get('updated')
+                })
+            
+            if page:
+                yield page
+            fetched += len(page)
+            token = results.get('nextPageToken')
+            if not page or not token or results.get('isLast'):
+                return
+    
+    def get_issue(self, issue_key: str, raise_errors: bool = False) -> Optional[Dict]:
         """
         Get detailed information about a specific issue
         
         Args:
             issue_key: JIRA issue key (e.g., "PROJ-123")
+            raise_errors: Re-raise JIRA errors other than "not found"
             
         Returns: Issue details dict or None if not found
         """
@@ -222,8 +291,52 @@ class JiraService:
             
         except Exception as e:
             logger.error(f"Failed to get issue {issue_key}: {str(e)}")
+            if raise_errors and parse_jira_error(e)['type'] != 'not_found':
+                raise
             return None
     
+    def get_issues(self, issue_keys: List[str]) -> Dict[str, Dict]:
+        """
+        Details for many issues with a single ``key in (...)`` JQL query
+        
+        Args:
+            issue_keys: JIRA issue keys (callers chunk these; JQL length is limited)
+            
+        Returns: Dict of issue key to details (same shape as get_issue); missing keys are absent
+        """
+        keys = [key for key in issue_keys if not validate_jira_issue_key(key)]
+        if not keys:
+            return {}
+        
+        # "warn" makes unknown keys a warning instead of failing the whole query
+        results = self.client.jql(
+            f"key in ({', '.join(keys)})",
+            limit=len(keys),
+            fields='key,summary,description,status,assignee,issuetype,project,created,updated',
+            validate_query='warn'
+        ) or {}
+        
+        issues = {}
+        for issue_data in results.get('issues', []):
+            fields = issue_data.get('fields', {})
+            assignee = fields.get('assignee')
+            status = fields.get('status')
+            issuetype = fields.get('issuetype')
+            project = fields.get('project')
+            
+            issues[issue_data.get('key')] = {
+                'key': issue_data.get('key'),
+                'summary': fields.get('summary', ''),
+                'description': fields.get('description', ''),
+                'status': status.get('name') if status else 'Unknown',
+                'assignee': assignee.get('displayName') if assignee else None,
+                'issueType': issuetype.get('name') if issuetype else 'Unknown',
+                'project': project.get('key') if project else 'Unknown',
+                'created': fields.get('created'),
+                'updated': fields.get('updated')
+            }
+        return issues
+    
     def create_worklog(self, issue_key: str, time_spent_seconds: int, 
                       started: datetime, comment: str = None) -> Dict:
         """
@@ -238,28 +351,17 @@ class JiraService:
         Returns: Dict with 'success' boolean and 'worklog_id' or 'error'
         """
         try:
-            # Validate issue key format
-            validation_error = validate_jira_issue_key(issue_key)
+            validation_error = self._validate_worklog(issue_key, time_spent_seconds)
             if validation_error:
                 return {
                     'success': False,
                     'error': validation_error
                 }
             
-            # Validate time spent (must be at least 60 seconds / 1 minute)
-            if time_spent_seconds < 60:
-                return {
-                    'success': False,
-                    'error': 'Time entry must be at least 1 minute'
-                }
-            
-            # Convert datetime to JIRA format (ISO 8601)
-            started_str = started.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
-            
             # Create worklog using correct method signature
             result = self.client.issue_worklog(
                 key=issue_key,
-                started=started_str,
+                started=self._format_started(started),
                 time_sec=time_spent_seconds,
                 comment=comment
             )
@@ -277,6 +379,114 @@ class JiraService:
                 'error': error_info['user_message']
             }
     
+    @staticmethod
+    def _validate_worklog(issue_key: str, time_spent_seconds: int) -> Optional[str]:
+        # Validate issue key format
+        validation_error = validate_jira_issue_key(issue_key)
+        if validation_error:
+            return validation_error
+        
+        # Validate time spent (must be at least 60 seconds / 1 minute)
+        if time_spent_seconds < 60:
+            return 'Time entry must be at least 1 minute'
+        return None
+    
+    @staticmethod
+    def _format_started(started: datetime) -> str:
+        # Convert datetime to JIRA format (ISO 8601)
+        return started.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+    
+    def find_worklogs(self, issue_key: str, marker: str) -> List[Dict]:
+        """
+        Worklogs on an issue whose comment contains ``marker``, oldest first
+        
+        Raises on JIRA errors so callers never mistake a failed lookup for "none".
+        """
+        result = self.client.issue_get_worklog(issue_key) or {}
+        worklogs = [w for w in result.get('worklogs', []) if marker in str(w.get('comment') or '')]
+        return sorted(worklogs, key=lambda w: int(w['id']))
+    
+    def upsert_worklog(self, issue_key: str, time_spent_seconds: int, started: datetime,
+                       comment: str, marker: str, worklog_id: str = None,
+                       previous_issue_key: str = None, lookup: bool = False) -> Dict:
+        """
+        Create or update the worklog identified by ``marker`` (which must be in ``comment``)
+        
+        Args:
+            issue_key: JIRA issue key
+            time_spent_seconds: Time spent in seconds
+            started: When the work started (datetime)
+            comment: Worklog comment, including the marker
+            marker: Deterministic tag identifying the time record's worklog
+            worklog_id: Worklog last written for the record, if any
+            previous_issue_key: Issue ``worklog_id`` lives on, if the record moved issues
+            lookup: Search the issue for an existing worklog before creating one
+            
+        Returns: Dict with 'success', 'worklog_id' and 'action' ("created"/"updated"), or 'error'
+        """
+        steps = upsert_worklog_steps(issue_key, time_spent_seconds, started, comment, marker,
+                                     worklog_id, previous_issue_key, lookup)
+        result, error = None, None
+        while True:
+            try:
+                step = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as done:
+                return done.value
+            result, error = None, None
+            try:
+                result = getattr(self, step[0])(*step[1:])
+            except Exception as e:
+                error = e
+    
+    def put_worklog(self, issue_key: str, worklog_id: str, data: Dict):
+        return self.client.put(self._worklog_url(issue_key, worklog_id), data=data)
+    
+    def post_worklog(self, issue_key: str, data: Dict) -> Optional[Dict]:
+        return self.client.issue_add_json_worklog(key=issue_key, worklog=data)
+    
+    def changed_worklog_ids(self, since_ms: int, deleted: bool = False, wanted: Optional[set] = None,
+                            max_pages: Optional[int] = None) -> Tuple[List[str], int, bool]:
+        """
+        IDs of worklogs updated (or deleted) since a UNIX time in milliseconds
+        
+        Args:
+            since_ms: Watermark from a previous call (or a starting point)
+            deleted: Page through worklog/deleted instead of worklog/updated
+            wanted: Only keep these IDs (the site-wide feed can be large)
+            max_pages: Stop after this many pages (None reads to the end)
+            
+        Returns: (worklog IDs, new watermark to pass as ``since_ms`` next time,
+        whether the feed was read to the end)
+        """
+        url = self.client.resource_url('worklog/deleted' if deleted else 'worklog/updated')
+        ids = []
+        since = since_ms
+        pages = 0
+        while True:
+            page = self.client.get(url, params={'since': since}) or {}
+            pages += 1
+            for value in page.get('values', []):
+                worklog_id = str(value.get('worklogId'))
+                if wanted is None or worklog_id in wanted:
+                    ids.append(worklog_id)
+            # JIRA leaves out the last minute, so "until" is where the next call picks up
+            since = int(page.get('until') or since)
+            if page.get('lastPage', True):
+                return ids, since, True
+            if max_pages is not None and pages >= max_pages:
+                return ids, since, False
+    
+    def get_worklogs(self, worklog_ids: List[str], batch_size: int = 1000) -> List[Dict]:
+        """Worklog details for many IDs via worklog/list (at most 1000 per request)"""
+        worklogs = []
+        for start in range(0, len(worklog_ids), batch_size):
+            batch = [int(worklog_id) for worklog_id in worklog_ids[start:start + batch_size]]
+            worklogs.extend(self.client.get_worklogs(batch) or [])
+        return worklogs
+    
+    def _worklog_url(self, issue_key: str, worklog_id: str) -> str:
+        return f"{self.client.resource_url('issue')}/{issue_key}/worklog/{worklog_id}"
+    
     def delete_worklog(self, issue_key: str, worklog_id: str) -> Dict:
         """
         Delete a worklog entry from JIRA
@@ -288,7 +498,7 @@ class JiraService:
         Returns: Dict with 'success' boolean and optional 'error'
         """
         try:
-            self.client.issue_worklog_delete(issue_key, worklog_id)
+            self.client.delete(self._worklog_url(issue_key, worklog_id))
             return {'success': True}
             
         except Exception as e:
@@ -297,3 +507,69 @@ class JiraService:
                 'success': False,
                 'error': str(e)
             }
+
+
+def upsert_worklog_steps(issue_key: str, time_spent_seconds: int, started: datetime, comment: str,
+                         marker: str, worklog_id: str = None, previous_issue_key: str = None,
+                         lookup: bool = False):
+    """
+    The decisions behind ``upsert_worklog``, shared by JiraService and AsyncJiraClient
+    
+    A generator that yields each JIRA call to make as ``(method, *args)``, one of
+    ``find_worklogs``, ``put_worklog``, ``post_worklog`` and ``delete_worklog``,
+    is sent the call's result (or has its exception thrown in) and returns the
+    upsert result. The clients only run the calls.
+    """
+    validation_error = JiraService._validate_worklog(issue_key, time_spent_seconds)
+    if validation_error:
+        return {
+            'success': False,
+            'error': validation_error
+        }
+    
+    data = {
+        'started': JiraService._format_started(started),
+        'timeSpentSeconds': time_spent_seconds,
+        'comment': comment
+    }
+    moved = bool(previous_issue_key) and previous_issue_key != issue_key
+    
+    try:
+        # Known worklog on the same issue: update it directly
+        if worklog_id and not moved:
+            try:
+                yield 'put_worklog', issue_key, worklog_id, data
+                return {'success': True, 'worklog_id': worklog_id, 'action': 'updated'}
+            except Exception as e:
+                # requests' and httpx's HTTP errors both carry the response
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status != 404 and (status or parse_jira_error(e)['type'] != 'not_found'):
+                    raise
+                # Deleted in JIRA; look for a copy or create a new one below
+                lookup = True
+        
+        existing = [w['id'] for w in (yield 'find_worklogs', issue_key, marker)] if lookup or moved else []
+        if existing:
+            target = existing[0]
+            yield 'put_worklog', issue_key, target, data
+            action = 'updated'
+        else:
+            result = yield 'post_worklog', issue_key, data
+            target = result.get('id') if result else None
+            action = 'created'
+        
+        # Remove duplicates left by earlier parallel or retried syncs
+        for duplicate in existing[1:]:
+            yield 'delete_worklog', issue_key, duplicate
+        if moved and worklog_id:
+            yield 'delete_worklog', previous_issue_key, worklog_id
+        
+        return {'success': True, 'worklog_id': target, 'action': action}
+        
+    except Exception as e:
+        logger.error(f"Failed to write worklog for {issue_key}: {str(e)}", exc_info=True)
+        error_info = parse_jira_error(e)
+        return {
+            'success': False,
+            'error': error_info['user_message']
+        }
@@ -0,0 +1,168 @@
+"""
+Server-Sent Events for bulk sync progress.
+
+A bulk sync streams one ``result`` event per record as its outcome is
+committed, so clients can show progress instead of waiting for the whole
+batch (and proxies in front of the API don't time out on a silent
+connection):
+
+- ``start``: ``{total}`` (plus ``job_ids`` for queued syncs)
+- ``result``: ``{record_id, success, worklog_id, error}``
+- ``done``: ``{total, succeeded, failed, error}``
+
+Queued syncs (one job per JIRA connection) are followed by polling the
+jobs' items as the workers commit them; in-request syncs (``JIRA_SYNC_MODE``
+"inline") run on a background thread that hands outcomes to the response
+through a queue. A comment line
+is sent every ``KEEPALIVE_SECONDS`` while nothing else is.
+"""
+from typing import Dict, Iterator, List
+import json
+import queue
+import threading
+import time
+import logging
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import and_, or_
+from database import db
+from models.jira import JiraSyncJob, JiraSyncJobItem
+from services.jira_routing import sync_routed
+
+logger = logging.getLogger(__name__)
+
+# How often a queued job's items are polled for new outcomes
+POLL_SECONDS = 0.5
+# Comment lines keep idle streams open through proxies
+KEEPALIVE_SECONDS = 15.0
+# In-request syncs commit (and stream) outcomes after this many records or seconds
+FLUSH_RECORDS = 20
+FLUSH_SECONDS = 0.5
+
+FINISHED_JOB_STATUSES = ('completed', 'failed')
+
+
+def sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream(events: Iterator[str]) -> Response:
+    """A text/event-stream response that proxies won't buffer"""
+    return Response(stream_with_context(events), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def keepalive() -> str:
+    return ": keepalive\n\n"
+
+
+def outcome_event(record_id: int, result: Dict) -> str:
+    return sse('result', {
+        'record_id': record_id,
+        'success': bool(result['success']),
+        'worklog_id': result.get('worklog_id'),
+        'error': result.get('error')
+    })
+
+
+def after_position(job_id: int, last_finished, last_id: int):
+    """SQL condition for a job's items past its (finished_at, id) keyset position"""
+    if last_finished is None:
+        return JiraSyncJobItem.job_id == job_id
+    return and_(JiraSyncJobItem.job_id == job_id, or_(
+        JiraSyncJobItem.finished_at > last_finished,
+        and_(JiraSyncJobItem.finished_at == last_finished, JiraSyncJobItem.id > last_id)
+    ))
+
+
+def job_events(job_ids: List[int]) -> Iterator[str]:
+    """Stream queued jobs' outcomes until every job finishes (run inside stream_with_context)"""
+    jobs = JiraSyncJob.query.filter(JiraSyncJob.id.in_(job_ids)).all()
+    yield sse('start', {'job_ids': job_ids, 'total': sum(job.total for job in jobs)})
+
+    # A keyset on (finished_at, id) per job: items finished in one worker flush
+    # share a timestamp, and each job's worker commits its items in that order,
+    # but jobs on parallel workers commit independently of each other's clocks
+    positions = {job_id: (None, 0) for job_id in job_ids}
+    last_sent = time.monotonic()
+    while True:
+        # End the read transaction so the worker's commits are visible
+        db.session.rollback()
+        jobs = JiraSyncJob.query.filter(JiraSyncJob.id.in_(job_ids)).all()
+        finished = all(job.status in FINISHED_JOB_STATUSES for job in jobs)
+
+        query = JiraSyncJobItem.query.filter(
+            JiraSyncJobItem.status != 'pending',
+            or_(*(after_position(job_id, *position) for job_id, position in positions.items()))
+        )
+        for item in query.order_by(JiraSyncJobItem.finished_at, JiraSyncJobItem.id):
+            positions[item.job_id] = (item.finished_at, item.id)
+            last_sent = time.monotonic()
+            yield outcome_event(item.time_record_id, {
+                'success': item.status == 'success',
+                'worklog_id': item.jira_worklog_id,
+                'error': item.error
+            })
+
+        if finished:
+            errors = [job.error for job in jobs if job.error]
+            yield sse('done', {
+                'job_ids': job_ids,
+                'total': sum(job.total for job in jobs),
+                'succeeded': sum(job.succeeded for job in jobs),
+                'failed': sum(job.failed for job in jobs),
+                'error': '; '.join(errors) or None
+            })
+            return
+
+        if time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield keepalive()
+        time.sleep(POLL_SECONDS)
+
+
+def inline_events(user_id, record_ids: List[int]) -> Iterator[str]:
+    """Run a bulk sync on a background thread and stream its outcomes as they are committed"""
+    app = current_app._get_current_object()
+    record_ids = list(dict.fromkeys(record_ids))
+    events = queue.Queue()
+
+    def on_results(outcomes):
+        db.session.commit()
+        for record_id, result in outcomes:
+            events.put(outcome_event(record_id, result))
+
+    def run():
+        summary = None
+        error = None
+        with app.app_context():
+            try:
+                summary = sync_routed(user_id, record_ids, on_results=on_results,
+                                      flush_every=FLUSH_RECORDS, flush_seconds=FLUSH_SECONDS)
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"Streamed JIRA bulk sync failed: {str(e)}", exc_info=True)
+                db.session.rollback()
+                error = str(e)
+        events.put(sse('done', {
+            'total': len(record_ids),
+            'succeeded': summary['succeeded'] if summary else 0,
+            'failed': summary['failed'] if summary else 0,
+            'error': error
+        }))
+        events.put(None)
+
+    # Not a daemon: the sync finishes (and commits) even if the client goes away
+    threading.Thread(target=run, name='jira-sync-stream').start()
+    yield sse('start', {'total': len(record_ids)})
+    while True:
+        try:
+            event = events.get(timeout=KEEPALIVE_SECONDS)
+        except queue.Empty:
+            yield keepalive()
+            continue
+        if event is None:
+            return
+        yield event
@@ -0,0 +1,610 @@
+"""
+Worklog sync engine shared by the sync routes and the background worker.
+
+Preparing payloads and applying results touch the database and stay on the
+calling thread; only the JIRA HTTP calls run on a thread pool, or with
+``JIRA_HTTP_CLIENT`` "async" on the process's event loop
+(services/jira_async.py). How many calls to one JIRA site are in flight at
+once, however many syncs run concurrently, is governed by the connection's
+adaptive rate limiter (services/jira_rate_limit.py).
+
+Connections with ``aggregate_worklogs`` write one worklog per issue per day
+instead of one per record: the day's records are summed into a worklog
+starting with the first of them, their notes merged into its comment. Every
+record it covers stores the group ("PROJ-123@2024-01-31", days in UTC) in
+``jira_worklog_group`` and shares its ``jira_worklog_id``. Syncing any of
+them rewrites the whole group; records that move to another issue or day
+are taken out of it. Records covered by an aggregated worklog keep being
+synced as a group if aggregation is switched off later.
+
+Worklog ids are only unique within a JIRA site, so every record also stores
+the connection its worklog was written with (``jira_connection_id``).
+Updates and deletes go to that connection. If the record's issue now routes
+to another connection (services/jira_routing.py), the worklog is written
+there and the old one is then deleted from the site that holds it.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import time
+import logging
+
+from flask import current_app
+from sqlalchemy import and_, insert, or_, update
+from database import db
+from models.jira import JiraConnection, JiraSyncLog
+from models.time_record import TimeRecord
+from services.jira_async import AsyncJiraClient, async_enabled, async_runner
+from services.jira_client_pool import get_jira_service
+from services.jira_errors import validate_time_record_for_sync
+from services.instrumentation import attribute_to, current_timings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMMENT = "Time logged from Timecard App"
+
+# Sync status of a record taken out of an aggregated worklog
+DETACHED_VALUES = {
+    'jira_synced': False,
+    'jira_worklog_id': None,
+    'jira_sync_error': None,
+    'jira_sync_hash': None,
+    'jira_worklog_group': None,
+    'jira_connection_id': None,
+}
+
+
+def sync_concurrency() -> int:
+    return max(1, int(current_app.config.get('JIRA_SYNC_CONCURRENCY', 8)))
+
+
+def worklog_marker(record: TimeRecord) -> str:
+    """Deterministic tag embedded in a record's worklog comment so it can be found again"""
+    return f"[timecard:{record.user_id}-{record.id}]"
+
+
+def worklog_comment(record: TimeRecord) -> str:
+    return f"{record.notes if record.notes else DEFAULT_COMMENT}\n\n{worklog_marker(record)}"
+
+
+def worklog_fingerprint(issue_key: str, started: datetime, time_spent_seconds: int, comment: str) -> str:
+    """Hash of a worklog's content; ``started`` is naive UTC"""
+    fingerprint = '|'.join([
+        issue_key or '',
+        started.strftime('%Y-%m-%dT%H:%M:%S'),
+        str(int(time_spent_seconds)),
+        comment,
+    ])
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def sync_hash(record: TimeRecord) -> str:
+    """Fingerprint of the worklog a record would produce (issue, start, duration, comment)"""
+    return worklog_fingerprint(
+        record.jira_issue_key,
+        record.timein,
+        (record.timeout - record.timein).total_seconds(),
+        worklog_comment(record)
+    )
+
+
+def worklog_group(record: TimeRecord) -> Optional[str]:
+    """Aggregated worklog a record belongs in: its issue and the (UTC) day it started"""
+    if not (record.jira_issue_key and record.timein and record.timeout) or record.timeout <= record.timein:
+        return None
+    return f"{record.jira_issue_key}@{record.timein.strftime('%Y-%m-%d')}"
+
+
+def group_marker(user_id, group: str) -> str:
+    """Deterministic tag embedded in an aggregated worklog's comment"""
+    issue_key, day = group.split('@')
+    return f"[timecard:{user_id}-{issue_key}-{day.replace('-', '')}]"
+
+
+def aggregate_worklog(group: str, records: List[TimeRecord]) -> Dict:
+    """Issue, start, duration, comment and marker of the worklog covering ``records``"""
+    records = sorted(records, key=lambda r: (r.timein, r.id))
+    notes = list(dict.fromkeys(r.notes.strip() for r in records if r.notes and r.notes.strip()))
+    marker = group_marker(records[0].user_id, group)
+    comment = '\n'.join(notes) if notes else DEFAULT_COMMENT
+    return {
+        'issue_key': group.split('@')[0],
+        'time_spent_seconds': int(sum((r.timeout - r.timein).total_seconds() for r in records)),
+        'started': records[0].timein,
+        'comment': f"{comment}\n\n{marker}",
+        'marker': marker,
+    }
+
+
+def aggregate_hash(group: str, records: List[TimeRecord]) -> str:
+    """Fingerprint of the aggregated worklog for ``records``, comparable with their ``jira_sync_hash``"""
+    worklog = aggregate_worklog(group, records)
+    return worklog_fingerprint(
+        worklog['issue_key'],
+        worklog['started'],
+        worklog['time_spent_seconds'],
+        worklog['comment']
+    )
+
+
+def in_sync(record: TimeRecord, connection_id: int) -> bool:
+    """True when the connection's JIRA site already holds this record's worklog as it is now"""
+    return bool(record.jira_synced and record.jira_worklog_id and record.jira_connection_id == connection_id
+                and record.jira_sync_hash == sync_hash(record))
+
+
+def worklog_payload(record: TimeRecord, connection_id: int, previous_issue_key: Optional[str] = None) -> Dict:
+    """Arguments for JiraService.upsert_worklog on ``connection_id``'s site built from a time record"""
+    # A worklog shared with the record's old group stays with the group, and
+    # one on another site is replaced (see iter_worklogs)
+    worklog_id = record.jira_worklog_id
+    if record.jira_worklog_group or record.jira_connection_id != connection_id:
+        worklog_id = None
+    return {
+        'issue_key': record.jira_issue_key,
+        'time_spent_seconds': int((record.timeout - record.timein).total_seconds()),
+        'started': record.timein,
+        'comment': worklog_comment(record),
+        'marker': worklog_marker(record),
+        'worklog_id': worklog_id,
+        'previous_issue_key': previous_issue_key if worklog_id else None,
+        # Without a known worklog one may still exist: an earlier attempt whose
+        # response was lost (crash, requeued job) or a parallel first sync
+        'lookup': worklog_id is None,
+    }
+
+
+def previous_issue_keys(records: List[TimeRecord]) -> Dict[int, str]:
+    """
+    Issue each record's existing worklog was written to, by record id, from
+    the record's own sync log (one query). Worklog ids are only unique within
+    a JIRA site, so they are matched per record.
+    """
+    worklog_ids = {r.id: r.jira_worklog_id for r in records if r.jira_worklog_id and not r.jira_worklog_group}
+    if not worklog_ids:
+        return {}
+    rows = db.session.query(
+        JiraSyncLog.time_record_id, JiraSyncLog.jira_worklog_id, JiraSyncLog.jira_issue_key
+    ).filter(
+        JiraSyncLog.time_record_id.in_(list(worklog_ids)),
+        JiraSyncLog.sync_status == 'success'
+    ).order_by(JiraSyncLog.id).all()
+    return {
+        record_id: issue_key
+        for record_id, worklog_id, issue_key in rows
+        if worklog_ids[record_id] == worklog_id
+    }
+
+
+def sync_result_values(record: TimeRecord, result: Dict, user_id, now: datetime) -> Tuple[Dict, Dict]:
+    """Column values for the record and its new sync log row after an upsert_worklog result"""
+    record_values = {'last_synced_at': now}
+    log_values = {
+        'time_record_id': record.id,
+        'jira_issue_key': record.jira_issue_key or '',
+        'synced_by_user_id': user_id,
+        'synced_at': now,
+        'jira_worklog_id': None,
+        'sync_error': None,
+    }
+
+    if result['success']:
+        record_values.update(
+            jira_synced=True,
+            jira_worklog_id=result['worklog_id'],
+            jira_sync_error=None,
+            jira_sync_hash=result.get('sync_hash') or sync_hash(record),
+            jira_worklog_group=result.get('worklog_group'),
+            jira_connection_id=result.get('connection_id') if result['worklog_id'] else None
+        )
+        log_values.update(jira_worklog_id=result['worklog_id'], sync_status='success')
+    else:
+        record_values.update(
+            jira_synced=False,
+            jira_worklog_id=record.jira_worklog_id,
+            jira_sync_error=result['error'],
+            jira_sync_hash=record.jira_sync_hash,
+            jira_worklog_group=record.jira_worklog_group,
+            jira_connection_id=record.jira_connection_id
+        )
+        log_values.update(sync_status='failed', sync_error=result['error'])
+
+    return record_values, log_values
+
+
+def apply_sync_result(record: TimeRecord, result: Dict, user_id) -> JiraSyncLog:
+    """Update a record from an upsert_worklog result; returns the (unsaved) sync log"""
+    record_values, log_values = sync_result_values(record, result, user_id, datetime.now(timezone.utc))
+    for column, value in record_values.items():
+        setattr(record, column, value)
+    return JiraSyncLog(**log_values)
+
+
+def write_sync_results(record_rows: List[Dict], log_rows: List[Dict]):
+    """Stage many records' sync status and their sync log rows as two bulk statements"""
+    if record_rows:
+        db.session.execute(update(TimeRecord), record_rows)
+    if log_rows:
+        db.session.execute(insert(JiraSyncLog), log_rows)
+
+
+def iter_worklogs(connection: JiraConnection, records: List[TimeRecord]) -> Iterator[Tuple[int, Dict]]:
+    """
+    Write the records' worklogs concurrently on up to JIRA_SYNC_CONCURRENCY
+    threads; the connection's limiter decides how many calls are actually
+    in flight. Records already in sync are not sent again. Worklogs the
+    records had on another connection's site are deleted once their
+    replacements are written.
+
+    Yields ``(index, result)`` pairs in completion order.
+    """
+    if not records:
+        return
+
+    previous_keys = previous_issue_keys([r for r in records if not in_sync(r, connection.id)])
+    pending, replaced = [], {}
+    for index, record in enumerate(records):
+        if in_sync(record, connection.id):
+            yield index, {'success': True, 'worklog_id': record.jira_worklog_id,
+                          'connection_id': connection.id, 'action': 'unchanged'}
+            continue
+        pending.append((index, worklog_payload(record, connection.id, previous_keys.get(record.id))))
+        if record.jira_worklog_id and not record.jira_worklog_group and record.jira_connection_id != connection.id:
+            replaced[index] = (
+                record.jira_connection_id,
+                previous_keys.get(record.id, record.jira_issue_key),
+                record.jira_worklog_id
+            )
+
+    stale = []
+    for index, result in _write_payloads(connection, pending):
+        if result['success'] and index in replaced:
+            stale.append(replaced[index])
+        yield index, result
+    _delete_elsewhere(connection.user_id, stale)
+
+
+def _write_payloads(connection: JiraConnection, pending: List[Tuple[object, Dict]]) -> Iterator[Tuple[object, Dict]]:
+    """
+    Run ``upsert_worklog`` for each ``(key, payload)`` on the thread pool (or
+    the async client's event loop, where every payload is in flight at once
+    and only the limiter paces them) and yield ``(key, result)`` in
+    completion order. A payload may also list ``superseded`` worklogs
+    (issue key, worklog id) to delete once it is written, or be a
+    ``delete`` of its worklog. Results carry the ``connection_id`` they
+    were written with.
+    """
+    if not pending:
+        return
+
+    timings = current_timings()
+    if async_enabled():
+        client = async_runner.client(connection)
+        futures = {async_runner.submit(_write_payload_async(client, payload), timings): key for key, payload in pending}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+        return
+
+    limit = sync_concurrency()
+    jira_service = get_jira_service(connection)
+    # Read here: the pool threads can't load attributes expired by a commit
+    connection_id = connection.id
+
+    def call(payload: Dict) -> Dict:
+        payload = dict(payload)
+        superseded = payload.pop('superseded', [])
+        with attribute_to(timings):
+            try:
+                if payload.pop('delete', False):
+                    result = jira_service.delete_worklog(payload['issue_key'], payload['worklog_id'])
+                    return dict(result, worklog_id=None, action='deleted')
+                result = jira_service.upsert_worklog(**payload)
+                if result['success']:
+                    for issue_key, worklog_id in superseded:
+                        jira_service.delete_worklog(issue_key, worklog_id)
+                return dict(result, connection_id=connection_id)
+            except Exception as e:
+                logger.error(f"Unexpected error writing worklog: {str(e)}", exc_info=True)
+                return {'success': False, 'error': str(e)}
+
+    if len(pending) == 1:
+        yield pending[0][0], call(pending[0][1])
+        return
+
+    with ThreadPoolExecutor(max_workers=min(limit, len(pending)),
+                            thread_name_prefix=f'jira-sync-{connection_id}') as executor:
+        futures = {executor.submit(call, payload): key for key, payload in pending}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+async def _write_payload_async(client: AsyncJiraClient, payload: Dict) -> Dict:
+    """``_write_payloads``' call on the async client"""
+    payload = dict(payload)
+    superseded = payload.pop('superseded', [])
+    try:
+        if payload.pop('delete', False):
+            result = await client.delete_worklog(payload['issue_key'], payload['worklog_id'])
+            return dict(result, worklog_id=None, action='deleted')
+        result = await client.upsert_worklog(**payload)
+        if result['success']:
+            for issue_key, worklog_id in superseded:
+                await client.delete_worklog(issue_key, worklog_id)
+        return dict(result, connection_id=client.connection_id)
+    except Exception as e:
+        logger.error(f"Unexpected error writing worklog: {str(e)}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
+
+def _write_elsewhere(user_id, items: List[Tuple[Optional[int], object, Dict]]) -> Iterator[Tuple[object, Dict]]:
+    """
+    ``_write_payloads`` for ``(connection_id, key, payload)`` items on the
+    user's other connections. A worklog whose connection is gone (deleted,
+    so ``jira_connection_id`` was cleared) can't be reached and counts as
+    already removed.
+    """
+    by_connection = {}
+    for connection_id, key, payload in items:
+        by_connection.setdefault(connection_id, []).append((key, payload))
+    connections = {
+        connection.id: connection
+        for connection in JiraConnection.query.filter(
+            JiraConnection.user_id == user_id,
+            JiraConnection.id.in_([c for c in by_connection if c is not None])
+        )
+    } if by_connection else {}
+    for connection_id, pending in by_connection.items():
+        if connection_id in connections:
+            yield from _write_payloads(connections[connection_id], pending)
+        else:
+            for key, _ in pending:
+                yield key, {'success': True, 'worklog_id': None, 'action': 'deleted'}
+
+
+def _delete_elsewhere(user_id, worklogs: List[Tuple[Optional[int], str, str]]):
+    """Delete replaced worklogs, ``(connection_id, issue_key, worklog_id)``, from the sites holding them"""
+    items = [
+        (connection_id, (connection_id, worklog_id), {'delete': True, 'issue_key': issue_key, 'worklog_id': worklog_id})
+        for connection_id, issue_key, worklog_id in worklogs
+    ]
+    for (connection_id, worklog_id), result in _write_elsewhere(user_id, items):
+        if not result['success']:
+            logger.warning(f"Could not delete replaced worklog {worklog_id} from JIRA connection "
+                           f"{connection_id}: {result['error']}")
+
+
+def worklog_groups(user_id, records: List[TimeRecord],
+                   aggregate: bool) -> Tuple[Dict[str, List[TimeRecord]], Dict[str, List[TimeRecord]]]:
+    """
+    Aggregated worklogs to write when syncing ``records``.
+
+    With ``aggregate`` each record goes into its issue and day's group along
+    with the user's other closed records for that issue and day; otherwise
+    only records already covered by an aggregated worklog are grouped.
+    Returns ``{group: members}`` and ``{group: leavers}``, the records a
+    group's worklog covered that no longer belong in it.
+    """
+    names = {r.jira_worklog_group for r in records if r.jira_worklog_group}
+    if aggregate:
+        names.update(worklog_group(r) for r in records)
+    names.discard(None)
+    if not names:
+        return {}, {}
+
+    conditions = [TimeRecord.jira_worklog_group.in_(names)]
+    if aggregate:
+        days = sorted(datetime.strptime(name.split('@')[1], '%Y-%m-%d') for name in names)
+        conditions.append(and_(
+            TimeRecord.jira_issue_key.in_({name.split('@')[0] for name in names}),
+            TimeRecord.timein >= days[0],
+            TimeRecord.timein < days[-1] + timedelta(days=1)
+        ))
+    candidates = {r.id: r for r in records}
+    for record in TimeRecord.query.filter(TimeRecord.user_id == user_id, or_(*conditions)):
+        candidates.setdefault(record.id, record)
+
+    groups = {name: [] for name in names}
+    leavers = {name: [] for name in names}
+    for record in candidates.values():
+        group = worklog_group(record)
+        if group in groups and (aggregate or record.jira_worklog_group == group):
+            groups[group].append(record)
+        if record.jira_worklog_group in groups and record.jira_worklog_group != group:
+            leavers[record.jira_worklog_group].append(record)
+    return groups, leavers
+
+
+def iter_group_worklogs(connection: JiraConnection, groups: Dict[str, List[TimeRecord]],
+                        leavers: Dict[str, List[TimeRecord]]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Write one aggregated worklog per group from ``worklog_groups``, deleting
+    the per-record worklogs of members it replaces; a group with no members
+    left has its worklog deleted. Groups already in sync are not sent again.
+    A group's worklog on another connection's site is written anew on this
+    one and then deleted there.
+
+    Yields ``(group, result)`` pairs in completion order. Successful results
+    carry the ``worklog_group`` and ``sync_hash`` to store on the members.
+    """
+    previous_keys = previous_issue_keys([r for members in groups.values() for r in members])
+    pending, elsewhere, extras, replaced = [], [], {}, {}
+    for group, members in groups.items():
+        covered = [r for r in members + leavers[group] if r.jira_worklog_group == group and r.jira_worklog_id]
+        worklog_id = covered[0].jira_worklog_id if covered else None
+        home = covered[0].jira_connection_id if covered else None
+        if not members:
+            payload = {'delete': True, 'issue_key': group.split('@')[0], 'worklog_id': worklog_id}
+            if not worklog_id:
+                yield group, {'success': True, 'worklog_id': None, 'action': 'unchanged'}
+            elif home == connection.id:
+                pending.append((group, payload))
+            else:
+                elsewhere.append((home, group, payload))
+            continue
+
+        worklog = aggregate_worklog(group, members)
+        extras[group] = {'worklog_group': group, 'sync_hash': aggregate_hash(group, members)}
+        if worklog_id and home == connection.id and not leavers[group] and all(
+            r.jira_synced and r.jira_worklog_id == worklog_id and r.jira_worklog_group == group
+            and r.jira_sync_hash == extras[group]['sync_hash'] for r in members
+        ):
+            yield group, dict(extras[group], success=True, worklog_id=worklog_id,
+                              connection_id=connection.id, action='unchanged')
+            continue
+
+        # Members synced one by one before: their own worklogs go once this one is written
+        superseded, replaced[group] = [], []
+        for r in members:
+            if r.jira_worklog_id and not r.jira_worklog_group:
+                if r.jira_connection_id == connection.id:
+                    superseded.append((previous_keys.get(r.id, r.jira_issue_key), r.jira_worklog_id))
+                else:
+                    replaced[group].append(
+                        (r.jira_connection_id, previous_keys.get(r.id, r.jira_issue_key), r.jira_worklog_id)
+                    )
+        if worklog_id and home != connection.id:
+            replaced[group].append((home, group.split('@')[0], worklog_id))
+            worklog_id = None
+
+        pending.append((group, dict(
+            worklog,
+            worklog_id=worklog_id,
+            lookup=worklog_id is None,
+            superseded=superseded
+        )))
+
+    stale = []
+    for group, result in _write_payloads(connection, pending):
+        if result['success']:
+            stale.extend(replaced.get(group, []))
+        yield group, dict(result, **extras[group]) if result['success'] and group in extras else result
+    yield from _write_elsewhere(connection.user_id, elsewhere)
+    _delete_elsewhere(connection.user_id, stale)
+
+
+def write_worklogs(connection: JiraConnection, records: List[TimeRecord]) -> List[Dict]:
+    """Write the records' worklogs; returns results in the order of ``records``"""
+    results = [None] * len(records)
+    for index, result in iter_worklogs(connection, records):
+        results[index] = result
+    return results
+
+
+def sync_records(user_id, connection: JiraConnection, record_ids: List[int],
+                 on_results: Optional[Callable[[List[Tuple[int, Dict]]], None]] = None,
+                 flush_every: Optional[int] = None, flush_seconds: Optional[float] = None) -> Dict:
+    """
+    Sync the user's records to JIRA and stage the results on the session.
+
+    The records are loaded with one query and their new status and sync log
+    rows are written with bulk statements. Results are written when
+    ``flush_every`` of them are waiting or ``flush_seconds`` have passed
+    (otherwise once, at the end); after each write
+    ``on_results([(record_id, result), ...])`` runs on the calling thread
+    with the outcomes just written (including validation failures), so
+    callers can report or commit progress. The caller commits.
+
+    With the connection's ``aggregate_worklogs`` (or for records already in
+    an aggregated worklog) records are written per issue and day; the other
+    records of those groups are updated too but only the requested ones are
+    reported.
+
+    Returns the bulk sync summary: total, succeeded, failed and errors.
+    """
+    record_ids = list(dict.fromkeys(record_ids))
+    results = {
+        'total': len(record_ids),
+        'succeeded': 0,
+        'failed': 0,
+        'errors': []
+    }
+
+    # Get the time records, verifying ownership
+    records = {}
+    if record_ids:
+        records = {
+            record.id: record
+            for record in TimeRecord.query.filter(
+                TimeRecord.user_id == user_id,
+                TimeRecord.id.in_(record_ids)
+            )
+        }
+
+    outcomes, record_rows, log_rows = [], [], []
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal last_flush
+        write_sync_results(record_rows, log_rows)
+        if on_results is not None and outcomes:
+            on_results(list(outcomes))
+        outcomes.clear()
+        record_rows.clear()
+        log_rows.clear()
+        last_flush = time.monotonic()
+
+    def add(record_id, result):
+        outcomes.append((record_id, result))
+        if result['success']:
+            results['succeeded'] += 1
+        else:
+            results['failed'] += 1
+            results['errors'].append({'record_id': record_id, 'error': result['error']})
+        if (flush_every and len(outcomes) >= flush_every) or \
+                (flush_seconds is not None and time.monotonic() - last_flush >= flush_seconds):
+            flush()
+
+    aggregate = bool(connection.aggregate_worklogs)
+    pending = []
+    for record_id in record_ids:
+        record = records.get(record_id)
+        if record is None:
+            error = 'Record not found'
+        else:
+            # Short records are fine when the day's total is what gets logged
+            error = validate_time_record_for_sync(
+                record, min_seconds=0 if aggregate or record.jira_worklog_group else 60
+            )
+        if not error:
+            pending.append(record)
+            continue
+        result = {'success': False, 'error': error}
+        if record is not None:
+            # Recorded like a JIRA error, so the scheduler's retry delay applies to it too
+            record_values, log_values = sync_result_values(record, result, user_id, datetime.now(timezone.utc))
+            record_rows.append(dict(record_values, id=record.id))
+            log_rows.append(log_values)
+        add(record_id, result)
+
+    groups, leavers = worklog_groups(user_id, pending, aggregate)
+    grouped = {r.id for members in groups.values() for r in members}
+    singles = [r for r in pending if r.id not in grouped]
+    single_ids = {r.id for r in singles}
+    requested = {r.id for r in pending}
+
+    for group, result in iter_group_worklogs(connection, groups, leavers):
+        now = datetime.now(timezone.utc)
+        for record in groups[group]:
+            record_values, log_values = sync_result_values(record, result, user_id, now)
+            record_rows.append(dict(record_values, id=record.id))
+            log_rows.append(log_values)
+        if result['success']:
+            # No longer covered by the group's worklog and not written anywhere else yet
+            record_rows.extend(
+                dict(DETACHED_VALUES, last_synced_at=r.last_synced_at, id=r.id)
+                for r in leavers[group] if r.id not in grouped and r.id not in single_ids
+            )
+        for record in groups[group]:
+            if record.id in requested:
+                add(record.id, result)
+
+    for index, result in iter_worklogs(connection, singles):
+        record = singles[index]
+        record_values, log_values = sync_result_values(record, result, user_id, datetime.now(timezone.utc))
+        record_rows.append(dict(record_values, id=record.id))
+        log_rows.append(log_values)
+        add(record.id, result)
+
+    flush()
+    return results
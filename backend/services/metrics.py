@@ -0,0 +1,362 @@
+"""
+Built-in metrics registry with Prometheus text-format exposition.
+
+Counters, gauges and histograms live in process memory. When
+``METRICS_DIR`` is configured (e.g. under gunicorn with several workers),
+each process periodically writes a snapshot of its metrics to
+``<METRICS_DIR>/metrics-<pid>.json`` and ``/metrics`` merges the snapshots of
+every worker, so a scrape reports totals no matter which worker answers.
+Counters and histograms are summed across processes; gauges are summed
+across processes that are still alive.
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict) -> str:
+    return json.dumps([str(labels.get(name, '')) for name in labelnames])
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Metric:
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = list(labelnames)
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = {key: self._copy(value) for key, value in self._samples.items()}
+        return {
+            'type': self.type_name,
+            'help': self.documentation,
+            'labelnames': self.labelnames,
+            'samples': samples,
+        }
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[['Gauge'], None]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._samples[key] = value
+
+    def snapshot(self) -> Dict:
+        if self.collect is not None:
+            try:
+                self.collect(self)
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} collect failed: {str(e)}")
+        return super().snapshot()
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = list(buckets) + [math.inf]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                sample = self._samples[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample['buckets'][i] += 1
+                    break
+            sample['sum'] += value
+            sample['count'] += 1
+
+    @staticmethod
+    def _copy(value):
+        return {'buckets': list(value['buckets']), 'sum': value['sum'], 'count': value['count']}
+
+    def snapshot(self) -> Dict:
+        snap = super().snapshot()
+        snap['bucket_bounds'] = [_format_value(b) for b in self.buckets]
+        return snap
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders merged exposition text"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._flush_interval = 5
+        self._flushed_at = 0.0
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              collect: Optional[Callable[[Gauge], None]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    # ------------------------------------------------------------------
+    # Multi-process support
+    # ------------------------------------------------------------------
+
+    def configure(self, directory: Optional[str], flush_interval: int = 5):
+        self._directory = directory
+        self._flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def _path_for(self, pid: int) -> str:
+        return os.path.join(self._directory, f'metrics-{pid}.json')
+
+    def flush(self):
+        """Write this process's snapshot for other workers to merge"""
+        if not self._directory:
+            return
+        path = self._path_for(os.getpid())
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+            self._flushed_at = time.monotonic()
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {str(e)}")
+
+    def maybe_flush(self):
+        if self._directory and time.monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+
+    def _collect_snapshots(self) -> List[Dict]:
+        own = self.snapshot()
+        if not self._directory:
+            return [own]
+
+        snapshots = [own]
+        own_path = self._path_for(os.getpid())
+        for path in glob.glob(os.path.join(self._directory, 'metrics-*.json')):
+            if path == own_path:
+                continue
+            try:
+                pid = int(os.path.basename(path)[len('metrics-'):-len('.json')])
+                with open(path) as f:
+                    snap = json.load(f)
+            except (ValueError, OSError):
+                continue
+            if not _pid_alive(pid):
+                # Gauges describe live state; drop them for exited workers
+                snap = {name: m for name, m in snap.items() if m['type'] != 'gauge'}
+            snapshots.append(snap)
+        return snapshots
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        merged = {}
+        for snap in self._collect_snapshots():
+            for name, metric in snap.items():
+                target = merged.get(name)
+                if target is None:
+                    merged[name] = target = {key: value for key, value in metric.items() if key != 'samples'}
+                    target['samples'] = {}
+                for key, value in metric['samples'].items():
+                    if metric['type'] == 'histogram':
+                        existing = target['samples'].get(key)
+                        if existing is None:
+                            target['samples'][key] = Histogram._copy(value)
+                        else:
+                            existing['buckets'] = [a + b for a, b in zip(existing['buckets'], value['buckets'])]
+                            existing['sum'] += value['sum']
+                            existing['count'] += value['count']
+                    else:
+                        target['samples'][key] = target['samples'].get(key, 0) + value
+
+        lines = []
+        for name in sorted(merged):
+            metric = merged[name]
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key in sorted(metric['samples']):
+                value = metric['samples'][key]
+                labels = list(zip(metric['labelnames'], json.loads(key)))
+                if metric['type'] == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric['bucket_bounds'], value['buckets']):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + '}'
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+registry = MetricsRegistry()
+
+# ----------------------------------------------------------------------------
+# Application metrics
+# ----------------------------------------------------------------------------
+
+http_requests = registry.counter(
+    'timecard_http_requests_total',
+    'HTTP requests handled',
+    ['blueprint', 'method', 'status']
+)
+http_request_duration = registry.histogram(
+    'timecard_http_request_duration_seconds',
+    'HTTP request latency',
+    ['blueprint']
+)
+db_queries = registry.counter(
+    'timecard_db_queries_total',
+    'SQL statements executed while handling requests',
+    ['blueprint']
+)
+jira_requests = registry.counter(
+    'timecard_jira_requests_total',
+    'Outbound JIRA HTTP calls by outcome',
+    ['method', 'outcome']
+)
+jira_request_duration = registry.histogram(
+    'timecard_jira_request_duration_seconds',
+    'Outbound JIRA HTTP call latency',
+    ['method']
+)
+jira_retries = registry.counter(
+    'timecard_jira_retries_total',
+    'JIRA calls retried, by reason (429, 503 or connection)',
+    ['reason']
+)
+jira_circuit_transitions = registry.counter(
+    'timecard_jira_circuit_transitions_total',
+    'JIRA circuit breaker state changes, by new state',
+    ['state']
+)
+jira_circuit_rejections = registry.counter(
+    'timecard_jira_circuit_rejections_total',
+    'JIRA calls failed fast by an open circuit breaker'
+)
+cache_requests = registry.counter(
+    'timecard_cache_requests_total',
+    'Cache lookups by cache and result',
+    ['cache', 'result']
+)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def jira_outcome(status_code: Optional[int]) -> str:
+    """Bucket an HTTP status into an outcome label (429 kept separate)"""
+    if status_code is None:
+        return 'error'
+    if status_code == 429:
+        return '429'
+    return f'{status_code // 100}xx'
+
+
+def init_app(app, db):
+    """Configure multi-process snapshots and the DB pool gauges"""
+    registry.configure(app.config.get('METRICS_DIR'), app.config.get('METRICS_FLUSH_SECONDS', 5))
+
+    def collect_pool(gauge: Gauge):
+        with app.app_context():
+            pool = db.engine.pool
+        checked_out = getattr(pool, 'checkedout', None)
+        size = getattr(pool, 'size', None)
+        if callable(checked_out):
+            gauge.set(checked_out(), state='checked_out')
+        if callable(size):
+            gauge.set(size(), state='size')
+
+    registry.gauge(
+        'timecard_db_pool_connections',
+        'Database connection pool usage',
+        ['state'],
+        collect=collect_pool
+    )
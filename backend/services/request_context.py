@@ -0,0 +1,85 @@
+"""
+Request-scoped identity context.
+
+Routes and helpers share the current user, their JIRA connections (a
+ConnectionRouter, see services/jira_routing.py) and any records loaded for
+ownership checks through ``flask.g`` so each is fetched at most once per
+request, and only when something asks for it.
+"""
+from typing import Optional, Tuple
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from database import db
+from models.user import User
+from models.jira import JiraConnection
+from models.time_record import TimeRecord
+from services.jira_routing import ConnectionRouter
+
+_MISSING = object()
+_CACHED = ('user_id', 'user', 'jira_router')
+
+
+def current_user_id() -> int:
+    """Id of the authenticated user (no query)"""
+    if 'user_id' not in g:
+        g.user_id = int(get_jwt_identity())
+    return g.user_id
+
+
+def current_user() -> Optional[User]:
+    """The authenticated User, loaded lazily"""
+    if g.get('user', _MISSING) is _MISSING:
+        g.user = db.session.get(User, current_user_id())
+    return g.user
+
+
+def jira_router() -> ConnectionRouter:
+    """The user's active JIRA connections and project routes, loaded lazily"""
+    if g.get('jira_router', _MISSING) is _MISSING:
+        g.jira_router = ConnectionRouter(current_user_id())
+    return g.jira_router
+
+
+def active_jira_connection() -> Optional[JiraConnection]:
+    """The user's default (oldest active) JIRA connection"""
+    return jira_router().default
+
+
+def jira_connection_for(issue_key: Optional[str]) -> Optional[JiraConnection]:
+    """The active connection an issue key routes to"""
+    return jira_router().connection_for(issue_key)
+
+
+def owned_jira_connection(connection_id: int) -> Optional[JiraConnection]:
+    """A JiraConnection by id if it belongs to the current user"""
+    return JiraConnection.query.filter_by(
+        id=connection_id,
+        user_id=current_user_id()
+    ).first()
+
+
+def owned_record(record_id: int) -> Optional[TimeRecord]:
+    """A TimeRecord by id if it belongs to the current user"""
+    return TimeRecord.query.filter_by(
+        id=record_id,
+        user_id=current_user_id()
+    ).first()
+
+
+def owned_record_with_connection(record_id: int) -> Tuple[Optional[TimeRecord], Optional[JiraConnection]]:
+    """An owned TimeRecord and the active connection its issue routes to"""
+    record = owned_record(record_id)
+    if record is None:
+        return None, None
+    return record, jira_connection_for(record.jira_issue_key)
+
+
+def _reset():
+    # g belongs to the app context, which outlives a single request when one
+    # is already pushed (CLI commands, test clients); start every request clean
+    for name in _CACHED:
+        g.pop(name, None)
+
+
+def init_app(app):
+    app.before_request(_reset)
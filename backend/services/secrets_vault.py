@@ -0,0 +1,136 @@
+"""
+Encryption of stored JIRA credentials.
+
+``JIRA_ENCRYPTION_KEY`` is a comma-separated list of Fernet keys. The first
+one encrypts; all of them decrypt (MultiFernet), so a key is rotated without
+downtime by putting a new key in front, restarting, running
+``flask jira-rotate-keys`` to re-encrypt stored tokens under it, and then
+dropping the old key. There is no fallback key: without the setting tokens
+can't be stored or read (a random per-process key would make every saved
+token unreadable after a restart).
+
+Decrypted tokens are kept in a small LRU keyed by ciphertext so hot paths
+(building JIRA clients) don't pay for a decrypt each time. Values are held
+in bytearrays that are overwritten with zeros when they are evicted or the
+cache is cleared; the str handed to callers is a copy Python can't wipe.
+"""
+from collections import OrderedDict
+from typing import List, Optional
+import threading
+import logging
+
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from services.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+def parse_keys(value: Optional[str]) -> List[bytes]:
+    """Fernet keys from a comma-separated setting, primary first; ValueError if one is malformed"""
+    keys = [key.strip().encode() for key in (value or '').split(',') if key.strip()]
+    for key in keys:
+        try:
+            Fernet(key)
+        except (TypeError, ValueError):
+            raise ValueError('JIRA_ENCRYPTION_KEY contains an invalid Fernet key')
+    return keys
+
+
+def _zero(value: bytearray):
+    value[:] = bytes(len(value))
+
+
+class SecretsVault:
+    """MultiFernet encryption with a bounded cache of decrypted values"""
+
+    def __init__(self):
+        self._primary = None
+        self._fernet = None
+        self._cache = OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+
+    def configure(self, keys: Optional[str], cache_size: int = 1024):
+        parsed = parse_keys(keys)
+        with self._lock:
+            self._primary = Fernet(parsed[0]) if parsed else None
+            self._fernet = MultiFernet([Fernet(key) for key in parsed]) if parsed else None
+            self._cache_size = max(0, cache_size)
+        self.clear()
+
+    @property
+    def configured(self) -> bool:
+        return self._fernet is not None
+
+    def _multi(self) -> MultiFernet:
+        if self._fernet is None:
+            raise RuntimeError('JIRA_ENCRYPTION_KEY is not set; JIRA credentials cannot be encrypted or decrypted')
+        return self._fernet
+
+    def encrypt(self, plaintext: str) -> str:
+        return self._multi().encrypt(plaintext.encode()).decode()
+
+    def decrypt(self, ciphertext: str) -> str:
+        """Plaintext of a token encrypted under any configured key; raises InvalidToken otherwise"""
+        with self._lock:
+            cached = self._cache.get(ciphertext)
+            if cached is not None:
+                self._cache.move_to_end(ciphertext)
+                record_cache('jira_token', True)
+                return cached.decode()
+
+        record_cache('jira_token', False)
+        plaintext = bytearray(self._multi().decrypt(ciphertext.encode()))
+        value = plaintext.decode()
+        self._store(ciphertext, plaintext)
+        return value
+
+    def needs_rotation(self, ciphertext: str) -> bool:
+        """True unless the token is already encrypted under the primary key"""
+        self._multi()
+        try:
+            self._primary.decrypt(ciphertext.encode())
+            return False
+        except InvalidToken:
+            return True
+
+    def rotate(self, ciphertext: str) -> str:
+        """The token re-encrypted under the primary key"""
+        rotated = self._multi().rotate(ciphertext.encode()).decode()
+        with self._lock:
+            cached = self._cache.pop(ciphertext, None)
+        if cached is not None:
+            self._store(rotated, cached)
+        return rotated
+
+    def _store(self, ciphertext: str, plaintext: bytearray):
+        evicted = []
+        with self._lock:
+            if self._cache_size == 0:
+                evicted.append(plaintext)
+            else:
+                previous = self._cache.pop(ciphertext, None)
+                if previous is not None:
+                    evicted.append(previous)
+                self._cache[ciphertext] = plaintext
+                while len(self._cache) > self._cache_size:
+                    evicted.append(self._cache.popitem(last=False)[1])
+        for value in evicted:
+            _zero(value)
+
+    def clear(self):
+        """Drop (and zero) every cached plaintext"""
+        with self._lock:
+            values = list(self._cache.values())
+            self._cache.clear()
+        for value in values:
+            _zero(value)
+
+
+vault = SecretsVault()
+
+
+def init_app(app):
+    vault.configure(app.config.get('JIRA_ENCRYPTION_KEY'), app.config.get('JIRA_TOKEN_CACHE_SIZE', 1024))
+    if not vault.configured:
+        logger.warning("JIRA_ENCRYPTION_KEY is not set; JIRA connections can't be saved or used")
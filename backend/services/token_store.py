@@ -0,0 +1,190 @@
+"""
+Refresh-token family store with rotation, reuse detection and an in-process
+revocation index.
+
+Every access and refresh token carries a ``fam`` claim naming its token
+family. Revocation happens per family, so the check run on each
+``@jwt_required`` request is a set membership test against
+``revocation_index``. The index is refreshed from the database at most once
+per ``JWT_REVOCATION_SYNC_SECONDS`` so revocations made by other worker
+processes propagate without a query per request. Each sync also drops the
+families whose tokens have all expired, since no valid token can name them.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import threading
+import time
+import uuid
+import logging
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from sqlalchemy import func
+from database import db
+from models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token cannot be rotated"""
+    def __init__(self, message: str, reason: str):
+        self.message = message
+        self.reason = reason
+        super().__init__(self.message)
+
+
+class RevocationIndex:
+    """In-process set of revoked token family ids, fed from the database"""
+
+    def __init__(self):
+        # Revoked family id -> when its last token expires (None until synced)
+        self._families = {}
+        self._watermark = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, family_id: Optional[str]) -> bool:
+        if not family_id:
+            return False
+        self._maybe_sync()
+        return family_id in self._families
+
+    def add(self, family_id: str):
+        """Mark a family revoked locally (other processes pick it up on sync)"""
+        # Under the lock so a sync in progress can't swap the mark away
+        with self._lock:
+            self._families.setdefault(family_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._families = {}
+            self._watermark = None
+            self._synced_at = 0.0
+
+    def _maybe_sync(self):
+        interval = current_app.config.get('JWT_REVOCATION_SYNC_SECONDS', 30)
+        if time.monotonic() - self._synced_at < interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already syncing; use the current snapshot
+            return
+        try:
+            self._sync()
+        finally:
+            self._lock.release()
+
+    def _sync(self):
+        now = datetime.now(timezone.utc)
+        query = db.session.query(
+            RefreshToken.family_id, func.max(RefreshToken.revoked_at), func.max(RefreshToken.expires_at)
+        ).filter(
+            RefreshToken.revoked_at.isnot(None),
+            RefreshToken.expires_at > now
+        )
+        if self._watermark is not None:
+            query = query.filter(RefreshToken.revoked_at >= self._watermark)
+            # Families whose last token has expired can't be presented any more
+            families = {
+                family_id: expires_at for family_id, expires_at in self._families.items()
+                if expires_at is None or expires_at > now
+            }
+        else:
+            families = {}
+
+        for family_id, revoked_at, expires_at in query.group_by(RefreshToken.family_id).all():
+            expires_at = _utc(expires_at)
+            families[family_id] = max(expires_at, families.get(family_id) or expires_at)
+            if self._watermark is None or revoked_at > self._watermark:
+                self._watermark = revoked_at
+
+        # Swapped in whole so is_revoked never sees a partly pruned set
+        self._families = families
+        self._synced_at = time.monotonic()
+
+
+def _utc(value: datetime) -> datetime:
+    """SQLite hands back naive datetimes; they are stored as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+revocation_index = RevocationIndex()
+
+
+def is_token_revoked(jwt_header: Dict, jwt_payload: Dict) -> bool:
+    """``token_in_blocklist_loader`` callback: O(1), no query in the common case"""
+    return revocation_index.is_revoked(jwt_payload.get('fam'))
+
+
+def _store_refresh_token(refresh_token: str, user_id: int, family_id: str,
+                         parent_jti: Optional[str] = None) -> RefreshToken:
+    decoded = decode_token(refresh_token, allow_expired=True)
+    row = RefreshToken(
+        jti=decoded['jti'],
+        family_id=family_id,
+        parent_jti=parent_jti,
+        user_id=int(user_id),
+        issued_at=datetime.fromtimestamp(decoded['iat'], timezone.utc),
+        expires_at=datetime.fromtimestamp(decoded['exp'], timezone.utc),
+    )
+    db.session.add(row)
+    return row
+
+
+def issue_token_pair(user_id, family_id: Optional[str] = None,
+                     parent_jti: Optional[str] = None) -> Dict[str, str]:
+    """Create an access/refresh pair in ``family_id`` (a new family if None)"""
+    family_id = family_id or str(uuid.uuid4())
+    claims = {'fam': family_id}
+    access_token = create_access_token(identity=str(user_id), additional_claims=claims)
+    refresh_token = create_refresh_token(identity=str(user_id), additional_claims=claims)
+    _store_refresh_token(refresh_token, user_id, family_id, parent_jti)
+    db.session.commit()
+    return {'access_token': access_token, 'refresh_token': refresh_token}
+
+
+def revoke_family(family_id: str, reason: str):
+    """Revoke every token in a family"""
+    now = datetime.now(timezone.utc)
+    RefreshToken.query.filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({'revoked_at': now, 'revoked_reason': reason}, synchronize_session=False)
+    db.session.commit()
+    revocation_index.add(family_id)
+
+
+def rotate_refresh_token(jwt_payload: Dict) -> Dict[str, str]:
+    """
+    Exchange a refresh token for a new access/refresh pair.
+
+    Raises RefreshTokenError if the token was revoked, or if it was already
+    rotated outside the grace window (reuse), in which case the whole family
+    is revoked.
+    """
+    user_id = jwt_payload['sub']
+    jti = jwt_payload['jti']
+    row = RefreshToken.query.filter_by(jti=jti).first()
+
+    if row is None:
+        # Issued before rotation existed; move the session into a new family
+        logger.info(f"Refresh token without stored family for user {user_id}, starting new family")
+        return issue_token_pair(user_id)
+
+    if row.revoked_at is not None:
+        raise RefreshTokenError('Refresh token has been revoked', 'revoked')
+
+    now = datetime.now(timezone.utc)
+    if row.used_at is not None:
+        grace = current_app.config.get('JWT_REFRESH_REUSE_GRACE_SECONDS', 10)
+        used_at = row.used_at.replace(tzinfo=timezone.utc)
+        if (now - used_at).total_seconds() > grace:
+            logger.warning(f"Refresh token reuse detected for user {user_id}, revoking family {row.family_id}")
+            revoke_family(row.family_id, 'reuse')
+            raise RefreshTokenError('Refresh token reuse detected', 'reuse')
+        # Concurrent refreshes from the same client: issue a sibling
+        logger.info(f"Refresh token {jti} reused within grace window")
+    else:
+        row.used_at = now
+
+    return issue_token_pair(user_id, family_id=row.family_id, parent_jti=jti)
@@ -0,0 +1,121 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, a user with a
+record tree, and JIRA connections to a local FakeJiraServer
+(bench/fake_jira.py, through its ``fake_jira`` fixture).
+
+Run from backend/ with ``python -m pytest tests`` after
+``pip install -r requirements-dev.txt``.
+"""
+from datetime import datetime, timedelta
+import os
+import sys
+import tempfile
+
+import pytest
+from cryptography.fernet import Fernet
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# The app reads its configuration when it is imported
+_instance = tempfile.mkdtemp(prefix='timecard-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_instance, 'test.db')}"
+os.environ['JWT_SECRET_KEY'] = 'test-secret-key-that-is-long-enough-for-hs256'
+os.environ['JIRA_ENCRYPTION_KEY'] = Fernet.generate_key().decode()
+os.environ['JIRA_ISSUE_INDEX_PATH'] = os.path.join(_instance, 'jira_issue_index.db')
+
+pytest_plugins = ['bench.fake_jira']
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    flask_app.config.update(
+        TESTING=True,
+        JIRA_RATE_LIMIT_PER_SECOND=1000,
+        JIRA_RATE_LIMIT_BURST=1000,
+        JIRA_RETRY_BASE_SECONDS=0.01,
+        JIRA_RETRY_MAX_SECONDS=0.05
+    )
+    return flask_app
+
+
+@pytest.fixture
+def db_session(app):
+    """A fresh schema per test, inside an app context"""
+    from database import db
+    from services.jira_cache import issue_cache
+    from services.jira_circuit import reset_breakers
+    from services.jira_client_pool import client_pool
+    from services.jira_rate_limit import reset_limiters
+
+    with app.app_context():
+        db.create_all()
+        yield db.session
+        db.session.remove()
+        db.drop_all()
+    # Connection ids are reused by the next test's schema
+    client_pool.clear()
+    issue_cache.clear()
+    reset_limiters()
+    reset_breakers()
+
+
+@pytest.fixture
+def user(db_session):
+    from models.time_record import RecordAttribute
+    from models.user import User
+
+    user = User(username='alice', email='alice@example.com')
+    user.set_password('password')
+    db_session.add(user)
+    db_session.flush()
+    domain = RecordAttribute(user_id=user.id, name='Work', level_num=1)
+    db_session.add(domain)
+    db_session.flush()
+    category = RecordAttribute(user_id=user.id, name='Development', parent_id=domain.id, level_num=2)
+    db_session.add(category)
+    db_session.flush()
+    title = RecordAttribute(user_id=user.id, name='Backend', parent_id=category.id, level_num=3)
+    db_session.add(title)
+    db_session.commit()
+    user.attribute_ids = (domain.id, category.id, title.id)
+    return user
+
+
+@pytest.fixture
+def make_connection(db_session, user):
+    """Factory for the user's JIRA connections to a fake server"""
+    from models.jira import JiraConnection
+
+    def make(server, **columns):
+        connection = JiraConnection(user_id=user.id, jira_url=server.url, email=user.email,
+                                    auth_type='api_token', **columns)
+        connection.set_api_token('token')
+        db_session.add(connection)
+        db_session.commit()
+        return connection
+
+    return make
+
+
+@pytest.fixture
+def connection(make_connection, fake_jira):
+    return make_connection(fake_jira)
+
+
+@pytest.fixture
+def make_record(db_session, user):
+    """Factory for the user's closed time records (naive UTC, as the routes store them)"""
+    from models.time_record import TimeRecord
+
+    def make(issue_key='AB-1', start=datetime(2026, 1, 5, 9, 0), minutes=60, **columns):
+        domain_id, category_id, title_id = user.attribute_ids
+        record = TimeRecord(user_id=user.id, domain_id=domain_id, category_id=category_id, title_id=title_id,
+                            timein=start, timeout=start + timedelta(minutes=minutes),
+                            jira_issue_key=issue_key, **columns)
+        db_session.add(record)
+        db_session.commit()
+        return record
+
+    return make
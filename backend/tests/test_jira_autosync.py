@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from services.jira_autosync import due_record_ids, in_window
+from services.jira_reconcile import DRIFT_DELETED, DRIFT_EDITED_LOCAL
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+def closed(minutes_ago, minutes=30):
+    """Start of a record that ended ``minutes_ago`` before NOW (naive UTC)"""
+    return NOW.replace(tzinfo=None) - timedelta(minutes=minutes_ago + minutes)
+
+
+def test_due_records_are_settled_recent_and_not_blocked(user, make_record):
+    settled = make_record('AB-1', start=closed(60))
+    older = make_record('AB-2', start=closed(3 * 24 * 60))
+    retry_due = make_record('AB-3', start=closed(90), jira_sync_error='HTTP 500',
+                            last_synced_at=NOW.replace(tzinfo=None) - timedelta(hours=2))
+    local_drift = make_record('AB-4', start=closed(120), jira_sync_error=DRIFT_EDITED_LOCAL)
+    # Not due
+    make_record('AB-5', start=closed(5))  # still being corrected
+    make_record('AB-6', start=closed(40 * 24 * 60))  # past the lookback
+    make_record('AB-7', start=closed(90), jira_sync_error='HTTP 500',
+                last_synced_at=NOW.replace(tzinfo=None) - timedelta(minutes=10))
+    make_record('AB-8', start=closed(90), jira_sync_error=DRIFT_DELETED)
+    make_record('AB-9', start=closed(90), jira_synced=True)
+    make_record(None, start=closed(90))
+
+    due = due_record_ids(user.id, NOW, limit=50)
+
+    # Oldest first
+    assert due == [older.id, local_drift.id, retry_due.id, settled.id]
+    assert due_record_ids(user.id, NOW, limit=2) == [older.id, local_drift.id]
+
+
+def test_open_records_are_never_due(db_session, user, make_record):
+    record = make_record('AB-1', start=closed(60))
+    record.timeout = None
+    db_session.commit()
+
+    assert due_record_ids(user.id, NOW, limit=50) == []
+
+
+def test_window_wraps_past_midnight():
+    assert in_window(NOW, None)
+    assert in_window(NOW.replace(hour=23), '22:00-06:00')
+    assert in_window(NOW.replace(hour=3), '22:00-06:00')
+    assert not in_window(NOW, '22:00-06:00')
+    assert in_window(NOW, '09:00-17:00')
@@ -0,0 +1,79 @@
+import time
+
+import requests
+
+from database import db
+from services.jira_reconcile import DRIFT_DELETED, DRIFT_EDITED_REMOTE, reconcile_connection
+from services.jira_sync import sync_records
+
+
+def synced(user, connection, *records):
+    sync_records(user.id, connection, [r.id for r in records])
+    db.session.commit()
+    for record in records:
+        db.session.refresh(record)
+        assert record.jira_synced
+    return records
+
+
+def worklog_url(server, record):
+    return f'{server.url}/rest/api/2/issue/{record.jira_issue_key}/worklog/{record.jira_worklog_id}'
+
+
+def test_worklog_deleted_in_jira_is_drift(fake_jira, user, connection, make_record):
+    deleted, kept = synced(user, connection, make_record('AB-1'), make_record('AB-2'))
+    requests.delete(worklog_url(fake_jira, deleted)).raise_for_status()
+
+    summary = reconcile_connection(connection)
+    db.session.refresh(deleted)
+    db.session.refresh(kept)
+
+    assert [r['record_id'] for r in summary['records']] == [deleted.id]
+    assert not deleted.jira_synced and deleted.jira_sync_error == DRIFT_DELETED
+    assert kept.jira_synced and kept.jira_sync_error is None
+
+
+def test_worklog_edited_in_jira_is_drift(fake_jira, user, connection, make_record):
+    record, = synced(user, connection, make_record('AB-1', minutes=60))
+    requests.put(worklog_url(fake_jira, record), json={'timeSpentSeconds': 7200}).raise_for_status()
+
+    reconcile_connection(connection)
+    db.session.refresh(record)
+
+    assert not record.jira_synced and record.jira_sync_error == DRIFT_EDITED_REMOTE
+
+
+def test_fix_rewrites_drifted_worklogs(fake_jira, user, connection, make_record):
+    record, = synced(user, connection, make_record('AB-1', minutes=60))
+    requests.delete(worklog_url(fake_jira, record)).raise_for_status()
+
+    reconcile_connection(connection, fix=True)
+    db.session.refresh(record)
+
+    assert record.jira_synced and record.jira_sync_error is None
+    assert fake_jira.worklogs[record.jira_worklog_id]['timeSpentSeconds'] == 3600
+
+
+def test_reconcile_without_changes_finds_no_drift(fake_jira, user, connection, make_record):
+    synced(user, connection, make_record('AB-1'))
+
+    summary = reconcile_connection(connection)
+
+    assert summary['records'] == []
+
+
+def test_bounded_passes_continue_from_their_watermark(fake_jira, user, connection, make_record):
+    records = synced(user, connection, *(make_record(f'AB-{n}') for n in range(1, 4)))
+    fake_jira.feed_page_size = 1
+    for record in records:
+        time.sleep(0.005)
+        requests.delete(worklog_url(fake_jira, record)).raise_for_status()
+
+    passes = []
+    while not passes or not passes[-1]['complete']:
+        assert len(passes) < 10
+        passes.append(reconcile_connection(connection, max_pages=1))
+
+    assert len(passes) > 1
+    drifted = [entry['record_id'] for summary in passes for entry in summary['records']]
+    assert sorted(drifted) == sorted(r.id for r in records)
@@ -0,0 +1,66 @@
+import pytest
+
+from models.time_record import TimeRecord
+from services.jira_routing import ConnectionRouter, parse_project_keys, set_project_keys
+
+
+@pytest.fixture
+def connections(db_session, make_connection, fake_jira):
+    """Default connection, one that claims WEB and OPS_2, and one with no projects"""
+    default = make_connection(fake_jira)
+    web = make_connection(fake_jira)
+    idle = make_connection(fake_jira)
+    set_project_keys(web, ['WEB', 'OPS_2'])
+    db_session.commit()
+    return default, web, idle
+
+
+def routed_keys(router, connection):
+    return sorted(key for key, in TimeRecord.query.with_entities(TimeRecord.jira_issue_key).filter(
+        TimeRecord.user_id == router.user_id,
+        router.record_filter(connection)
+    ))
+
+
+def test_record_filter_matches_connection_for(user, connections, make_record):
+    default, web, idle = connections
+    for key in ('AB-1', 'WEB-1', 'WEB-22', 'WEBX-1', 'OPS_2-1', 'OPSX2-1'):
+        make_record(key)
+    router = ConnectionRouter(user.id)
+
+    # Project keys are matched literally (LIKE wildcards in them are escaped)
+    assert routed_keys(router, default) == ['AB-1', 'OPSX2-1', 'WEBX-1']
+    assert routed_keys(router, web) == ['OPS_2-1', 'WEB-1', 'WEB-22']
+    assert routed_keys(router, idle) == []
+    for key in ('AB-1', 'WEB-1', 'OPS_2-1', 'OPSX2-1'):
+        expected = web if key in routed_keys(router, web) else default
+        assert router.connection_for(key) is expected
+
+
+def test_partition_groups_keys_by_connection(user, connections):
+    default, web, _ = connections
+    router = ConnectionRouter(user.id)
+
+    assert router.partition(['WEB-1', 'AB-1', 'WEB-2', 'CD-3']) == [
+        (default, ['AB-1', 'CD-3']),
+        (web, ['WEB-1', 'WEB-2'])
+    ]
+
+
+def test_inactive_connection_routes_fall_back_to_default(db_session, user, connections, make_record):
+    default, web, _ = connections
+    web.is_active = False
+    db_session.commit()
+    make_record('WEB-1')
+    router = ConnectionRouter(user.id)
+
+    assert router.connection_for('WEB-1') is default
+    assert routed_keys(router, default) == ['WEB-1']
+
+
+def test_project_keys_are_normalized_and_validated():
+    assert parse_project_keys([' web', 'WEB', 'ops ']) == ['WEB', 'OPS']
+    with pytest.raises(ValueError):
+        parse_project_keys(['not a key'])
+    with pytest.raises(ValueError):
+        parse_project_keys('WEB')
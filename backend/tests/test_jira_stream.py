@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+import json
+
+from models.jira import JiraSyncJob, JiraSyncJobItem
+from services import jira_stream
+from services.jira_stream import job_events
+
+
+def parse(event):
+    lines = dict(line.split(': ', 1) for line in event.strip().splitlines())
+    return lines['event'], json.loads(lines['data'])
+
+
+def finish(db_session, item, at):
+    item.status = 'success'
+    item.jira_worklog_id = str(item.id)
+    item.finished_at = at
+    db_session.commit()
+
+
+def test_job_events_streams_items_committed_late_by_a_parallel_worker(db_session, user, connection, monkeypatch):
+    monkeypatch.setattr(jira_stream, 'POLL_SECONDS', 0)
+    jobs = [JiraSyncJob(user_id=user.id, connection_id=connection.id, status='running', total=2) for _ in range(2)]
+    db_session.add_all(jobs)
+    db_session.flush()
+    items = [JiraSyncJobItem(job_id=job.id, time_record_id=100 * job.id + n) for job in jobs for n in range(2)]
+    db_session.add_all(items)
+    db_session.commit()
+    a1, a2, b1, b2 = items
+    t0 = datetime(2026, 1, 5, 9, 0)
+
+    events = job_events([job.id for job in jobs])
+    assert parse(next(events))[0] == 'start'
+
+    # Worker A commits a later timestamp first...
+    finish(db_session, a1, t0 + timedelta(seconds=2))
+    assert parse(next(events))[1]['record_id'] == a1.time_record_id
+    # ...then worker B commits items stamped before it
+    finish(db_session, b1, t0)
+    finish(db_session, a2, t0 + timedelta(seconds=3))
+    finish(db_session, b2, t0 + timedelta(seconds=1))
+    for job in jobs:
+        job.status = 'completed'
+        job.succeeded = 2
+    db_session.commit()
+
+    rest = [parse(event) for event in events if not event.startswith(':')]
+    assert sorted(data['record_id'] for name, data in rest if name == 'result') == sorted(
+        item.time_record_id for item in (a2, b1, b2))
+    assert rest[-1] == ('done', {'job_ids': [job.id for job in jobs], 'total': 4, 'succeeded': 4,
+                                 'failed': 0, 'error': None})
@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from database import db
+from models.jira import JiraSyncLog
+from services.jira_sync import sync_records
+
+
+def sync(user, connection, *records):
+    summary = sync_records(user.id, connection, [r.id for r in records])
+    db.session.commit()
+    for record in records:
+        db.session.refresh(record)
+    return summary
+
+
+def test_first_sync_creates_worklog(fake_jira, user, connection, make_record):
+    record = make_record('AB-1', minutes=90, notes='Reviewed the parser')
+
+    summary = sync(user, connection, record)
+
+    assert summary['succeeded'] == 1 and summary['failed'] == 0
+    assert record.jira_synced and record.jira_sync_error is None
+    assert record.jira_connection_id == connection.id
+    worklog = fake_jira.worklogs[record.jira_worklog_id]
+    assert worklog['issueKey'] == 'AB-1'
+    assert worklog['timeSpentSeconds'] == 90 * 60
+    assert worklog['comment'].startswith('Reviewed the parser')
+    assert JiraSyncLog.query.filter_by(time_record_id=record.id, sync_status='success').count() == 1
+
+
+def test_edited_record_updates_its_worklog(fake_jira, user, connection, make_record):
+    record = make_record('AB-1', minutes=30)
+    sync(user, connection, record)
+    worklog_id = record.jira_worklog_id
+
+    record.timeout = datetime(2026, 1, 5, 10, 15)
+    record.jira_synced = False
+    db.session.commit()
+    sync(user, connection, record)
+
+    assert record.jira_worklog_id == worklog_id
+    assert len(fake_jira.worklogs) == 1
+    assert fake_jira.worklogs[worklog_id]['timeSpentSeconds'] == 75 * 60
+
+
+def test_unchanged_record_is_not_sent_again(fake_jira, user, connection, make_record):
+    record = make_record('AB-1')
+    sync(user, connection, record)
+    fake_jira.reset_stats()
+
+    summary = sync(user, connection, record)
+
+    assert summary['succeeded'] == 1
+    assert not fake_jira.calls
+
+
+def test_retry_after_lost_response_finds_existing_worklog(fake_jira, user, connection, make_record):
+    record = make_record('AB-1')
+    sync(user, connection, record)
+    worklog_id = record.jira_worklog_id
+
+    # As if JIRA created the worklog but the response never arrived
+    record.jira_worklog_id = None
+    record.jira_synced = False
+    db.session.commit()
+    sync(user, connection, record)
+
+    assert record.jira_synced
+    assert record.jira_worklog_id == worklog_id
+    assert list(fake_jira.worklogs) == [worklog_id]
+
+
+def test_moved_record_moves_its_worklog(fake_jira, user, connection, make_record):
+    record = make_record('AB-1')
+    sync(user, connection, record)
+    old_worklog_id = record.jira_worklog_id
+
+    record.jira_issue_key = 'AB-2'
+    record.jira_synced = False
+    db.session.commit()
+    sync(user, connection, record)
+
+    assert record.jira_synced
+    assert [w['issueKey'] for w in fake_jira.worklogs.values()] == ['AB-2']
+    assert record.jira_worklog_id in fake_jira.worklogs
+    assert old_worklog_id not in fake_jira.worklogs
+
+
+def test_aggregated_connection_writes_one_worklog_per_issue_and_day(fake_jira, user, make_connection, make_record):
+    connection = make_connection(fake_jira, aggregate_worklogs=True)
+    morning = make_record('AB-1', start=datetime(2026, 1, 5, 9, 0), minutes=30)
+    afternoon = make_record('AB-1', start=datetime(2026, 1, 5, 14, 0), minutes=45)
+    next_day = make_record('AB-1', start=datetime(2026, 1, 6, 9, 0), minutes=20)
+
+    summary = sync(user, connection, morning, afternoon, next_day)
+
+    assert summary['succeeded'] == 3
+    assert morning.jira_worklog_group == afternoon.jira_worklog_group == 'AB-1@2026-01-05'
+    assert morning.jira_worklog_id == afternoon.jira_worklog_id != next_day.jira_worklog_id
+    assert len(fake_jira.worklogs) == 2
+    assert fake_jira.worklogs[morning.jira_worklog_id]['timeSpentSeconds'] == 75 * 60
+    assert fake_jira.worklogs[next_day.jira_worklog_id]['timeSpentSeconds'] == 20 * 60
+
+
+def test_record_leaving_a_group_shrinks_its_worklog(fake_jira, user, make_connection, make_record):
+    connection = make_connection(fake_jira, aggregate_worklogs=True)
+    first = make_record('AB-1', start=datetime(2026, 1, 5, 9, 0), minutes=30)
+    second = make_record('AB-1', start=datetime(2026, 1, 5, 14, 0), minutes=45)
+    sync(user, connection, first, second)
+    group_worklog_id = first.jira_worklog_id
+
+    second.jira_issue_key = 'AB-2'
+    second.jira_synced = False
+    db.session.commit()
+    sync(user, connection, second)
+    db.session.refresh(first)
+
+    assert first.jira_worklog_id == group_worklog_id
+    assert fake_jira.worklogs[group_worklog_id]['timeSpentSeconds'] == 30 * 60
+    assert fake_jira.worklogs[second.jira_worklog_id]['issueKey'] == 'AB-2'
@@ -0,0 +1,37 @@
+"""
+Route benchmarks (bench/runner.py scenarios) as pytest-benchmark tests.
+
+Each scenario runs against a small seeded data set and a local fake JIRA;
+the SQL statements per request (``X-Query-Count``) are kept in the
+benchmark's extra_info. Compare runs with ``--benchmark-autosave`` and
+``--benchmark-compare``; skip them with ``--benchmark-skip``.
+"""
+import pytest
+
+from bench.runner import SCENARIOS, call_scenario, prepare_context, scenario_context
+from bench.seed import PROJECT_KEYS, seed_bench_data
+
+pytest.importorskip('pytest_benchmark')
+
+ROUNDS = 10
+
+
+@pytest.fixture
+def bench(app, db_session, fake_jira):
+    fake_jira.seed_issues(PROJECT_KEYS, 50)
+    seed_bench_data(users=1, years=0.25, records_per_day=4, jira_url=fake_jira.url)
+    client = app.test_client()
+    return client, prepare_context(app, client, 'bench_user_0', bulk_size=10)
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=lambda scenario: scenario.name)
+def test_route(benchmark, bench, scenario):
+    client, ctx = bench
+
+    def setup():
+        return (client, scenario, scenario_context(scenario, ctx)), {}
+
+    response = benchmark.pedantic(call_scenario, setup=setup, rounds=ROUNDS)
+
+    benchmark.extra_info['queries'] = int(response.headers.get('X-Query-Count', 0))
+    assert response.status_code < 500, response.get_data(as_text=True)
@@ -21,6 +21,26 @@ api.interceptors.request.use(
   }
 )
 
+// Refresh tokens rotate on every use, so parallel 401s must share one refresh
+let refreshInFlight: Promise<string> | null = null;
+
+const refreshAccessToken = (refreshToken: string): Promise<string> => {
+  if (!refreshInFlight) {
+    refreshInFlight = axios.post('/api/refresh', {}, {
+      headers: {
+        'Authorization': `Bearer ${refreshToken}`
+      }
+    }).then(({ data }) => {
+      const authStore = useAuthStore();
+      authStore.setTokens(data.access_token, data.refresh_token);
+      return data.access_token as string;
+    }).finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+}
+
 api.interceptors.response.use(
   (response) => response,
   async (error) => {
@@ -37,14 +57,8 @@ api.interceptors.response.use(
           return Promise.reject(error);
         }
 
-        const { data } = await axios.post('/api/refresh', {}, {
-          headers: {
-            'Authorization': `Bearer ${refreshToken}`
-          }
-        });
-
-        authStore.setNewAccessToken(data.access_token);
-        originalRequest.headers['Authorization'] = `Bearer ${data.access_token}`;
+        const accessToken = await refreshAccessToken(refreshToken);
+        originalRequest.headers['Authorization'] = `Bearer ${accessToken}`;
 
         return api(originalRequest);
       } catch (refreshError) {
@@ -1,6 +1,7 @@
 import { defineStore } from 'pinia';
 import { ref, computed } from 'vue';
 import { useRouter } from 'vue-router';
+import axios from 'axios';
 
 export const useAuthStore = defineStore('auth', () => {
     const accessToken = ref(localStorage.getItem('access_token'));
@@ -23,6 +24,12 @@ export const useAuthStore = defineStore('auth', () => {
     }
 
     const logout = () => {
+        if (refreshToken.value) {
+            // Revoke the token family server-side; failures are not actionable here
+            axios.post('/api/logout', {}, {
+                headers: { 'Authorization': `Bearer ${refreshToken.value}` }
+            }).catch(() => {});
+        }
         accessToken.value = null;
         refreshToken.value = null
         localStorage.removeItem('access_token');
@@ -1,14 +1,30 @@
 import { defineStore } from 'pinia';
 import { ref, computed } from 'vue';
 import api from '@/api/axios';
+import { useAuthStore } from '@/stores/auth';
 import type { 
   JiraConnection, 
   JiraIssue, 
   JiraSyncLog, 
+  JiraSyncHistoryPage,
+  JiraPendingSync,
   JiraSyncResult,
-  JiraBulkSyncResult 
+  JiraBulkSyncResult,
+  JiraSyncRecordEvent,
+  JiraSyncJob
 } from '@/types';
 
+// Parse one Server-Sent Events message ("event:" and "data:" lines; ":" lines are keepalives)
+const parseEvent = (message: string): { event: string; data: any } | null => {
+  let event = 'message';
+  const data: string[] = [];
+  for (const line of message.split('\n')) {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+  }
+  return data.length ? { event, data: JSON.parse(data.join('\n')) } : null;
+};
+
 export const useJiraStore = defineStore('jira', () => {
   // State
   const connections = ref<JiraConnection[]>([]);
@@ -46,6 +62,7 @@ export const useJiraStore = defineStore('jira', () => {
     jira_url: string;
     email: string;
     api_token: string;
+    project_keys?: string[];
   }): Promise<JiraConnection> => {
     isLoading.value = true;
     error.value = null;
@@ -70,6 +87,9 @@ export const useJiraStore = defineStore('jira', () => {
       email: string;
       api_token: string;
       is_active: boolean;
+      auto_sync: boolean;
+      aggregate_worklogs: boolean;
+      project_keys: string[];
     }>
   ): Promise<JiraConnection> => {
     isLoading.value = true;
@@ -175,6 +195,54 @@ export const useJiraStore = defineStore('jira', () => {
     }
   };
 
+  // Badge lookups made within a few ms of each other share one /jira/issues/batch request
+  const ISSUE_BATCH_DELAY_MS = 10;
+  const ISSUE_BATCH_MAX_KEYS = 500;
+  const ISSUE_MEMO_MS = 60000;
+  const issueLookups = new Map<string, Promise<JiraIssue | null>>();
+  let queuedIssueKeys = new Map<string, (issue: JiraIssue | null) => void>();
+  let issueBatchTimer: ReturnType<typeof setTimeout> | null = null;
+
+  const flushIssueBatch = async (): Promise<void> => {
+    const queued = queuedIssueKeys;
+    queuedIssueKeys = new Map();
+    issueBatchTimer = null;
+
+    const keys = [...queued.keys()];
+    for (let start = 0; start < keys.length; start += ISSUE_BATCH_MAX_KEYS) {
+      const chunk = keys.slice(start, start + ISSUE_BATCH_MAX_KEYS);
+      try {
+        const response = await api.post('/jira/issues/batch', { keys: chunk });
+        // Keys JIRA couldn't look up this time aren't remembered as missing
+        const unavailable = new Set<string>(response.data.unavailable || []);
+        chunk.forEach(key => {
+          if (unavailable.has(key)) issueLookups.delete(key);
+          queued.get(key)!(response.data.issues[key] || null);
+        });
+      } catch (err: any) {
+        console.error('Error getting JIRA issues:', err);
+        chunk.forEach(key => {
+          issueLookups.delete(key);
+          queued.get(key)!(null);
+        });
+      }
+    }
+  };
+
+  const loadIssue = (issueKey: string): Promise<JiraIssue | null> => {
+    const key = issueKey.toUpperCase();
+    let lookup = issueLookups.get(key);
+    if (!lookup) {
+      lookup = new Promise(resolve => queuedIssueKeys.set(key, resolve));
+      issueLookups.set(key, lookup);
+      setTimeout(() => issueLookups.delete(key), ISSUE_MEMO_MS);
+      if (!issueBatchTimer) {
+        issueBatchTimer = setTimeout(flushIssueBatch, ISSUE_BATCH_DELAY_MS);
+      }
+    }
+    return lookup;
+  };
+
   const getAssignedIssues = async (): Promise<JiraIssue[]> => {
     isLoading.value = true;
     error.value = null;
@@ -221,7 +289,29 @@ export const useJiraStore = defineStore('jira', () => {
 
     try {
       const response = await api.post('/jira/sync/bulk', { record_ids: recordIds });
-      return response.data;
+      if (response.status !== 202) {
+        return response.data;
+      }
+
+      // Queued (one job per JIRA connection): poll the jobs until the workers finish them
+      const jobIds: number[] = response.data.job_ids ?? [response.data.job_id];
+      const jobs = await Promise.all(jobIds.map(async jobId => {
+        let job: JiraSyncJob;
+        do {
+          await new Promise(resolve => setTimeout(resolve, 1000));
+          job = (await api.get(`/jira/sync/jobs/${jobId}`)).data.job;
+        } while (job.status === 'queued' || job.status === 'running');
+        return job;
+      }));
+
+      return {
+        total: jobs.reduce((sum, job) => sum + job.total, 0),
+        succeeded: jobs.reduce((sum, job) => sum + job.succeeded, 0),
+        failed: jobs.reduce((sum, job) => sum + job.failed, 0),
+        errors: jobs.flatMap(job => job.items
+          .filter(item => item.status === 'failed')
+          .map(item => ({ record_id: item.record_id, error: item.error || job.error || 'Sync failed' }))),
+      };
     } catch (err: any) {
       error.value = err.response?.data?.error || 'Failed to bulk sync records';
       console.error('Error bulk syncing records:', err);
@@ -231,11 +321,83 @@ export const useJiraStore = defineStore('jira', () => {
     }
   };
 
-  const getSyncHistory = async (
+  const bulkSyncStream = async (
+    recordIds: number[],
+    onResult: (result: JiraSyncRecordEvent) => void
+  ): Promise<JiraBulkSyncResult> => {
+    error.value = null;
+
+    // EventSource can't POST or send the Authorization header, so read the stream with fetch
+    const response = await fetch('/api/jira/sync/bulk', {
+      method: 'POST',
+      headers: {
+        'Accept': 'text/event-stream',
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${useAuthStore().accessToken}`,
+      },
+      body: JSON.stringify({ record_ids: recordIds }),
+    });
+    if (!response.ok || !response.body) {
+      // Expired token or an error response: the axios path refreshes and reports it
+      return bulkSync(recordIds);
+    }
+
+    recordIds.forEach(id => syncingRecords.value.add(id));
+    const errors: JiraBulkSyncResult['errors'] = [];
+    let summary: { total: number; succeeded: number; failed: number; error: string | null } | null = null;
+
+    try {
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        let boundary: number;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const message = parseEvent(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+          if (message?.event === 'result') {
+            const result = message.data as JiraSyncRecordEvent;
+            syncingRecords.value.delete(result.record_id);
+            if (!result.success) {
+              errors.push({ record_id: result.record_id, error: result.error || 'Sync failed' });
+            }
+            onResult(result);
+          } else if (message?.event === 'done') {
+            summary = message.data;
+          }
+        }
+      }
+
+      if (!summary) {
+        throw new Error('Sync progress stream ended early');
+      }
+      if (summary.error) {
+        error.value = summary.error;
+      }
+      return {
+        total: summary.total,
+        succeeded: summary.succeeded,
+        failed: summary.failed,
+        errors,
+      };
+    } catch (err: any) {
+      error.value = err.message || 'Failed to bulk sync records';
+      console.error('Error streaming bulk sync:', err);
+      throw err;
+    } finally {
+      recordIds.forEach(id => syncingRecords.value.delete(id));
+    }
+  };
+
+  const getSyncHistoryPage = async (
     status?: 'success' | 'failed' | null,
     limit?: number,
-    recordId?: number
-  ): Promise<JiraSyncLog[]> => {
+    recordId?: number,
+    cursor?: string | null
+  ): Promise<JiraSyncHistoryPage> => {
     isLoading.value = true;
     error.value = null;
 
@@ -244,13 +406,42 @@ export const useJiraStore = defineStore('jira', () => {
       if (status) params.status = status;
       if (limit) params.limit = limit;
       if (recordId) params.record_id = recordId;
+      if (cursor) params.cursor = cursor;
 
       const response = await api.get('/jira/sync/history', { params });
-      return response.data.history;
+      return response.data;
     } catch (err: any) {
       error.value = err.response?.data?.error || 'Failed to get sync history';
       console.error('Error getting sync history:', err);
-      return [];
+      return { history: [], next_cursor: null };
+    } finally {
+      isLoading.value = false;
+    }
+  };
+
+  const getSyncHistory = async (
+    status?: 'success' | 'failed' | null,
+    limit?: number,
+    recordId?: number
+  ): Promise<JiraSyncLog[]> => {
+    const page = await getSyncHistoryPage(status, limit, recordId);
+    return page.history;
+  };
+
+  const getPendingSync = async (limit?: number): Promise<JiraPendingSync> => {
+    isLoading.value = true;
+    error.value = null;
+
+    try {
+      const params: any = {};
+      if (limit) params.limit = limit;
+
+      const response = await api.get('/jira/sync/pending', { params });
+      return response.data;
+    } catch (err: any) {
+      error.value = err.response?.data?.error || 'Failed to get records waiting for sync';
+      console.error('Error getting pending sync records:', err);
+      return { records: [], counts: { pending: 0, failed: 0, drifted: 0, invalid: 0 }, truncated: false };
     } finally {
       isLoading.value = false;
     }
@@ -302,12 +493,16 @@ export const useJiraStore = defineStore('jira', () => {
     // Issue Operations
     searchIssues,
     getIssue,
+    loadIssue,
     getAssignedIssues,
 
     // Sync Operations
     syncRecord,
     bulkSync,
+    bulkSyncStream,
     getSyncHistory,
+    getSyncHistoryPage,
+    getPendingSync,
     deleteWorklog,
 
     // Helpers
@@ -22,6 +22,7 @@ export interface TimeRecord {
   jira_synced?: boolean
   jira_sync_error?: string | null
   last_synced_at?: string | null
+  jira_worklog_group?: string | null
 }
 
 export type CategoryRecord = {
@@ -42,6 +43,9 @@ export interface JiraConnection {
   auth_type: 'api_token' | 'oauth'
   email?: string
   is_active: boolean
+  auto_sync: boolean
+  aggregate_worklogs: boolean
+  project_keys?: string[]
   created_at: string
   updated_at: string
 }
@@ -63,10 +67,35 @@ export interface JiraSyncLog {
   time_record_id: number
   jira_issue_key: string
   jira_worklog_id: string | null
-  sync_status: 'pending' | 'success' | 'failed'
+  sync_status: 'pending' | 'success' | 'failed' | 'drift'
   sync_error: string | null
   synced_at: string
   synced_by_user_id: number
+  attempts: number
+  first_synced_at: string | null
+}
+
+export interface JiraSyncHistoryPage {
+  history: JiraSyncLog[]
+  next_cursor: string | null
+}
+
+export interface JiraPendingRecord extends TimeRecord {
+  id: number
+  status: 'pending' | 'failed' | 'drifted'
+  duration_seconds: number | null
+  validation_error: string | null
+}
+
+export interface JiraPendingSync {
+  records: JiraPendingRecord[]
+  counts: {
+    pending: number
+    failed: number
+    drifted: number
+    invalid: number
+  }
+  truncated: boolean
 }
 
 export interface JiraSyncResult {
@@ -86,3 +115,33 @@ export interface JiraBulkSyncResult {
   }>
 }
 
+// One record's outcome streamed by POST /jira/sync/bulk (text/event-stream)
+export interface JiraSyncRecordEvent {
+  record_id: number
+  success: boolean
+  worklog_id: string | null
+  error: string | null
+}
+
+export interface JiraSyncJobItem {
+  record_id: number
+  status: 'pending' | 'success' | 'failed'
+  worklog_id: string | null
+  error: string | null
+  finished_at: string | null
+}
+
+export interface JiraSyncJob {
+  id: number
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  total: number
+  succeeded: number
+  failed: number
+  completed: number
+  error: string | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+  items: JiraSyncJobItem[]
+}
+